@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+# ******************************************************************************
+# Copyright 2017-2018 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ******************************************************************************
+"""
+Iterates over a shuffled dataset shaped like the CIFAR-10 training set for a few epochs,
+and reports the time of the steps that cross an epoch boundary, where the dataset is
+reshuffled, the time of the other steps, and the peak resident memory added while
+iterating. With --preallocate, the batches are gathered into buffers reused every step,
+and the memory allocated by the steps is reported.
+
+./array_iterator.py --epochs 3 --batch_size 128 --preallocate
+
+"""
+from __future__ import division, print_function
+
+import argparse
+import resource
+import time
+import tracemalloc
+
+import numpy as np
+
+from neon.frontend import ArrayIterator
+
+
+def peak_rss_mib():
+    # ru_maxrss is in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 2 ** 10
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--ndata', type=int, default=50000)
+    parser.add_argument('--features', type=int, default=3 * 32 * 32)
+    parser.add_argument('--dtype', type=str, default='uint8')
+    parser.add_argument('--batch_size', type=int, default=128)
+    parser.add_argument('--epochs', type=int, default=3)
+    parser.add_argument('--preallocate', action='store_true',
+                        help="Gather the batches into preallocated float32 buffers")
+    args = parser.parse_args()
+
+    np.random.seed(0)
+    images = np.empty((args.ndata, args.features), dtype=args.dtype)
+    for row in range(0, args.ndata, 1000):
+        images[row:row + 1000] = np.random.randint(0, 255, size=images[row:row + 1000].shape)
+    labels = np.random.randint(0, 10, size=args.ndata).astype(np.int32)
+    data = {'image': {'data': images, 'axes': ('N', 'C')},
+            'label': {'data': labels, 'axes': ('N',)}}
+    iterations = args.epochs * args.ndata // args.batch_size
+
+    rss_before = peak_rss_mib()
+    train_set = ArrayIterator(data, args.batch_size, total_iterations=iterations, shuffle=True,
+                              preallocate=args.preallocate)
+    boundary_times = []
+    step_times = []
+    start = time.time()
+    for batch in train_set:
+        elapsed = time.time() - start
+        # The batch that ends an epoch reshuffles the dataset
+        if train_set.pos < args.batch_size:
+            boundary_times.append(elapsed)
+        else:
+            step_times.append(elapsed)
+        start = time.time()
+    rss_added = peak_rss_mib() - rss_before
+
+    print("Dataset:              {:.1f} MiB".format((images.nbytes + labels.nbytes) / 2 ** 20))
+    print("Epoch boundary step:  {:.2f} ms (mean of {})".format(
+        np.mean(boundary_times) * 1e3, len(boundary_times)))
+    print("Other steps:          {:.3f} ms".format(np.mean(step_times) * 1e3))
+    print("Peak RSS added:       {:.1f} MiB".format(rss_added))
+
+    # Memory allocated by the steps of an epoch, after the first step of the iterator
+    train_set.reset()
+    next(train_set)
+    tracemalloc.start()
+    for _ in range(args.ndata // args.batch_size - 2):
+        next(train_set)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print("Peak allocated steps: {:.1f} KiB".format(peak / 2 ** 10))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+# ******************************************************************************
+# Copyright 2017-2018 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ******************************************************************************
+"""
+Times the Axes operations used while building graphs, and the construction of the
+training graph of examples/convnet-benchmarks/googlenet_v1.py, without running it.
+
+./axes_algebra.py --repeat 3
+
+"""
+from __future__ import division, print_function
+
+import argparse
+import os
+import time
+import timeit
+
+import neon as ng
+from neon.analysis.collect import collect_computations
+
+GOOGLENET = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir,
+                         'convnet-benchmarks', 'googlenet_v1.py')
+
+
+def time_axes_operations(number):
+    N, C, H, W, K = (ng.make_axis(length=length, name=name)
+                     for length, name in ((32, 'N'), (64, 'C'), (28, 'H'), (28, 'W'), (3, 'K')))
+    image = ng.make_axes([N, C, H, W])
+    kernel = ng.make_axes([K, C])
+    operations = [
+        ("make_axes", lambda: ng.make_axes([N, C, H, W])),
+        ("hash", lambda: hash(image)),
+        ("a == b", lambda: image == ng.make_axes([N, C, H, W])),
+        ("a | b", lambda: image | kernel),
+        ("a & b", lambda: image & kernel),
+        ("a - b", lambda: image - kernel),
+        ("is_equal_set", lambda: image.is_equal_set(kernel)),
+        ("sample_axes", lambda: image.sample_axes()),
+        ("batch_axes", lambda: image.batch_axes()),
+        ("lengths", lambda: image.lengths),
+        ("index", lambda: image.index(W)),
+    ]
+    for name, operation in operations:
+        elapsed = min(timeit.repeat(operation, number=number, repeat=3))
+        print("{:<14} {:>10.3f}".format(name, elapsed / number * 1e6))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--script', type=str, default=GOOGLENET,
+                        help="Training script whose graph is built")
+    parser.add_argument('--script_args', type=str, default="-z 32")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--number', type=int, default=100000,
+                        help="Calls per timed Axes operation")
+    args = parser.parse_args()
+
+    print("{:<14} {:>10}".format("Operation", "us / call"))
+    time_axes_operations(args.number)
+    print()
+
+    times = []
+    for _ in range(args.repeat):
+        start = time.time()
+        computations = collect_computations(args.script, args.script_args.split())
+        times.append(time.time() - start)
+    num_ops = len(ng.Op.all_op_references(computations))
+    print("Script:         {}".format(os.path.basename(args.script)))
+    print("Ops:            {}".format(num_ops))
+    print("Build time:     {:.3f} s (best of {})".format(min(times), args.repeat))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+# ******************************************************************************
+# Copyright 2017-2018 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ******************************************************************************
+"""
+Times building the gradients of a CIFAR10 ResNet with one ng.deriv per variable and with
+a single ng.gradients sweep.
+
+./gradients.py --size 56
+
+"""
+from __future__ import division, print_function
+
+import argparse
+import os
+import sys
+import time
+
+import neon as ng
+from neon.frontend import ax
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'resnet'))
+from resnet import BuildResnet  # noqa
+
+
+def build_cost(size):
+    image = ng.placeholder([ax.N,
+                            ng.make_axis(length=3, name='C'),
+                            ng.make_axis(length=32, name='H'),
+                            ng.make_axis(length=32, name='W')])
+    label = ng.placeholder([ax.N])
+    resnet = BuildResnet('cifar10', size, False, (size - 2) // 6)
+    prediction = resnet(image)
+    loss = ng.cross_entropy_multi(prediction, ng.one_hot(label, axis=ax.Y))
+    return ng.sum(loss, out_axes=())
+
+
+def time_gradients(size, method):
+    cost = build_cost(size)
+    variables = list(cost.variables())
+    start = time.time()
+    if method == 'deriv':
+        grads = [ng.deriv(cost, variable) for variable in variables]
+    else:
+        grads = ng.gradients(cost, variables)
+    elapsed = time.time() - start
+    return elapsed, len(variables), len(ng.Op.ordered_ops(grads))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', type=int, default=56, help="Depth of the ResNet")
+    parser.add_argument('--batch_size', type=int, default=32)
+    args = parser.parse_args()
+    ax.N.length = args.batch_size
+    ax.Y.length = 10
+
+    print("{:>10} {:>10} {:>12} {:>10}".format("Method", "Variables", "Ops", "Build (s)"))
+    for method in ('deriv', 'gradients'):
+        elapsed, num_variables, num_ops = time_gradients(args.size, method)
+        print("{:>10} {:>10} {:>12} {:>10.3f}".format(method, num_variables, num_ops, elapsed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+# ******************************************************************************
+# Copyright 2017-2018 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ******************************************************************************
+"""
+Measures the time and memory needed to build the training graph of the character level
+LSTM of examples/ptb/char_lstm.py, without loading the dataset.
+
+./graph_build.py --time_steps 50
+
+"""
+from __future__ import division, print_function
+
+import argparse
+import gc
+import time
+import tracemalloc
+
+import neon as ng
+from neon.frontend import Sequential, Preprocess, LSTM, Affine, Softmax, Tanh, Logistic, \
+    UniformInit, RMSProp, ax
+
+
+def build_char_lstm(time_steps, hidden_size=128, vocab_size=50):
+    ax.Y.length = vocab_size
+    REC = ng.make_axis(length=time_steps, name='REC')
+    inp_txt = ng.placeholder([REC, ax.N])
+    tgt_txt = ng.placeholder([REC, ax.N])
+
+    init = UniformInit(low=-0.08, high=0.08)
+    seq1 = Sequential([Preprocess(functor=lambda x: ng.one_hot(x, axis=ax.Y)),
+                       LSTM(hidden_size, init, activation=Tanh(), gate_activation=Logistic(),
+                            return_sequence=True),
+                       LSTM(hidden_size, init, activation=Tanh(), gate_activation=Logistic(),
+                            return_sequence=True),
+                       Affine(init, activation=Softmax(), bias_init=init, axes=(ax.Y,))])
+    optimizer = RMSProp(gradient_clip_value=5)
+    train_prob = seq1(inp_txt)
+    train_loss = ng.cross_entropy_multi(train_prob, ng.one_hot(tgt_txt, axis=ax.Y),
+                                        usebits=True)
+    return ng.sequential([optimizer(train_loss), ng.mean(train_loss, out_axes=())])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--time_steps', type=int, default=50)
+    parser.add_argument('--batch_size', type=int, default=64)
+    args = parser.parse_args()
+    ax.N.length = args.batch_size
+
+    gc.collect()
+    start = time.time()
+    build_char_lstm(args.time_steps)
+    elapsed = time.time() - start
+
+    # Build a second graph under tracemalloc, which slows down allocations
+    gc.collect()
+    tracemalloc.start()
+    batch_cost = build_char_lstm(args.time_steps)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    num_ops = len(ng.Op.all_op_references([batch_cost]))
+    print("Ops:            {}".format(num_ops))
+    print("Build time:     {:.3f} s".format(elapsed))
+    print("Graph memory:   {:.1f} MiB ({:.0f} bytes per op)".format(
+        current / 2 ** 20, current / num_ops))
+    print("Peak memory:    {:.1f} MiB".format(peak / 2 ** 20))
+
+
+if __name__ == '__main__':
+    main()
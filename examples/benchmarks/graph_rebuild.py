@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+# ******************************************************************************
+# Copyright 2017-2018 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ******************************************************************************
+"""
+Builds and discards a small training graph many times, as a long running service would,
+and reports how much memory stays allocated as the rebuilds accumulate. The tensor
+descriptions of every op are computed, as a transformer does when it compiles a graph.
+
+./graph_rebuild.py --rebuilds 1000
+
+"""
+from __future__ import division, print_function
+
+import argparse
+import gc
+import tracemalloc
+
+import neon as ng
+from neon.frontend import Affine, Sequential, Rectlin, GradientDescentMomentum, \
+    GaussianInit, ax
+
+
+def build_and_describe():
+    F = ng.make_axis(length=32, name='F')
+    x = ng.placeholder([F, ax.N])
+    model = Sequential([Affine(nout=32, weight_init=GaussianInit(), activation=Rectlin())
+                        for _ in range(4)])
+    cost = ng.sum(model(x), out_axes=())
+    updates = GradientDescentMomentum(0.01)(cost)
+    for op in ng.Op.ordered_ops([updates]):
+        if op.is_tensor_op:
+            op.tensor_description()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rebuilds', type=int, default=1000)
+    parser.add_argument('--report_every', type=int, default=100)
+    args = parser.parse_args()
+    ax.N.length = 32
+
+    build_and_describe()
+    gc.collect()
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+    print("{:>8} {:>14} {:>14}".format("Rebuilds", "Retained MiB", "KiB / rebuild"))
+    for rebuild in range(1, args.rebuilds + 1):
+        build_and_describe()
+        if rebuild % args.report_every == 0:
+            gc.collect()
+            current, _ = tracemalloc.get_traced_memory()
+            growth = current - baseline
+            print("{:>8} {:>14.1f} {:>14.1f}".format(
+                rebuild, growth / 2 ** 20, growth / rebuild / 2 ** 10))
+    tracemalloc.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+# ******************************************************************************
+# Copyright 2017-2018 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ******************************************************************************
+"""
+Compares building the computations of a training script with saving them once and
+loading them back. Loading is timed in a fresh process, as a worker would start.
+
+./graph_serde.py --script ../convnet-benchmarks/googlenet_v1.py --script_args "-z 32"
+
+"""
+from __future__ import division, print_function
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import neon as ng
+from neon.analysis.collect import collect_computations
+from neon.op_graph.serde import save_graph, load_graph
+
+GOOGLENET = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir,
+                         'convnet-benchmarks', 'googlenet_v1.py')
+
+
+def time_load(filename, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.time()
+        computations = load_graph(filename)
+        times.append(time.time() - start)
+    return min(times), len(ng.Op.all_op_references(computations))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--script', type=str, default=GOOGLENET,
+                        help="Training script whose computations are built")
+    parser.add_argument('--script_args', type=str, default="-z 32")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--load', type=str, default=None,
+                        help="Only time loading this file, and print the time and op count")
+    args = parser.parse_args()
+
+    if args.load is not None:
+        elapsed, num_ops = time_load(args.load, 1)
+        print(elapsed, num_ops)
+        return
+
+    start = time.time()
+    computations = collect_computations(args.script, args.script_args.split())
+    build = time.time() - start
+    num_ops = len(ng.Op.all_op_references(computations))
+
+    filename = os.path.join(tempfile.mkdtemp(), 'graph.ngo')
+    start = time.time()
+    save_graph(computations, filename)
+    save = time.time() - start
+
+    load, _ = time_load(filename, args.repeat)
+    output = subprocess.check_output([sys.executable, os.path.abspath(__file__),
+                                      '--load', filename])
+    fresh_load, loaded_ops = output.split()
+    os.remove(filename)
+
+    print("Script:              {}".format(os.path.basename(args.script)))
+    print("Ops:                 {} built, {} loaded".format(num_ops, int(loaded_ops)))
+    print("Build:               {:.3f} s".format(build))
+    print("Save:                {:.3f} s".format(save))
+    print("Load:                {:.1f} ms".format(load * 1e3))
+    print("Load, fresh process: {:.1f} ms".format(float(fresh_load) * 1e3))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+# ******************************************************************************
+# Copyright 2017-2018 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ******************************************************************************
+"""
+Ingests random images shaped like CIFAR-10 as PNG files, as ingest_cifar10 does, with
+ingest_images in this process and over a pool of processes, and reports the time of each
+and of resuming an ingest that is already complete.
+
+./image_ingest.py --ndata 10000 --workers 4
+
+"""
+from __future__ import division, print_function
+
+import argparse
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from neon.frontend.data import ingest_images, channels_last
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--ndata', type=int, default=10000)
+    parser.add_argument('--workers', type=int, default=multiprocessing.cpu_count())
+    parser.add_argument('--chunk_size', type=int, default=500)
+    args = parser.parse_args()
+
+    np.random.seed(0)
+    images = np.random.randint(0, 255, size=(args.ndata, 3, 32, 32)).astype(np.uint8)
+    labels = np.random.randint(0, 10, size=args.ndata)
+
+    print("{:>8} {:>10} {:>12}".format("Workers", "Ingest (s)", "Resume (s)"))
+    for workers in (0, args.workers):
+        directory = tempfile.mkdtemp()
+        filenames = [os.path.join(directory, 'train', '{}_{:05d}.png'.format(lbl, idx))
+                     for idx, lbl in enumerate(labels)]
+        times = []
+        for _ in range(2):
+            start = time.time()
+            ingest_images(images, filenames, channels_last, workers=workers,
+                          chunk_size=args.chunk_size)
+            times.append(time.time() - start)
+        print("{:>8} {:>10.2f} {:>12.2f}".format(workers, *times))
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+# ******************************************************************************
+# Copyright 2017-2018 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ******************************************************************************
+"""
+Loads augmented batches from a CIFAR-10 manifest with ManifestDataLoader, configured as
+the training set of examples/resnet, and reports the time per batch in this process and
+over worker processes, decoding the PNG files of every batch and with the decoded-image
+cache, and the time to build the cache.
+
+With --manifest, the train-index.csv written by ingest_cifar10 is used. Otherwise, random
+images are ingested in its format into a temporary directory.
+
+./manifest_loader.py --manifest ~/data/cifar10/train-index.csv --workers 4
+
+"""
+from __future__ import division, print_function
+
+import argparse
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from neon.frontend import ManifestDataLoader
+from neon.frontend.data import ingest_images, channels_last
+
+
+def make_manifest(directory, ndata):
+    np.random.seed(0)
+    images = np.random.randint(0, 255, size=(ndata, 3, 32, 32)).astype(np.uint8)
+    labels = np.random.randint(0, 10, size=ndata)
+    fnames = [os.path.join(directory, 'train', '{}_{:05d}.png'.format(lbl, idx))
+              for idx, lbl in enumerate(labels)]
+    ingest_images(images, fnames, channels_last)
+    manifest = os.path.join(directory, 'train-index.csv')
+    records = [('@FILE', 'STRING')]
+    records.extend((os.path.relpath(fname, directory), lbl) for fname, lbl in zip(fnames, labels))
+    np.savetxt(manifest, records, fmt='%s\t%s')
+    return manifest
+
+
+def make_config(manifest, batch_size, iterations, cache_directory):
+    return {'manifest_filename': manifest,
+            'manifest_root': os.path.dirname(manifest),
+            'batch_size': batch_size,
+            'block_size': 5000,
+            'cache_directory': cache_directory,
+            'etl': [{'type': 'image', 'height': 32, 'width': 32},
+                    {'type': 'label', 'binary': False}],
+            'augmentation': [{'type': 'image', 'padding': 4, 'crop_enable': False,
+                              'flip_enable': True}],
+            'iteration_mode': 'COUNT',
+            'iteration_mode_count': iterations,
+            'shuffle_manifest': True,
+            'shuffle_enable': True,
+            'random_seed': 0}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--manifest', type=str, default=None)
+    parser.add_argument('--ndata', type=int, default=10000)
+    parser.add_argument('--batch_size', type=int, default=128)
+    parser.add_argument('--iterations', type=int, default=100)
+    parser.add_argument('--workers', type=int, default=multiprocessing.cpu_count())
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    manifest = args.manifest or make_manifest(directory, args.ndata)
+
+    print("{:>8} {:>8} {:>10} {:>12}".format("Workers", "Cache", "Build (s)", "Batch (ms)"))
+    for cache in (False, True):
+        for workers in (0, args.workers):
+            cache_directory = os.path.join(directory, 'cache-{}'.format(workers)) if cache else ''
+            start = time.time()
+            loader = ManifestDataLoader(make_config(manifest, args.batch_size, args.iterations,
+                                                    cache_directory), workers=workers)
+            build = time.time() - start
+            start = time.time()
+            count = sum(1 for _ in loader)
+            elapsed = time.time() - start
+            loader.close()
+            print("{:>8} {:>8} {:>10.2f} {:>12.2f}".format(
+                workers, 'on' if cache else 'off', build, elapsed / count * 1e3))
+    shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+# ******************************************************************************
+# Copyright 2017-2018 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ******************************************************************************
+"""
+Saves a dataset shaped like the CIFAR-10 training set as a dataset container, and compares
+loading it into memory with loading it as memory maps, as a restarted training script
+would, and the time per batch of a shuffled epoch with and without readahead, with the
+files in the page cache and evicted from it.
+
+With --mnist, the MNIST dataset in that directory is exported with MNIST.export instead,
+and loading it with load_data is compared with load_memmap.
+
+./memmap_dataset.py --ndata 50000 --readahead 4
+
+"""
+from __future__ import division, print_function
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from neon.frontend import MemmapArrayIterator
+from neon.frontend.data import MNIST, save_dataset, load_dataset
+
+
+def drop_page_cache(directory):
+    """
+    Evicts the files of the container from the page cache, as after a reboot or when the
+    dataset is larger than the memory.
+    """
+    for root, _, filenames in os.walk(directory):
+        for filename in filenames:
+            fd = os.open(os.path.join(root, filename), os.O_RDONLY)
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+            os.close(fd)
+
+
+def time_epoch(directory, batch_size, readahead, cold):
+    if cold:
+        drop_page_cache(directory)
+    sets, _ = load_dataset(directory)
+    np.random.seed(0)
+    batches = MemmapArrayIterator(sets['train'], batch_size, shuffle=True,
+                                  readahead=readahead)
+    start = time.time()
+    count = sum(1 for _ in batches)
+    return (time.time() - start) / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--ndata', type=int, default=50000)
+    parser.add_argument('--batch_size', type=int, default=128)
+    parser.add_argument('--readahead', type=int, default=4)
+    parser.add_argument('--mnist', type=str, default=None,
+                        help="Directory of mnist.pkl.gz, exported to mnist-neon within it")
+    args = parser.parse_args()
+
+    if args.mnist is not None:
+        MNIST(args.mnist).export()
+        start = time.time()
+        MNIST(args.mnist).load_data()
+        print("load_data:    {:.1f} ms".format((time.time() - start) * 1e3))
+        start = time.time()
+        MNIST(args.mnist).load_memmap()
+        print("load_memmap:  {:.1f} ms".format((time.time() - start) * 1e3))
+        return
+
+    np.random.seed(0)
+    images = np.empty((args.ndata, 3, 32, 32), dtype=np.uint8)
+    for row in range(0, args.ndata, 1000):
+        images[row:row + 1000] = np.random.randint(0, 255, size=images[row:row + 1000].shape)
+    labels = np.random.randint(0, 10, size=args.ndata).astype(np.int32)
+    directory = tempfile.mkdtemp()
+    save_dataset(directory, {'train': {'image': {'data': images, 'axes': ('N', 'C', 'H', 'W')},
+                                       'label': {'data': labels, 'axes': ('N',)}}})
+    del images
+
+    start = time.time()
+    load_dataset(directory, mmap_mode=None)
+    in_memory = time.time() - start
+    start = time.time()
+    load_dataset(directory)
+    mapped = time.time() - start
+
+    print("Load into memory:  {:.1f} ms".format(in_memory * 1e3))
+    print("Load memory maps:  {:.1f} ms".format(mapped * 1e3))
+    print("{:>10} {:>10} {:>12}".format("Cache", "Readahead", "Batch (ms)"))
+    for cold in (False, True):
+        for readahead in (0, args.readahead):
+            print("{:>10} {:>10} {:>12.3f}".format(
+                "cold" if cold else "warm", readahead,
+                time_epoch(directory, args.batch_size, readahead, cold) * 1e3))
+    shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+# ******************************************************************************
+# Copyright 2017-2018 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ******************************************************************************
+"""
+Times Op.ordered_ops on MLP training graphs of increasing depth, both uncached and
+memoized, to check that the sort scales linearly with the number of ops.
+
+./ordered_ops.py --depths 8,32,128,512
+
+"""
+from __future__ import division, print_function
+
+import argparse
+import time
+
+import neon as ng
+from neon.frontend import Affine, Sequential, Rectlin, GradientDescentMomentum, \
+    GaussianInit, ax
+
+
+def build_graph(depth, hidden=16):
+    F = ng.make_axis(length=hidden, name='F')
+    x = ng.placeholder([F, ax.N])
+    layers = [Affine(nout=hidden, weight_init=GaussianInit(), activation=Rectlin())
+              for _ in range(depth)]
+    cost = ng.sum(Sequential(layers)(x), out_axes=())
+    return GradientDescentMomentum(0.01)(cost)
+
+
+def best_time(function, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.time()
+        function()
+        times.append(time.time() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--depths', type=str, default="8,32,128,512",
+                        help="Comma separated numbers of layers")
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    ax.N.length = 32
+
+    print("{:>6} {:>8} {:>12} {:>12} {:>12}".format("Layers", "Ops", "Sort (ms)",
+                                                    "us / op", "Memo (ms)"))
+    for depth in (int(depth) for depth in args.depths.split(',')):
+        roots = [build_graph(depth)]
+        ops = ng.Op.ordered_ops(roots)
+        sort = best_time(lambda: ng.Op._ordered_ops(roots), args.repeat)
+        memo = best_time(lambda: ng.Op.ordered_ops(roots), args.repeat)
+        print("{:>6} {:>8} {:>12.2f} {:>12.2f} {:>12.3f}".format(
+            depth, len(ops), sort * 1e3, sort / len(ops) * 1e6, memo * 1e3))
+
+
+if __name__ == '__main__':
+    main()
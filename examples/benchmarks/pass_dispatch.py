@@ -0,0 +1,167 @@
+#!/usr/bin/env python
+# ******************************************************************************
+# Copyright 2017-2018 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ******************************************************************************
+"""
+Times a graph pass that only dispatches on the op types of an MLP training graph, so that
+the cost measured is the generic method dispatch and the op accessor indirection, with and
+without the fast run_pass of GraphBuildingPass.
+
+./pass_dispatch.py --depth 256
+
+"""
+from __future__ import division, print_function
+
+import argparse
+import time
+
+import neon as ng
+from neon.frontend import Affine, Sequential, Rectlin, GradientDescentMomentum, \
+    GaussianInit, ax
+from neon.op_graph.op_graph import Add, Multiply, Subtract, Divide, DotOp, \
+    TensorValueOp, AssignableTensorOp, ReductionOp, ElementWiseOp
+from neon.transformers.passes.passes import PeepholeGraphPass
+from neon.util.generics import DispatchTable, generic_method
+
+
+class CountingPass(PeepholeGraphPass):
+    """
+    Counts the ops of each kind, as a code generating pass would translate them.
+    """
+
+    def __init__(self, **kwargs):
+        super(CountingPass, self).__init__(**kwargs)
+        self.counts = {}
+
+    def count(self, kind):
+        self.counts[kind] = self.counts.get(kind, 0) + 1
+
+    @generic_method(dispatch_base_type=ng.Op)
+    def visit(self, op, *args):
+        self.count('other')
+
+    @visit.on_type(Add)
+    def visit(self, op, x, y):
+        self.count('add')
+
+    @visit.on_type(Subtract)
+    def visit(self, op, x, y):
+        self.count('subtract')
+
+    @visit.on_type(Multiply)
+    def visit(self, op, x, y):
+        self.count('multiply')
+
+    @visit.on_type(Divide)
+    def visit(self, op, x, y):
+        self.count('divide')
+
+    @visit.on_type(DotOp)
+    def visit(self, op, x, y):
+        self.count('dot')
+
+    @visit.on_type(ElementWiseOp)
+    def visit(self, op, *args):
+        self.count('elementwise')
+
+    @visit.on_type(ReductionOp)
+    def visit(self, op, x):
+        self.count('reduction')
+
+    @visit.on_type(TensorValueOp)
+    def visit(self, op):
+        self.count('value')
+
+    @visit.on_type(AssignableTensorOp)
+    def visit(self, op):
+        self.count('tensor')
+
+
+def build_graph(depth, hidden=16):
+    F = ng.make_axis(length=hidden, name='F')
+    x = ng.placeholder([F, ax.N])
+    layers = [Affine(nout=hidden, weight_init=GaussianInit(), activation=Rectlin())
+              for _ in range(depth)]
+    cost = ng.sum(Sequential(layers)(x), out_axes=())
+    return GradientDescentMomentum(0.01)(cost)
+
+
+def time_pass(ops, fast, repeat):
+    times = []
+    for _ in range(repeat):
+        graph_pass = CountingPass()
+        graph_pass.fast_run_pass = fast
+        start = time.time()
+        graph_pass.wrapped_do_pass(ops=ops)
+        times.append(time.time() - start)
+    return min(times), sum(graph_pass.counts.values())
+
+
+def time_dispatch(ops, repeat):
+    """
+    Times visiting every op through the generic method and the op accessor, and through a
+    DispatchTable with the args read from the ops, outside of run_pass.
+    """
+    graph_pass = CountingPass()
+    graph_pass.begin_pass()
+    ordered = ng.Op.ordered_ops(ops)
+
+    def generic():
+        for op in ordered:
+            graph_pass.visit(op, *graph_pass.op_args(op))
+
+    def table():
+        visit = DispatchTable(graph_pass, CountingPass.visit)
+        for op in ordered:
+            visit(op, *op.args)
+
+    return [best_time(function, repeat) for function in (generic, table)]
+
+
+def best_time(function, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.time()
+        function()
+        times.append(time.time() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--depth', type=int, default=256, help="Number of layers")
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    ax.N.length = 32
+
+    ops = [build_graph(args.depth)]
+    # The graph is sorted once outside of the timings
+    ng.Op.ordered_ops(ops)
+    print("{:>10} {:>8} {:>10} {:>10}".format("run_pass", "Ops", "Pass (ms)", "us / op"))
+    for fast in (False, True):
+        elapsed, num_ops = time_pass(ops, fast, args.repeat)
+        print("{:>10} {:>8} {:>10.2f} {:>10.2f}".format(
+            "fast" if fast else "accessor", num_ops, elapsed * 1e3, elapsed / num_ops * 1e6))
+
+    print()
+    print("{:>10} {:>8} {:>10} {:>10}".format("Dispatch", "Ops", "Time (ms)", "us / op"))
+    for name, elapsed in zip(("generic", "table"), time_dispatch(ops, args.repeat)):
+        print("{:>10} {:>8} {:>10.2f} {:>10.2f}".format(
+            name, num_ops, elapsed * 1e3, elapsed / num_ops * 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+# ******************************************************************************
+# Copyright 2017-2018 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ******************************************************************************
+"""
+Iterates over a dataset shaped like the CIFAR-10 training set, with a slow augmentation of
+every batch and a simulated training step, directly and through a PrefetchIterator with
+threads and with processes. Reports the time per step and the time the training thread
+waits for a batch, which prefetching hides behind the training steps.
+
+./prefetch_iterator.py --augment_ms 20 --step_ms 25 --workers 2
+
+"""
+from __future__ import division, print_function
+
+import argparse
+import time
+
+import numpy as np
+
+from neon.frontend import ArrayIterator, PrefetchIterator
+
+
+class Augmentation(object):
+    """
+    Flips and crops the images, and computes a per-image normalization for at least
+    delay seconds, using the CPU as an augmentation written in Python would.
+    """
+
+    def __init__(self, delay):
+        self.delay = delay
+
+    def __call__(self, batch):
+        start = time.time()
+        images = batch['image'].reshape(-1, 3, 32, 32)[:, :, :, ::-1]
+        padded = np.pad(images, ((0, 0), (0, 0), (4, 4), (4, 4)), mode='constant')
+        offset = np.random.randint(0, 9, size=2)
+        images = padded[:, :, offset[0]:offset[0] + 32, offset[1]:offset[1] + 32]
+        while time.time() - start < self.delay:
+            images = images - images.mean(axis=(1, 2, 3), keepdims=True)
+        batch = dict(batch)
+        batch['image'] = np.ascontiguousarray(images, dtype=np.float32).reshape(len(images), -1)
+        return batch
+
+
+def run(dataset, augment, step_time):
+    """
+    Returns the mean time of a step and the mean time waiting for a batch.
+    """
+    wait = 0
+    steps = 0
+    batches = iter(dataset)
+    start = time.time()
+    while True:
+        waiting = time.time()
+        try:
+            batch = next(batches)
+        except StopIteration:
+            break
+        if augment is not None:
+            batch = augment(batch)
+        wait += time.time() - waiting
+        # The training step, which releases the GIL as a transformer computation does
+        time.sleep(step_time)
+        steps += 1
+    return (time.time() - start) / steps, wait / steps
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--ndata', type=int, default=10000)
+    parser.add_argument('--batch_size', type=int, default=128)
+    parser.add_argument('--iterations', type=int, default=60)
+    parser.add_argument('--augment_ms', type=float, default=20)
+    parser.add_argument('--step_ms', type=float, default=25)
+    parser.add_argument('--depth', type=int, default=4)
+    parser.add_argument('--workers', type=int, default=2)
+    args = parser.parse_args()
+
+    np.random.seed(0)
+    images = np.random.randint(0, 255, size=(args.ndata, 3 * 32 * 32)).astype(np.uint8)
+    labels = np.random.randint(0, 10, size=args.ndata).astype(np.int32)
+    data = {'image': {'data': images, 'axes': ('N', 'C')},
+            'label': {'data': labels, 'axes': ('N',)}}
+    augment = Augmentation(args.augment_ms / 1e3)
+    step_time = args.step_ms / 1e3
+
+    def dataset():
+        return ArrayIterator(data, args.batch_size, total_iterations=args.iterations,
+                             shuffle=True)
+
+    print("{:>10} {:>12} {:>12}".format("Loader", "Step (ms)", "Wait (ms)"))
+    step, wait = run(dataset(), augment, step_time)
+    print("{:>10} {:>12.1f} {:>12.1f}".format("direct", step * 1e3, wait * 1e3))
+    for mode in ('thread', 'process'):
+        prefetch = PrefetchIterator(dataset(), depth=args.depth, workers=args.workers,
+                                    mode=mode, transform=augment)
+        step, wait = run(prefetch, None, step_time)
+        prefetch.close()
+        print("{:>10} {:>12.1f} {:>12.1f}".format(mode, step * 1e3, wait * 1e3))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+# ******************************************************************************
+# Copyright 2017-2018 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ******************************************************************************
+"""
+Iterates over a character sequence the length of the PTB training set with a
+SequentialArrayIterator, as the char-level PTB examples do, and reports the time per batch
+and the number of characters windowed per second.
+
+./sequential_iterator.py --batch_size 128 --time_steps 256
+
+"""
+from __future__ import division, print_function
+
+import argparse
+import time
+
+import numpy as np
+
+from neon.frontend import SequentialArrayIterator
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--ndata', type=int, default=5101618)
+    parser.add_argument('--batch_size', type=int, default=128)
+    parser.add_argument('--time_steps', type=int, default=256)
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--shuffle', action='store_true')
+    parser.add_argument('--reverse_target', action='store_true')
+    parser.add_argument('--get_prev_target', action='store_true')
+    args = parser.parse_args()
+
+    np.random.seed(0)
+    tokens = np.random.randint(0, 50, size=args.ndata).astype(np.uint32)
+    data = {'inp_txt': tokens, 'tgt_txt': np.roll(tokens, -1)}
+    batches = SequentialArrayIterator(data, time_steps=args.time_steps,
+                                      batch_size=args.batch_size, tgt_key='tgt_txt',
+                                      total_iterations=args.iterations, shuffle=args.shuffle,
+                                      reverse_target=args.reverse_target,
+                                      get_prev_target=args.get_prev_target)
+    start = time.time()
+    count = sum(1 for _ in batches)
+    elapsed = time.time() - start
+
+    print("Batches:          {}".format(count))
+    print("Time per batch:   {:.3f} ms".format(elapsed / count * 1e3))
+    print("Characters / s:   {:.1f} M".format(
+        count * args.batch_size * args.time_steps / elapsed / 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+# ******************************************************************************
+# Copyright 2017-2018 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ******************************************************************************
+"""
+Writes text files the size of the PTB sets, and reports the time PTB.load_data takes to
+tokenize them, and to load the cached tokens afterwards, in char and word mode.
+
+./text_tokenization.py --words 1000000
+
+"""
+from __future__ import division, print_function
+
+import argparse
+import shutil
+import tempfile
+import time
+import os
+
+import numpy as np
+
+from neon.frontend.data import PTB
+
+
+def write_text(directory, nwords):
+    np.random.seed(0)
+    words = np.array(['w{}'.format(i) for i in range(10000)])
+    for filename, fraction in (('ptb.train.txt', 1), ('ptb.test.txt', .1),
+                               ('ptb.valid.txt', .1)):
+        lines = words[np.random.randint(0, len(words), size=(int(nwords * fraction) // 20, 20))]
+        with open(os.path.join(directory, filename), 'w') as f:
+            f.write('\n'.join(' '.join(line) for line in lines) + '\n')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--words', type=int, default=1000000)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    write_text(directory, args.words)
+    print("{:>6} {:>12} {:>12}".format("Mode", "Tokenize (s)", "Cached (ms)"))
+    for use_words in (False, True):
+        start = time.time()
+        PTB(directory, use_words=use_words).load_data()
+        tokenize = time.time() - start
+        start = time.time()
+        PTB(directory, use_words=use_words).load_data()
+        cached = time.time() - start
+        print("{:>6} {:>12.2f} {:>12.1f}".format("words" if use_words else "chars",
+                                                 tokenize, cached * 1e3))
+    shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
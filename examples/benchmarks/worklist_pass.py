@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+# ******************************************************************************
+# Copyright 2017-2018 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ******************************************************************************
+"""
+Runs a simplification pass to a fixed point over the training graph of an unrolled RNN,
+re-walking the whole graph after each batch of replacements, as run_pass does, and
+revisiting only the changed ops, as run_worklist_pass does.
+
+The input gate of the RNN cell is pruned to zero and the cell state starts at zero, so
+the cell state of each step only simplifies to zero after the previous step has, which
+takes a batch per step.
+
+./worklist_pass.py --time_steps 100
+
+"""
+from __future__ import division, print_function
+
+import argparse
+import time
+
+import numpy as np
+
+import neon as ng
+from neon.frontend import GradientDescentMomentum, ax
+from neon.op_graph.op_graph import Add, Multiply
+from neon.transformers.passes.passes import PeepholeGraphPass
+from neon.util.generics import generic_method
+
+
+def is_zero(op):
+    const = op.const
+    return const is not None and np.all(const == 0)
+
+
+class ZeroSimplifier(PeepholeGraphPass):
+    """
+    Replaces x * 0 with 0 and x + 0 with x, when the axes allow it.
+    """
+
+    def __init__(self, worklist_pass=False, **kwargs):
+        super(ZeroSimplifier, self).__init__(**kwargs)
+        self.worklist_pass = worklist_pass
+        self.visits = 0
+
+    @generic_method(dispatch_base_type=ng.Op)
+    def visit(self, op, *args):
+        self.visits += 1
+
+    @visit.on_type(Multiply)
+    def visit(self, op, x, y):
+        self.visits += 1
+        for zero in (x, y):
+            if is_zero(zero) and zero.axes == op.axes:
+                self.replace_op(op, zero)
+                return
+
+    @visit.on_type(Add)
+    def visit(self, op, x, y):
+        self.visits += 1
+        for zero, other in ((x, y), (y, x)):
+            if is_zero(zero) and other.axes == op.axes:
+                self.replace_op(op, other)
+                return
+
+
+def build_rnn(time_steps, hidden=32, features=32):
+    H = ng.make_axis(length=hidden, name='H')
+    F = ng.make_axis(length=features, name='F')
+    W_f = ng.variable([H, F], initial_value=0.1)
+    W_g = ng.variable([H, F], initial_value=0.1)
+    input_gate = ng.constant(0., axes=[H, ax.N])
+    c = ng.constant(0., axes=[H, ax.N])
+    outputs = []
+    for _ in range(time_steps):
+        x = ng.placeholder([F, ax.N])
+        f = ng.sigmoid(ng.dot(W_f, x))
+        g = ng.tanh(ng.dot(W_g, x))
+        c = f * c + input_gate * g
+        outputs.append(ng.tanh(c) * f)
+    cost = ng.sum(sum(outputs[1:], outputs[0]), out_axes=())
+    return ng.sequential([GradientDescentMomentum(0.01)(cost), cost])
+
+
+def run(time_steps, worklist_pass):
+    graph = build_rnn(time_steps)
+    num_ops = len(ng.Op.ordered_ops([graph]))
+    graph_pass = ZeroSimplifier(worklist_pass=worklist_pass)
+    start = time.time()
+    graph_pass.wrapped_do_pass(ops=[graph])
+    elapsed = time.time() - start
+    return elapsed, num_ops, graph_pass.visits, len(ng.Op.ordered_ops([graph]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--time_steps', type=int, default=100)
+    args = parser.parse_args()
+    ax.N.length = 32
+
+    print("{:>10} {:>8} {:>10} {:>10} {:>10}".format(
+        "Driver", "Ops", "Visits", "Ops after", "Time (s)"))
+    for worklist_pass in (False, True):
+        elapsed, num_ops, visits, remaining = run(args.time_steps, worklist_pass)
+        print("{:>10} {:>8} {:>10} {:>10} {:>10.3f}".format(
+            "worklist" if worklist_pass else "run_pass", num_ops, visits, remaining, elapsed))
+
+
+if __name__ == '__main__':
+    main()
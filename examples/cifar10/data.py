@@ -14,15 +14,19 @@
 # limitations under the License.
 # ******************************************************************************
 import os
+from functools import partial
 import numpy as np
-from PIL import Image
-from tqdm import tqdm
 from neon.frontend.aeon_shim import AeonDataLoader
 from neon.util.persist import get_data_cache_or_nothing
-from neon.frontend import CIFAR10
+from neon.frontend import CIFAR10, ingest_images, channels_last
 
 
-def ingest_cifar10(root_dir, padded_size=32, overwrite=False):
+def pad_image(pad_width, img):
+    im = np.pad(img.reshape((3, 32, 32)), pad_width, mode='mean')
+    return channels_last(im)
+
+
+def ingest_cifar10(root_dir, padded_size=32, overwrite=False, workers=None):
     '''
     Save CIFAR-10 dataset as PNG files
     '''
@@ -41,17 +45,15 @@ def ingest_cifar10(root_dir, padded_size=32, overwrite=False):
 
     # Now write out image files and manifests
     for setn, manifest, data in zip(set_names, manifest_files, datasets):
-        records = [('@FILE', 'STRING')]
         img_path = os.path.join(out_dir, setn)
-        if not os.path.isdir(img_path):
-            os.makedirs(img_path)
-
-        for idx, (img, lbl) in enumerate(tqdm(zip(data['image']['data'], data['label']['data']))):
-            im = np.pad(img.reshape((3, 32, 32)), pad_width, mode='mean')
-            im = Image.fromarray(np.uint8(np.transpose(im, axes=[1, 2, 0]).copy()))
-            fname = os.path.join(img_path, '{}_{:05d}.png'.format(lbl, idx))
-            im.save(fname, format='PNG')
-            records.append((os.path.relpath(fname, out_dir), lbl))
+        labels = data['label']['data']
+        fnames = [os.path.join(img_path, '{}_{:05d}.png'.format(lbl, idx))
+                  for idx, lbl in enumerate(labels)]
+        ingest_images(data['image']['data'], fnames, transform=partial(pad_image, pad_width),
+                      workers=workers, overwrite=overwrite)
+        records = [('@FILE', 'STRING')]
+        records.extend((os.path.relpath(fname, out_dir), lbl)
+                       for fname, lbl in zip(fnames, labels))
         np.savetxt(manifest, records, fmt='%s\t%s')
 
     return manifest_files
@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+# ******************************************************************************
+# Copyright 2017-2018 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ******************************************************************************
+
+"""
+Train a LSTM on the sentiment of the IMDB movie reviews.
+
+The reviews are grouped by length into buckets, and each batch is padded to the length
+of its bucket instead of the length of the longest review, with one computation per
+bucket built from the same layers. The fraction of the tokens of the batches that are
+not padding is reported after training, with the one of padding every review to the
+longest bucket.
+
+Usage:
+
+    python examples/imdb/imdb_lstm.py -b cpu -t 2000 --buckets 32,64,128,256
+
+    With --buckets 256, every review is padded to 256 tokens, as by IMDB.load_data.
+
+"""
+from __future__ import division, print_function
+from contextlib import closing
+import numpy as np
+import neon as ng
+from neon.frontend import (Layer, Sequential, LookupTable, LSTM, Affine, Softmax, Tanh,
+                           Logistic)
+from neon.frontend import UniformInit, RMSProp
+from neon.frontend import ax, loop_train
+from neon.frontend import NeonArgparser, BucketedComputation, make_default_callbacks
+from neon.frontend import BucketedSequenceIterator
+import neon.transformers as ngt
+
+from neon.frontend import IMDB
+
+parser = NeonArgparser(__doc__)
+parser.add_argument('--buckets', type=str, default='32,64,128,256',
+                    help='comma separated lengths of the buckets of the reviews')
+parser.add_argument('--vocab_size', type=int, default=20000)
+parser.add_argument('--embed_dim', type=int, default=128)
+parser.add_argument('--hidden_size', type=int, default=128)
+parser.set_defaults(batch_size=32, num_iterations=2000)
+args = parser.parse_args()
+
+buckets = sorted(int(length) for length in args.buckets.split(','))
+
+imdb = IMDB(path=args.data_dir, vocab_size=args.vocab_size, sentence_length=buckets[-1])
+data = imdb.load_data(pad=False)
+train_set = BucketedSequenceIterator(data['train'], args.batch_size, buckets,
+                                     total_iterations=args.num_iterations, shuffle=True)
+valid_set = BucketedSequenceIterator(data['valid'], args.batch_size, buckets)
+
+inputs = train_set.make_placeholders()
+ax.Y.length = imdb.nclass
+
+init = UniformInit(low=-0.08, high=0.08)
+model = Sequential([LookupTable(args.vocab_size, args.embed_dim, init, pad_idx=0),
+                    LSTM(args.hidden_size, init, activation=Tanh(),
+                         gate_activation=Logistic(), return_sequence=False),
+                    Affine(init, activation=Softmax(), bias_init=init, axes=(ax.Y,))])
+
+# The layers create their weights when first called, and share them in the computations of
+# the other buckets. The optimizer keeps the state of its updates for each bucket.
+optimizer = RMSProp()
+train_outputs, eval_outputs = {}, {}
+for bucket, bucket_inputs in inputs.items():
+    train_prob = model(bucket_inputs['review'])
+    train_loss = ng.cross_entropy_multi(train_prob,
+                                        ng.one_hot(bucket_inputs['label'], axis=ax.Y))
+    batch_cost = ng.sequential([optimizer(train_loss), ng.mean(train_loss, out_axes=())])
+    train_outputs[bucket] = dict(batch_cost=batch_cost)
+
+    with Layer.inference_mode_on():
+        inference_prob = model(bucket_inputs['review'])
+    eval_loss = ng.cross_entropy_multi(inference_prob,
+                                       ng.one_hot(bucket_inputs['label'], axis=ax.Y))
+    eval_outputs[bucket] = dict(cross_ent_loss=eval_loss, results=inference_prob)
+
+with closing(ngt.make_transformer()) as transformer:
+    train_computation = BucketedComputation(transformer, train_outputs, inputs)
+    loss_computation = BucketedComputation(transformer, eval_outputs, inputs)
+
+    cbs = make_default_callbacks(transformer=transformer,
+                                 output_file=args.output_file,
+                                 frequency=args.iter_interval,
+                                 train_computation=train_computation,
+                                 total_iterations=args.num_iterations,
+                                 eval_set=valid_set,
+                                 loss_computation=loss_computation,
+                                 use_progress_bar=args.progress_bar)
+
+    loop_train(train_set, cbs)
+
+lengths = np.concatenate(train_set.bucket_lengths)
+print("Padding efficiency: {:.1%} with buckets {}, {:.1%} padding to {}".format(
+    train_set.padding_efficiency, buckets, lengths.mean() / buckets[-1], buckets[-1]))
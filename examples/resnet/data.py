@@ -16,14 +16,12 @@
 from __future__ import division, print_function
 import os
 import numpy as np
-from PIL import Image
-from tqdm import tqdm
 from neon.frontend.aeon_shim import AeonDataLoader
 from neon.util.persist import get_data_cache_or_nothing
-from neon.frontend import CIFAR10, CIFAR100
+from neon.frontend import CIFAR10, CIFAR100, ingest_images, channels_last
 
 
-def ingest_cifar100(root_dir, overwrite=False):
+def ingest_cifar100(root_dir, overwrite=False, workers=None):
     '''
     Save CIFAR-100 dataset as PNG files
     '''
@@ -39,22 +37,21 @@ def ingest_cifar100(root_dir, overwrite=False):
 
     # Now write out image files and manifests
     for setn, manifest, data in zip(set_names, manifest_files, datasets):
-        records = [('@FILE', 'STRING')]
         img_path = os.path.join(out_dir, setn)
-        if not os.path.isdir(img_path):
-            os.makedirs(img_path)
-
-        for idx, (img, lbl) in enumerate(tqdm(zip(data['image']['data'], data['label']['data']))):
-            im = Image.fromarray(np.uint8(np.transpose(img, axes=[1, 2, 0]).copy()))
-            fname = os.path.join(img_path, '{}_{:05d}.png'.format(lbl, idx))
-            im.save(fname, format='PNG')
-            records.append((os.path.relpath(fname, out_dir), lbl))
+        labels = data['label']['data']
+        fnames = [os.path.join(img_path, '{}_{:05d}.png'.format(lbl, idx))
+                  for idx, lbl in enumerate(labels)]
+        ingest_images(data['image']['data'], fnames, transform=channels_last,
+                      workers=workers, overwrite=overwrite)
+        records = [('@FILE', 'STRING')]
+        records.extend((os.path.relpath(fname, out_dir), lbl)
+                       for fname, lbl in zip(fnames, labels))
         np.savetxt(manifest, records, fmt='%s\t%s')
 
     return manifest_files
 
 
-def ingest_cifar10(root_dir, overwrite=False):
+def ingest_cifar10(root_dir, overwrite=False, workers=None):
     '''
     Save CIFAR-10 dataset as PNG files
     '''
@@ -70,16 +67,15 @@ def ingest_cifar10(root_dir, overwrite=False):
 
     # Now write out image files and manifests
     for setn, manifest, data in zip(set_names, manifest_files, datasets):
-        records = [('@FILE', 'STRING')]
         img_path = os.path.join(out_dir, setn)
-        if not os.path.isdir(img_path):
-            os.makedirs(img_path)
-
-        for idx, (img, lbl) in enumerate(tqdm(zip(data['image']['data'], data['label']['data']))):
-            im = Image.fromarray(np.uint8(np.transpose(img, axes=[1, 2, 0]).copy()))
-            fname = os.path.join(img_path, '{}_{:05d}.png'.format(lbl, idx))
-            im.save(fname, format='PNG')
-            records.append((os.path.relpath(fname, out_dir), lbl))
+        labels = data['label']['data']
+        fnames = [os.path.join(img_path, '{}_{:05d}.png'.format(lbl, idx))
+                  for idx, lbl in enumerate(labels)]
+        ingest_images(data['image']['data'], fnames, transform=channels_last,
+                      workers=workers, overwrite=overwrite)
+        records = [('@FILE', 'STRING')]
+        records.extend((os.path.relpath(fname, out_dir), lbl)
+                       for fname, lbl in zip(fnames, labels))
         np.savetxt(manifest, records, fmt='%s\t%s')
 
     return manifest_files
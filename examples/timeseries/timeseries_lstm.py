@@ -72,6 +72,9 @@ parser.add_argument('--look_ahead', type=int,
 parser.add_argument('--seq_len', type=int,
                     help="Number of time points in each input sequence",
                     default=32)
+parser.add_argument('--scan', default=False, action='store_true',
+                    help="If given, the LSTM step is built once and iterated with a scan op "
+                         "instead of being unrolled seq_len times")
 parser.set_defaults()
 args = parser.parse_args()
 
@@ -137,7 +140,8 @@ inputs = {'X': ng.placeholder(in_axes), 'y': ng.placeholder(out_axes),
 
 # Network Definition
 seq1 = Sequential([LSTM(nout=recurrent_units, init=init_uni, backward=False,
-                   activation=Logistic(), gate_activation=Tanh(), return_sequence=predict_seq),
+                   activation=Logistic(), gate_activation=Tanh(), return_sequence=predict_seq,
+                   scan=args.scan),
                    Affine(weight_init=init_uni, bias_init=init_uni,
                    activation=Identity(), axes=out_axis)])
 
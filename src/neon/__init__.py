@@ -31,6 +31,7 @@ from neon.op_graph.batchnorm import batchnormcommon, batchnorminference, \
     batchnormoutput, batchnormmean, batchnormvar, batchnormbpropcommon, \
     batchnormbpropdata, batchnormbpropgamma, batchnormbpropbeta, batchnormtrain
 from neon.op_graph.relu import relu
+from neon.op_graph.scan import scan
 from neon.op_graph.debug import PrintOp
 from neon.op_graph.op_graph import *
 from neon.op_graph.op_graph import axes_with_order, \
@@ -72,6 +73,7 @@ __all__ = [
     'pooling',
     'reciprocal',
     'safelog',
+    'scan',
     'sequential',
     'sigmoid',
     'sign',
@@ -0,0 +1,91 @@
+# ******************************************************************************
+# Copyright 2017-2018 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ******************************************************************************
+"""
+Builds the computations of a script without executing them.
+"""
+from __future__ import division, print_function
+
+import os
+import runpy
+import sys
+
+import neon.transformers as ngt
+from neon.transformers.base import Transformer
+
+
+class _StopScript(Exception):
+    pass
+
+
+class PlanningTransformer(Transformer):
+    """
+    Transformer that records the computations added to it instead of compiling them, and
+    stops the script as soon as anything is executed.
+    """
+
+    def __init__(self, **kwargs):
+        super(PlanningTransformer, self).__init__(**kwargs)
+        self.computations = []
+
+    @property
+    def use_exop(self):
+        return False
+
+    def add_computation(self, computation):
+        self.computations.append(computation)
+        return self._stop
+
+    def _stop(self, *args, **kwargs):
+        raise _StopScript()
+
+    initialize_allocations = _stop
+    get_tensor_view_value = _stop
+    host_to_device = _stop
+    device_to_host = _stop
+
+
+def collect_computations(script, script_args=()):
+    """
+    Runs a script with make_transformer returning a PlanningTransformer, and returns the
+    computations it adds before it first tries to execute one.
+
+    Arguments:
+        script (str): Path to the script.
+        script_args: Command line arguments for the script.
+
+    Returns:
+        list: ComputationOps added by the script, in order.
+    """
+    transformers = []
+
+    def make_transformer():
+        transformer = PlanningTransformer()
+        transformers.append(transformer)
+        return transformer
+
+    saved = ngt.make_transformer, sys.argv, list(sys.path)
+    ngt.make_transformer = make_transformer
+    sys.argv = [script] + list(script_args)
+    sys.path.insert(0, os.path.dirname(os.path.abspath(script)))
+    try:
+        runpy.run_path(script, run_name='__main__')
+    except _StopScript:
+        pass
+    finally:
+        ngt.make_transformer, sys.argv, sys.path[:] = saved
+
+    return [computation for transformer in transformers
+            for computation in transformer.computations]
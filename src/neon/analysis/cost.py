@@ -0,0 +1,256 @@
+# ******************************************************************************
+# Copyright 2017-2018 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ******************************************************************************
+from __future__ import division
+
+import collections
+import time
+
+import numpy as np
+
+from neon.op_graph.op_graph import Op, AssignOp, DotOp, ElementWiseOp, ReductionOp, \
+    TensorSizeOp
+from neon.op_graph.convolution import ConvolutionOp, DeconvolutionOp, ConvDerivOp
+from neon.op_graph.pooling import PoolingOp, BpropPoolOp
+from neon.op_graph.scan import ScanOp
+from neon.analysis.memory import buffer_op, tensor_bytes, scope_name
+
+
+def _size(axes):
+    return int(np.prod(axes.lengths, dtype=np.int64))
+
+
+def _conv_macs(op):
+    """
+    Multiply-accumulates of a convolution, deconvolution or one of their derivatives,
+    which all cost the same as the forward op.
+    """
+    if isinstance(op, ConvDerivOp):
+        return _conv_macs(op.fprop.forwarded)
+    filter_size = 1
+    for name in "TRS":
+        filter_size *= op.conv_params.get(name, 1)
+    if isinstance(op, ConvolutionOp):
+        return _size(op.axes) * op.channel_axes.length * filter_size
+    # A deconvolution scatters every input element to each output channel
+    return _size(op.args[0].axes) * op.axes[1].length * filter_size
+
+
+def _pool_window(params):
+    window = 1
+    for name in "JTRS":
+        window *= params.get(name, 1)
+    return window
+
+
+def op_flops(op):
+    """
+    Estimated floating point operations performed by an op. A multiply-accumulate counts
+    as two operations; ops that only move or view data count as none.
+
+    Arguments:
+        op (Op): The op.
+
+    Returns:
+        int: The number of floating point operations.
+    """
+    if isinstance(op, DotOp):
+        return 2 * _size(op.axes) * _size(op.reduction_axes)
+    if isinstance(op, (ConvolutionOp, DeconvolutionOp, ConvDerivOp)):
+        flops = 2 * _conv_macs(op)
+        if len(op.args) > 2:
+            flops += _size(op.axes)
+        return flops
+    if isinstance(op, PoolingOp):
+        return _size(op.axes) * _pool_window(op.pool_params)
+    if isinstance(op, BpropPoolOp):
+        return _size(op.fprop.forwarded.axes) * _pool_window(op.pool_params)
+    if isinstance(op, ReductionOp):
+        return _size(op.args[0].axes)
+    if isinstance(op, ScanOp):
+        return op.axis.length * sum(op_flops(body_op) for body_op in op.body_ops)
+    if isinstance(op, ElementWiseOp):
+        return _size(op.axes)
+    if isinstance(op, TensorSizeOp) or not op.is_device_op or buffer_op(op) is not op:
+        return 0
+    if op.is_tensor_op:
+        # Other computing ops, such as batch norm, count one operation per element
+        return _size(op.axes)
+    return 0
+
+
+def op_bytes(op):
+    """
+    Estimated bytes moved by an op: the buffers it reads plus the buffer it writes. Views
+    move nothing.
+
+    Arguments:
+        op (Op): The op.
+
+    Returns:
+        int: The number of bytes read and written.
+    """
+    if isinstance(op, AssignOp):
+        return 2 * tensor_bytes(buffer_op(op.args[1]))
+    if not op.is_tensor_op or not op.is_device_op or buffer_op(op) is not op:
+        return 0
+    if isinstance(op, ScanOp):
+        return op.axis.length * sum(op_bytes(body_op) for body_op in op.body_ops)
+    reads = set(buffer_op(arg) for arg in op.args)
+    return tensor_bytes(op) + sum(tensor_bytes(arg) for arg in reads if arg.is_tensor_op)
+
+
+def cost_scope(op, depth=None):
+    """
+    The scope an op's cost is charged to. Convolution and pooling derivatives are charged
+    to the layer of the forward op.
+    """
+    fprop = getattr(op, 'fprop', None)
+    while fprop is not None:
+        op = fprop.forwarded
+        fprop = getattr(op, 'fprop', None)
+    return scope_name(op, depth)
+
+
+class CostModel(object):
+    """
+    FLOP and byte estimates for the ops of a computation, aggregated by scope.
+
+    Given the measured time of one execution, the achieved GFLOP/s of the whole
+    computation is reported; the time of each scope is not measured, so no achieved rate
+    is given per scope. Given the peak GFLOP/s and memory bandwidth of the machine, each
+    scope is reported as compute or memory bound from its arithmetic intensity, and the
+    roofline time of the computation, the sum over scopes of max(flops / peak,
+    bytes / bandwidth), is compared to the measured step time.
+
+    Arguments:
+        computation: A ComputationOp, an op or a list of ops.
+
+    Attributes:
+        costs: List of (op, flops, bytes) in execution order, for ops with any cost.
+        flops: Total floating point operations.
+        bytes: Total bytes moved.
+
+    Examples:
+        model = CostModel(train_computation)
+        print(model.report(step_time=0.35, peak_gflops=2000, bandwidth_gbs=100))
+    """
+
+    def __init__(self, computation):
+        if isinstance(computation, Op):
+            roots = [computation]
+        else:
+            roots = list(computation)
+        self.costs = []
+        for op in Op.ordered_ops(roots):
+            flops, nbytes = op_flops(op), op_bytes(op)
+            if flops or nbytes:
+                self.costs.append((op, flops, nbytes))
+        self.flops = sum(flops for _, flops, _ in self.costs)
+        self.bytes = sum(nbytes for _, _, nbytes in self.costs)
+
+    @property
+    def intensity(self):
+        """
+        Arithmetic intensity of the computation in FLOP per byte.
+        """
+        return self.flops / self.bytes if self.bytes else float('inf')
+
+    def by_scope(self, depth=None):
+        """
+        Costs aggregated by scope.
+
+        Arguments:
+            depth (int): Number of scope levels to group by, or None for full scopes.
+
+        Returns:
+            list: (scope name, flops, bytes) sorted by decreasing flops.
+        """
+        totals = collections.OrderedDict()
+        for op, flops, nbytes in self.costs:
+            total = totals.setdefault(cost_scope(op, depth), [0, 0])
+            total[0] += flops
+            total[1] += nbytes
+        return sorted(((scope, flops, nbytes) for scope, (flops, nbytes) in totals.items()),
+                      key=lambda item: (-item[1], -item[2], item[0]))
+
+    def report(self, step_time=None, peak_gflops=None, bandwidth_gbs=None, depth=None,
+               top=None):
+        """
+        Human readable per scope table of GFLOP, MB moved and arithmetic intensity.
+
+        Arguments:
+            step_time (float): Measured seconds per execution of the computation.
+            peak_gflops (float): Peak GFLOP/s of the machine.
+            bandwidth_gbs (float): Memory bandwidth of the machine in GB/s.
+            depth (int): Number of scope levels to group by.
+            top (int): Number of scopes to list, or None for all.
+
+        Returns:
+            str: The report.
+        """
+        roofline = peak_gflops is not None and bandwidth_gbs is not None
+        ridge = peak_gflops / bandwidth_gbs if roofline else None
+        scopes = self.by_scope(depth)
+
+        header = "{:<50} {:>10} {:>10} {:>9}".format("Scope", "GFLOP", "MB", "FLOP/B")
+        if roofline:
+            header += "  Bound"
+        lines = [header]
+        for scope, flops, nbytes in scopes[:top]:
+            intensity = flops / nbytes if nbytes else float('inf')
+            line = "{:<50} {:>10.3f} {:>10.2f} {:>9.2f}".format(
+                scope or "<no scope>", flops / 1e9, nbytes / 1e6, intensity)
+            if roofline:
+                line += "  " + ("compute" if intensity >= ridge else "memory")
+            lines.append(line)
+
+        lines.append("{:<50} {:>10.3f} {:>10.2f} {:>9.2f}".format(
+            "Total", self.flops / 1e9, self.bytes / 1e6, self.intensity))
+        if step_time is not None:
+            lines.append("Step time {:.4f} s: {:.1f} GFLOP/s, {:.1f} GB/s".format(
+                step_time, self.flops / step_time / 1e9, self.bytes / step_time / 1e9))
+        if roofline:
+            bound = sum(max(flops / (peak_gflops * 1e9), nbytes / (bandwidth_gbs * 1e9))
+                        for _, flops, nbytes in scopes)
+            line = "Roofline time {:.4f} s".format(bound)
+            if step_time is not None:
+                line += ", {:.1f}% of the step time".format(100 * bound / step_time)
+            lines.append(line)
+        return "\n".join(lines)
+
+
+def measure_step_time(transformer, computation, iterations=10, warmup=2):
+    """
+    Measures the mean time of one execution of a computation fed with random inputs.
+
+    Arguments:
+        transformer (Transformer): The transformer to run the computation with.
+        computation (ComputationOp): The computation.
+        iterations (int): Number of timed executions.
+        warmup (int): Number of untimed executions before timing.
+
+    Returns:
+        float: Mean seconds per execution.
+    """
+    function = transformer.add_computation(computation)
+    feed = [np.random.uniform(size=param.axes.lengths).astype(param.dtype)
+            for param in computation.parameters]
+    for _ in range(warmup):
+        function(*feed)
+    start = time.time()
+    for _ in range(iterations):
+        function(*feed)
+    return (time.time() - start) / iterations
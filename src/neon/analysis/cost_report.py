@@ -0,0 +1,90 @@
+# ******************************************************************************
+# Copyright 2017-2018 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ******************************************************************************
+"""
+Reports estimated FLOPs, bytes moved and arithmetic intensity per layer for the
+computations of one or more training scripts, optionally with the achieved GFLOP/s of
+each computation from a measured step time. The convnet-benchmarks scripts are the
+reference suite:
+
+    python -m neon.analysis.cost_report --measure --peak_gflops 3000 --bandwidth_gbs 100 \\
+        --script_args "-z 64" examples/convnet-benchmarks/*.py
+"""
+from __future__ import division, print_function
+
+import argparse
+import shlex
+from contextlib import closing
+
+import neon.transformers as ngt
+from neon.analysis.collect import collect_computations
+from neon.analysis.cost import CostModel, measure_step_time
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--depth', type=int, default=2,
+                        help="Number of scope levels to group costs by")
+    parser.add_argument('--top', type=int, default=None,
+                        help="Number of scopes to list")
+    parser.add_argument('--step_time', type=float, default=None,
+                        help="Measured seconds per step of the first computation of the first "
+                             "script")
+    parser.add_argument('--measure', action='store_true',
+                        help="Measure the step time of each computation with random inputs")
+    parser.add_argument('--iterations', type=int, default=10,
+                        help="Number of timed steps when measuring")
+    parser.add_argument('--peak_gflops', type=float, default=None,
+                        help="Peak GFLOP/s of the machine, for the roofline bound")
+    parser.add_argument('--bandwidth_gbs', type=float, default=None,
+                        help="Memory bandwidth of the machine in GB/s, for the roofline bound")
+    parser.add_argument('--script_args', type=str, default="",
+                        help="Arguments passed to every script")
+    parser.add_argument('scripts', nargs='+', help="Training scripts to analyze")
+    args = parser.parse_args(argv)
+
+    summary = []
+    for script_index, script in enumerate(args.scripts):
+        computations = collect_computations(script, shlex.split(args.script_args))
+        if not computations:
+            print("{} did not add any computation to a transformer".format(script))
+            continue
+        for index, computation in enumerate(computations):
+            model = CostModel(computation)
+            # The given step time is that of the first computation of the first script
+            step_time = args.step_time if script_index == 0 and index == 0 else None
+            if args.measure:
+                with closing(ngt.make_transformer()) as transformer:
+                    step_time = measure_step_time(transformer, computation,
+                                                  iterations=args.iterations)
+            print("{}: {}".format(script, computation.name))
+            print(model.report(step_time=step_time, peak_gflops=args.peak_gflops,
+                               bandwidth_gbs=args.bandwidth_gbs, depth=args.depth,
+                               top=args.top))
+            print()
+            summary.append((script, computation.name, model, step_time))
+
+    print("{:<60} {:>10} {:>10} {:>9} {:>10}".format("Computation", "GFLOP", "MB", "FLOP/B",
+                                                     "GFLOP/s"))
+    for script, name, model, step_time in summary:
+        achieved = "" if step_time is None else "{:.1f}".format(model.flops / step_time / 1e9)
+        print("{:<60} {:>10.3f} {:>10.2f} {:>9.2f} {:>10}".format(
+            "{}:{}".format(script, name), model.flops / 1e9, model.bytes / 1e6,
+            model.intensity, achieved))
+
+
+if __name__ == '__main__':
+    main()
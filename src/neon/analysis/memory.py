@@ -0,0 +1,323 @@
+# ******************************************************************************
+# Copyright 2017-2018 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ******************************************************************************
+from __future__ import division
+
+import collections
+
+import numpy as np
+
+from neon.op_graph.op_graph import Op, AssignableTensorOp, ComputationOp, IndexOp, ValueOp
+
+
+def tensor_bytes(op):
+    """
+    Size in bytes of the value produced by a tensor op, from the lengths and dtype of its
+    TensorDescription.
+
+    Arguments:
+        op (TensorOp): The op.
+
+    Returns:
+        int: Number of bytes needed to hold the value of op.
+    """
+    td = op.tensor_description()
+    if td is None:
+        return 0
+    return int(np.prod(td.axes.lengths, dtype=np.int64)) * td.dtype.itemsize
+
+
+def buffer_op(op):
+    """
+    The op whose buffer holds the value of op. Views such as reshapes, slices and
+    broadcasts share the buffer of their argument, and value ops share the buffer of
+    their tensor.
+
+    Arguments:
+        op (Op): The op.
+
+    Returns:
+        Op: The op that owns the storage.
+    """
+    op = op.forwarded.tensor
+    while isinstance(op, IndexOp):
+        op = op.args[0].forwarded.tensor
+    return op
+
+
+def is_activation(op):
+    """
+    Returns:
+        True if op owns a temporary buffer, i.e. a computed tensor that is not a variable,
+        placeholder or constant.
+    """
+    return (op.is_tensor_op
+            and buffer_op(op) is op
+            and not isinstance(op, AssignableTensorOp))
+
+
+def activation_lifetimes(roots):
+    """
+    Computes the lifetime of every activation buffer over the schedule given by
+    Op.ordered_ops(roots). A buffer is live from the step that produces it up to and
+    including the last step that reads it, directly or through a view. Buffers of roots,
+    and of the values returned by a ComputationOp root, stay live until the end of the
+    schedule.
+
+    Arguments:
+        roots: List of ops.
+
+    Returns:
+        tuple: The schedule (list of ops) and a list of (op, first_step, last_step)
+            tuples in schedule order.
+    """
+    ops = Op.ordered_ops(roots)
+    first = dict()
+    last = dict()
+    for step, op in enumerate(ops):
+        if is_activation(op):
+            first[op] = step
+            last[op] = step
+        reads = list(op.args)
+        if isinstance(op, ValueOp) and op.value_tensor is not None:
+            reads.append(op.value_tensor)
+        for arg in reads:
+            buffer = buffer_op(arg)
+            if buffer in first:
+                last[buffer] = step
+
+    results = []
+    for root in roots:
+        if isinstance(root, ComputationOp):
+            results.extend(root.values)
+        else:
+            results.append(root)
+    end = len(ops) - 1
+    for result in results:
+        buffer = buffer_op(result)
+        if buffer in first:
+            last[buffer] = end
+
+    lifetimes = [(op, first[op], last[op]) for op in ops if op in first]
+    return ops, lifetimes
+
+
+def peak_activation_bytes(roots):
+    """
+    Estimates the peak number of bytes of activations that are simultaneously live when
+    the graph rooted at roots is executed in Op.ordered_ops order. Variables, placeholders
+    and constants are not counted.
+
+    Arguments:
+        roots: List of ops.
+
+    Returns:
+        tuple: The peak number of bytes and the op being computed at the peak.
+
+    Examples:
+        before, _ = peak_activation_bytes([batch_cost])
+    """
+    plan = MemoryPlan(roots)
+    return plan.peak_bytes, plan.peak_op
+
+
+def scope_name(op, depth=None):
+    """
+    Name of the scope op was created in, truncated to the first depth levels.
+
+    Arguments:
+        op (Op): The op.
+        depth (int): Number of scope levels to keep, or None for all of them.
+
+    Returns:
+        str: The scope name, or an empty string for ops created outside of any scope.
+    """
+    if op.scope is None:
+        return ""
+    name = op.scope.name
+    if depth is not None:
+        name = "/".join(name.split("/")[:depth])
+    return name
+
+
+def format_bytes(nbytes):
+    """
+    Returns:
+        str: nbytes in human readable binary units.
+    """
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if abs(nbytes) < 1024 or unit == "GiB":
+            break
+        nbytes /= 1024
+    if unit == "B":
+        return "{:d} B".format(int(nbytes))
+    return "{:.1f} {}".format(nbytes, unit)
+
+
+class MemoryPlan(object):
+    """
+    Static memory plan of a computation.
+
+    Every activation gets a buffer for its lifetime over the Op.ordered_ops schedule,
+    sized from its TensorDescription. Storage that outlives a single execution is
+    accounted for separately, split into trainable variables, other persistent state
+    such as optimizer velocities and batch norm statistics, placeholders and constants.
+
+    Arguments:
+        computation: A ComputationOp, an op or a list of ops.
+
+    Attributes:
+        schedule: The ops in execution order.
+        lifetimes: List of (op, first_step, last_step, nbytes) for every activation.
+        peak_bytes: The largest number of activation bytes live at the same time.
+        peak_step: The schedule index at which peak_bytes is reached.
+        peak_op: The op computed at peak_step.
+        persistent: OrderedDict mapping each of "variables", "state", "inputs" and
+            "constants" to a list of (op, nbytes).
+
+    Examples:
+        plan = MemoryPlan(ng.computation(batch_cost, "all"))
+        print(plan.report(top=10))
+    """
+
+    categories = collections.OrderedDict([("variables", "Variables"),
+                                          ("state", "Optimizer and layer state"),
+                                          ("inputs", "Placeholders"),
+                                          ("constants", "Constants")])
+
+    def __init__(self, computation):
+        if isinstance(computation, Op):
+            roots = [computation]
+        else:
+            roots = list(computation)
+
+        self.schedule, lifetimes = activation_lifetimes(roots)
+        self.lifetimes = [(op, first, last, tensor_bytes(op))
+                          for op, first, last in lifetimes]
+
+        allocated = [0] * len(self.schedule)
+        freed = [0] * len(self.schedule)
+        for op, first, last, nbytes in self.lifetimes:
+            allocated[first] += nbytes
+            freed[last] += nbytes
+
+        self.peak_bytes, self.peak_step, live = 0, None, 0
+        for step in range(len(self.schedule)):
+            live += allocated[step]
+            if live > self.peak_bytes:
+                self.peak_bytes, self.peak_step = live, step
+            live -= freed[step]
+        self.peak_op = None if self.peak_step is None else self.schedule[self.peak_step]
+
+        # Variables are reached through the TensorValueOps that read them
+        self.persistent = collections.OrderedDict((key, []) for key in self.categories)
+        seen = set()
+        for op in self.schedule:
+            tensor = op.tensor
+            if isinstance(tensor, AssignableTensorOp) and tensor not in seen:
+                seen.add(tensor)
+                self.persistent[self._category(tensor)].append((tensor, tensor_bytes(tensor)))
+
+    @staticmethod
+    def _category(op):
+        if op.is_trainable:
+            return "variables"
+        elif op.is_placeholder:
+            return "inputs"
+        elif op.is_constant:
+            return "constants"
+        return "state"
+
+    def persistent_bytes(self, category=None):
+        """
+        Arguments:
+            category (str): One of the keys of persistent, or None for all of them.
+
+        Returns:
+            int: Bytes of storage that persists across executions.
+        """
+        if category is None:
+            return sum(self.persistent_bytes(key) for key in self.persistent)
+        return sum(nbytes for _, nbytes in self.persistent[category])
+
+    @property
+    def total_bytes(self):
+        """
+        Peak activation bytes plus all persistent storage.
+        """
+        return self.peak_bytes + self.persistent_bytes()
+
+    def live_at(self, step):
+        """
+        Returns:
+            list: (op, nbytes) of the activations live at step.
+        """
+        return [(op, nbytes) for op, first, last, nbytes in self.lifetimes
+                if first <= step <= last]
+
+    def scope_bytes(self, step=None, depth=None):
+        """
+        Live activation bytes grouped by the scope of the op that produced them.
+
+        Arguments:
+            step (int): The schedule step, by default the peak.
+            depth (int): Number of scope levels to group by, or None for full scopes.
+
+        Returns:
+            list: (scope name, bytes) sorted by decreasing bytes.
+        """
+        if step is None:
+            step = self.peak_step
+        totals = collections.defaultdict(int)
+        if step is not None:
+            for op, nbytes in self.live_at(step):
+                totals[scope_name(op, depth)] += nbytes
+        return sorted(totals.items(), key=lambda item: (-item[1], item[0]))
+
+    def report(self, top=10, depth=None):
+        """
+        Human readable summary of the plan.
+
+        Arguments:
+            top (int): Number of scopes and persistent tensors to list.
+            depth (int): Number of scope levels to group activations by.
+
+        Returns:
+            str: The report.
+        """
+        lines = []
+        peak_at = ""
+        if self.peak_op is not None:
+            peak_at = " at step {} of {} ({})".format(self.peak_step, len(self.schedule),
+                                                      self.peak_op.name)
+        lines.append("{:<34} {:>12}{}".format("Peak activations:",
+                                              format_bytes(self.peak_bytes), peak_at))
+        for key, title in self.categories.items():
+            lines.append("{:<34} {:>12} ({} tensors)".format(
+                title + ":", format_bytes(self.persistent_bytes(key)),
+                len(self.persistent[key])))
+        lines.append("{:<34} {:>12}".format("Total:", format_bytes(self.total_bytes)))
+
+        lines.append("Largest scopes at peak:")
+        for name, nbytes in self.scope_bytes(depth=depth)[:top]:
+            lines.append("  {:<60} {:>12}".format(name or "<no scope>", format_bytes(nbytes)))
+
+        largest = sorted(((op, nbytes) for key in ("variables", "state")
+                          for op, nbytes in self.persistent[key]),
+                         key=lambda item: (-item[1], item[0].name))
+        lines.append("Largest persistent tensors:")
+        for op, nbytes in largest[:top]:
+            lines.append("  {:<60} {:>12}".format(op.name, format_bytes(nbytes)))
+        return "\n".join(lines)
@@ -0,0 +1,106 @@
+# ******************************************************************************
+# Copyright 2017-2018 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ******************************************************************************
+"""
+Reports the memory needed by the computations of a training script without running them.
+
+The script is executed until it first tries to run a computation; every computation
+added to a transformer up to that point is planned with MemoryPlan.
+
+    python -m neon.analysis.memory_report examples/convnet-benchmarks/googlenet_v1.py
+    python -m neon.analysis.memory_report --budget 16G --batch_sizes 32,64,128 \\
+        examples/convnet-benchmarks/vgg_a.py
+"""
+from __future__ import division, print_function
+
+import argparse
+
+from neon.analysis.collect import collect_computations
+from neon.analysis.memory import MemoryPlan, format_bytes
+
+
+def parse_bytes(text):
+    """
+    Parses sizes such as 512M, 16G or 1048576.
+
+    Returns:
+        int: The number of bytes.
+    """
+    units = {'K': 1 << 10, 'M': 1 << 20, 'G': 1 << 30, 'T': 1 << 40}
+    text = text.strip().upper().rstrip('IB')
+    scale = 1
+    if text and text[-1] in units:
+        scale = units[text[-1]]
+        text = text[:-1]
+    try:
+        return int(float(text) * scale)
+    except ValueError:
+        raise argparse.ArgumentTypeError("invalid size: {}".format(text))
+
+
+def parse_ints(text):
+    try:
+        return [int(value) for value in text.split(',')]
+    except ValueError:
+        raise argparse.ArgumentTypeError("invalid list of integers: {}".format(text))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--top', type=int, default=10,
+                        help="Number of scopes and tensors to list")
+    parser.add_argument('--depth', type=int, default=None,
+                        help="Number of scope levels to group activations by")
+    parser.add_argument('--budget', type=parse_bytes, default=None,
+                        help="Memory budget, e.g. 16G, to check each computation against")
+    parser.add_argument('--batch_sizes', type=parse_ints, default=None,
+                        help="Comma separated batch sizes to plan for, passed to the script "
+                             "as --batch_size")
+    parser.add_argument('script', help="Training script to analyze")
+    parser.add_argument('script_args', nargs=argparse.REMAINDER,
+                        help="Arguments for the script")
+    args = parser.parse_args(argv)
+
+    runs = [(None, args.script_args)]
+    if args.batch_sizes:
+        runs = [(batch_size, args.script_args + ['--batch_size', str(batch_size)])
+                for batch_size in args.batch_sizes]
+
+    summary = []
+    for batch_size, script_args in runs:
+        computations = collect_computations(args.script, script_args)
+        if not computations:
+            print("{} did not add any computation to a transformer".format(args.script))
+            continue
+        for computation in computations:
+            plan = MemoryPlan(computation)
+            title = computation.name
+            if batch_size is not None:
+                title = "{} (batch size {})".format(title, batch_size)
+            print(title)
+            print(plan.report(top=args.top, depth=args.depth))
+            print()
+            summary.append((title, plan.total_bytes))
+
+    if args.budget is not None:
+        print("Budget: {}".format(format_bytes(args.budget)))
+        for title, total in summary:
+            fits = "fits" if total <= args.budget else "does not fit"
+            print("  {:<60} {:>12} {}".format(title, format_bytes(total), fits))
+
+
+if __name__ == '__main__':
+    main()
@@ -21,6 +21,8 @@ from neon.frontend.activation import Rectlin, Rectlinclip, Identity, Explin, Nor
     Logistic
 from neon.frontend.argparser import NeonArgparser
 from neon.frontend.arrayiterator import *
+from neon.frontend.prefetch import PrefetchIterator
+from neon.frontend.manifest_loader import ManifestDataLoader
 from neon.frontend.callbacks import *
 # from neon.frontend.callbacks2 import *
 from neon.frontend.layer import *
@@ -30,3 +32,4 @@ from neon.frontend.initializer import *
 from neon.frontend.data import *
 from neon.frontend.saver import *
 from neon.frontend.saverfile import *
+from neon.frontend.checkpoint import *
@@ -14,11 +14,16 @@
 # limitations under the License.
 # ******************************************************************************
 from __future__ import division
+import mmap
+import threading
+import weakref
 import numpy as np
 import neon as ng
 from future.utils import viewitems
 import six
+from six.moves import queue
 from neon.frontend import ax
+from neon.op_graph.axes import default_dtype
 import collections
 
 
@@ -26,7 +31,7 @@ class ArrayIterator(object):
 
     def __init__(self, data_arrays, batch_size,
                  total_iterations=None, tgt_key='label',
-                 shuffle=False):
+                 shuffle=False, preallocate=False, dtype=None):
         """
         During initialization, the input data will be converted to backend tensor objects
         (e.g. CPUTensor or GPUTensor). If the backend uses the GPU, the data is copied over to the
@@ -40,6 +45,13 @@ class ArrayIterator(object):
                                     If not provided, it will cycle through all of the data once.
             tgt_key (str): name of the target (labels) key in data_arrays
             shuffle (bool): if true, shuffles the dataset at the beginning of every epoch.
+            preallocate (bool): if true, every minibatch is copied into the same
+                                C-contiguous buffers, returned in the same dictionary, so
+                                that iterating allocates nothing. The buffers are
+                                overwritten by the next minibatch.
+            dtype (dtype): element type of the placeholders and, if preallocate is set, of
+                           the buffers, so that the values need no conversion when fed.
+                           Defaults to the neon default dtype.
         """
         # Treat singletons like list so that iteration follows same syntax
         self.batch_size = batch_size
@@ -67,12 +79,33 @@ class ArrayIterator(object):
         self.index = 0
         self.pos = 0
 
+        # The examples of the shard of this process, see shard
+        self.full_ndata = self.ndata
+        self.shard_start = 0
+        self.seed = None
+        self.epoch = 0
+
+        # The data arrays are not reordered when shuffling. Example i of the shuffled
+        # dataset is example permutation[i] of the data arrays, or example shard_start + i
+        # if None.
+        self.permutation = None
         if shuffle:
             self.shuffle_data()
         self.shuffle = shuffle
 
+        self.whole_epoch = total_iterations is None
         self.total_iterations = self.nbatches if total_iterations is None else total_iterations
 
+        self.dtype = default_dtype(dtype)
+        self.batch_bufs = None
+        if preallocate:
+            self.batch_bufs = {k: np.empty((self.batch_size,) + src.shape[1:], dtype=self.dtype)
+                               for k, src in self.data_arrays.items()}
+            # Gathers with np.take need an output of the source dtype, which is then cast
+            self.gather_bufs = {k: np.empty((self.batch_size,) + src.shape[1:], dtype=src.dtype)
+                                for k, src in self.data_arrays.items()
+                                if src.dtype != self.dtype}
+
     @property
     def nbatches(self):
         """
@@ -93,7 +126,7 @@ class ArrayIterator(object):
                 else:
                     _axis = ng.make_axis(length=sz, name=name)
                 p_axes += _axis
-            placeholders[k] = ng.placeholder(p_axes)
+            placeholders[k] = ng.placeholder(p_axes, dtype=self.dtype)
         if include_iteration:
             placeholders['iteration'] = ng.placeholder(axes=())
         return placeholders
@@ -108,24 +141,91 @@ class ArrayIterator(object):
         self.index = 0
         self.pos = 0
 
+    def shard(self, rank, world_size, seed=0):
+        """
+        Restricts this iterator to the shard of the dataset of one of world_size processes,
+        such as the processes of data parallel training, and starts again from its first
+        batch. Every shard has ndata // world_size examples, the remaining examples are
+        not used.
+
+        Without shuffling, the shard of rank is the rank-th contiguous part of the data
+        arrays. With shuffling, the examples are permuted at every epoch by a permutation
+        drawn from seed and the epoch, which is the same in every process, and the shard
+        of rank is the rank-th part of the permutation. The shards are disjoint at every
+        epoch, and all processes start a new epoch at the same batch.
+
+        Arguments:
+            rank (int): the index of the shard, from 0 to world_size - 1.
+            world_size (int): the number of shards.
+            seed (int): the seed of the permutations, the same in every process.
+
+        Returns:
+            ArrayIterator: this iterator.
+        """
+        if not 0 <= rank < world_size:
+            raise ValueError("rank must be between 0 and world_size - 1, not {}".format(rank))
+        self.ndata = self.full_ndata // world_size
+        if self.ndata < self.batch_size:
+            raise ValueError('Number of examples in a shard is smaller than the batch size')
+        self.shard_start = rank * self.ndata
+        self.seed = seed
+        self.epoch = 0
+        self.permutation = None
+        if self.shuffle:
+            self.shuffle_data()
+        if self.whole_epoch:
+            self.total_iterations = self.nbatches
+        self.reset()
+        return self
+
     def shuffle_data(self):
+        """
+        Shuffles the dataset, by drawing a new permutation of the examples and composing it
+        with the current one, which gives the same order as permuting the data arrays.
+        A sharded dataset takes its shard of the permutation of the epoch instead.
+        """
+        if self.seed is not None:
+            self.epoch += 1
+            order = np.random.RandomState(self.seed + self.epoch).permutation(self.full_ndata)
+            self.permutation = order[self.shard_start:self.shard_start + self.ndata]
+            return
         p = np.random.permutation(self.ndata)
-        self.data_arrays = {k: src[p] for k, src in self.data_arrays.items()}
+        self.permutation = p if self.permutation is None else self.permutation[p]
 
-    def get_at_most(self, bsz):
+    def get_indices_at_most(self, bsz):
         """
-        Returns at most bsz elements from the buffers along with the number of elements
-        actually retrieved, which may be fewer at the end of the dataset.
+        Returns at most bsz indices into the data arrays, as a slice or an array, along
+        with the number of indices actually retrieved, which may be fewer at the end of the
+        dataset.
         """
         bsz = min(bsz, self.ndata - self.pos)
-        oslice = slice(self.pos, self.pos + bsz)
-        batch_bufs = {k: src[oslice] for k, src in self.data_arrays.items()}
+        if self.permutation is None:
+            indices = slice(self.shard_start + self.pos, self.shard_start + self.pos + bsz)
+        else:
+            indices = self.permutation[self.pos:self.pos + bsz]
 
         self.pos = (self.pos + bsz) % self.ndata
         if self.pos == 0 and self.shuffle:
             self.shuffle_data()
 
-        return bsz, batch_bufs
+        return bsz, indices
+
+    def get_at_most(self, bsz):
+        """
+        Returns at most bsz elements from the buffers along with the number of elements
+        actually retrieved, which may be fewer at the end of the dataset.
+        """
+        bsz, indices = self.get_indices_at_most(bsz)
+        return bsz, {k: self.gather(src, indices) for k, src in self.data_arrays.items()}
+
+    @staticmethod
+    def gather(src, indices):
+        """
+        Returns the examples of src at indices, a view for a slice and a copy otherwise.
+        """
+        if isinstance(indices, slice):
+            return src[indices]
+        return np.take(src, indices, axis=0)
 
     def __next__(self):
         """
@@ -138,15 +238,295 @@ class ArrayIterator(object):
             raise StopIteration
         self.index += 1
 
-        total, batch_bufs = self.get_at_most(self.batch_size)
-        while total < self.batch_size:
-            bsz, next_batch_bufs = self.get_at_most(self.batch_size - total)
-            batch_bufs = {k: np.concatenate([batch_bufs[k], next_batch_bufs[k]])
-                          for k in batch_bufs}
-            total += bsz
+        if self.batch_bufs is not None:
+            return self.fill_batch_bufs()
+
+        total, indices = self.get_indices_at_most(self.batch_size)
+        if total < self.batch_size:
+            # The batch wraps around the end of the dataset, so its indices are joined to
+            # gather each array once
+            parts = [indices]
+            while total < self.batch_size:
+                bsz, indices = self.get_indices_at_most(self.batch_size - total)
+                parts.append(indices)
+                total += bsz
+            indices = np.concatenate([np.arange(part.start, part.stop)
+                                      if isinstance(part, slice) else part
+                                      for part in parts])
+        batch_bufs = {k: self.gather(src, indices) for k, src in self.data_arrays.items()}
         batch_bufs['iteration'] = self.index
         return batch_bufs
 
+    def fill_batch_bufs(self):
+        """
+        Copies the next minibatch into the preallocated buffers. A minibatch that wraps
+        around the end of the dataset is copied in parts, at its position in the buffers.
+        """
+        total = 0
+        while total < self.batch_size:
+            bsz, indices = self.get_indices_at_most(self.batch_size - total)
+            for k, src in self.data_arrays.items():
+                out = self.batch_bufs[k][total:total + bsz]
+                if isinstance(indices, slice):
+                    np.copyto(out, src[indices], casting='unsafe')
+                elif k in self.gather_bufs:
+                    gathered = self.gather_bufs[k][:bsz]
+                    np.take(src, indices, axis=0, out=gathered, mode='clip')
+                    np.copyto(out, gathered, casting='unsafe')
+                else:
+                    np.take(src, indices, axis=0, out=out, mode='clip')
+            total += bsz
+        self.batch_bufs['iteration'] = self.index
+        return self.batch_bufs
+
+    def next(self):
+        return self.__next__()
+
+    def __iter__(self):
+        return self
+
+
+def _read_ahead(tasks, pages):
+    """
+    Reads a byte of every page of the rows of each task into the page cache.
+    """
+    while True:
+        rows = tasks.get()
+        if rows is None:
+            return
+        for flat, row_bytes, row_pages in pages:
+            np.take(flat, (rows[:, np.newaxis] * row_bytes + row_pages).ravel())
+
+
+class MemmapArrayIterator(ArrayIterator):
+
+    def __init__(self, data_arrays, batch_size,
+                 total_iterations=None, tgt_key='label',
+                 shuffle=False, preallocate=False, dtype=None, readahead=0):
+        """
+        An ArrayIterator over memory mapped arrays, such as the sets of a dataset container
+        loaded by neon.frontend.data.load_dataset, which are read from disk as batches are
+        gathered, through the page cache of the OS, so the dataset need not fit in memory.
+
+        Arguments:
+            data_arrays, batch_size, total_iterations, tgt_key, shuffle, preallocate, dtype:
+                as for ArrayIterator.
+            readahead (int): number of batches after the current one whose pages are read
+                             into the page cache by a background thread, so that they are
+                             not read from disk when gathered. Disabled when 0.
+        """
+        super(MemmapArrayIterator, self).__init__(data_arrays, batch_size,
+                                                  total_iterations=total_iterations,
+                                                  tgt_key=tgt_key, shuffle=shuffle,
+                                                  preallocate=preallocate, dtype=dtype)
+        self.readahead = readahead
+        self.readahead_end = 0
+        self.readahead_tasks = None
+
+        # The bytes of each memory map, with the offsets of a byte in each page of a row
+        pages = []
+        for src in self.data_arrays.values():
+            if isinstance(src, np.memmap) and src.flags.c_contiguous and src.size > 0:
+                row_bytes = src.strides[0]
+                row_pages = np.append(np.arange(0, row_bytes, mmap.PAGESIZE), row_bytes - 1)
+                pages.append((src.reshape(-1).view(np.uint8), row_bytes, row_pages))
+        if readahead > 0 and pages:
+            self.readahead_tasks = queue.Queue()
+            reader = threading.Thread(target=_read_ahead, args=(self.readahead_tasks, pages))
+            reader.daemon = True
+            reader.start()
+            weakref.finalize(self, self.readahead_tasks.put, None)
+
+    def reset(self):
+        super(MemmapArrayIterator, self).reset()
+        self.readahead_end = 0
+
+    def schedule_readahead(self):
+        """
+        Hands the rows of the next readahead batches not handed yet to the reader. The rows
+        after the end of the epoch are those of the current order of the examples.
+        """
+        start = max(self.readahead_end, (self.index + 1) * self.batch_size)
+        end = (self.index + 1 + self.readahead) * self.batch_size
+        if start >= end:
+            return
+        rows = np.arange(start, end) % self.ndata
+        if self.permutation is not None:
+            rows = self.permutation[rows]
+        else:
+            rows += self.shard_start
+        self.readahead_tasks.put(np.sort(rows))
+        self.readahead_end = end
+
+    def __next__(self):
+        if self.readahead_tasks is not None and self.index < self.total_iterations:
+            self.schedule_readahead()
+        return super(MemmapArrayIterator, self).__next__()
+
+
+class BucketedSequenceIterator(object):
+
+    def __init__(self, data_arrays, batch_size, buckets, seq_key='review', pad_idx=0,
+                 pad_from='left', total_iterations=None, shuffle=False):
+        """
+        Groups sequences of different lengths into buckets, and returns batches of the
+        sequences of one bucket, padded to the length of the bucket instead of the length of
+        the longest sequence, with the length of the bucket under the key 'bucket'. A model
+        has one computation per bucket, made from the placeholders of the bucket, see
+        make_placeholders and BucketedComputation.
+
+        Arguments:
+            data_arrays (dict): maps keys to dictionaries with the data and the names of its
+                                axes, as for ArrayIterator. The data of seq_key is a list of
+                                1-D sequences, with axes ('N', 'REC').
+            batch_size (int): number of sequences in each batch.
+            buckets (list): lengths of the buckets. A sequence is put in the shortest
+                            bucket it fits in, and a sequence longer than every bucket is
+                            truncated to its last tokens, in the longest bucket.
+            seq_key (str): key of the sequences in data_arrays.
+            pad_idx (int): the index used for padding.
+            pad_from (str): 'left' or 'right', the side of the sequences padded.
+            total_iterations (int): number of minibatches to cycle through on this iterator.
+                                    If not provided, it will cycle through all of the data
+                                    once.
+            shuffle (bool): if true, shuffles the sequences of every bucket, and the order of
+                            the batches of the buckets, at the beginning of every epoch.
+        """
+        if pad_from not in ('left', 'right'):
+            raise ValueError("pad_from must be 'left' or 'right', not {}".format(pad_from))
+        self.batch_size = batch_size
+        self.seq_key = seq_key
+        self.shuffle = shuffle
+        self.axis_names = {k: v['axes'] for k, v in data_arrays.items()}
+        sequences = data_arrays[seq_key]['data']
+        self.ndata = len(sequences)
+        if self.ndata < self.batch_size:
+            raise ValueError('Number of examples is smaller than the batch size')
+
+        buckets = np.unique(buckets)
+        lengths = np.array([len(sequence) for sequence in sequences], dtype=np.int64)
+        bucket_ids = np.minimum(np.searchsorted(buckets, lengths), len(buckets) - 1)
+        lengths = np.minimum(lengths, buckets[-1])
+        tokens = np.concatenate([np.asarray(sequence[len(sequence) - length:])
+                                 for sequence, length in zip(sequences, lengths)])
+        token_starts = np.cumsum(lengths) - lengths
+
+        # The data of each bucket that is not empty, with the sequences padded
+        self.buckets = []
+        self.bucket_arrays = []
+        self.bucket_lengths = []
+        for bucket_id, bucket_length in enumerate(buckets):
+            rows = np.flatnonzero(bucket_ids == bucket_id)
+            if len(rows) == 0:
+                continue
+            row_lengths = lengths[rows]
+            padded = np.full((len(rows), bucket_length), pad_idx, dtype=np.int32)
+            # The row and column of each token of the bucket, and its index in tokens
+            token_rows = np.repeat(np.arange(len(rows)), row_lengths)
+            row_starts = np.repeat(np.cumsum(row_lengths) - row_lengths, row_lengths)
+            in_row = np.arange(row_lengths.sum()) - row_starts
+            columns = in_row
+            if pad_from == 'left':
+                columns = in_row + np.repeat(bucket_length - row_lengths, row_lengths)
+            token_index = np.repeat(token_starts[rows], row_lengths) + in_row
+            padded[token_rows, columns] = tokens[token_index]
+
+            arrays = {k: np.asarray(v['data'])[rows]
+                      for k, v in data_arrays.items() if k != seq_key}
+            arrays[seq_key] = padded
+            self.buckets.append(int(bucket_length))
+            self.bucket_arrays.append(arrays)
+            self.bucket_lengths.append(row_lengths)
+
+        self.bucket_nbatches = [-(-len(lengths) // self.batch_size)
+                                for lengths in self.bucket_lengths]
+        self.total_iterations = self.nbatches if total_iterations is None else total_iterations
+        self.real_tokens = 0
+        self.total_tokens = 0
+        self.index = 0
+        self.permutations = [None] * len(self.buckets)
+        self.new_epoch()
+
+    @property
+    def nbatches(self):
+        """
+        Return the number of minibatches in this dataset.
+        """
+        return sum(self.bucket_nbatches)
+
+    @property
+    def padding_efficiency(self):
+        """
+        The fraction of the tokens of the batches returned so far that are not padding.
+        """
+        return self.real_tokens / max(self.total_tokens, 1)
+
+    def new_epoch(self):
+        """
+        Starts a new epoch, from the first sequence of every bucket, with the batches of
+        the buckets in a new order if shuffling.
+        """
+        self.schedule = np.repeat(np.arange(len(self.buckets)), self.bucket_nbatches)
+        if self.shuffle:
+            self.schedule = np.random.permutation(self.schedule)
+            self.permutations = [np.random.permutation(len(lengths))
+                                 for lengths in self.bucket_lengths]
+        self.batch_idx = 0
+        self.bucket_pos = [0] * len(self.buckets)
+
+    def make_placeholders(self, include_iteration=False):
+        """
+        Returns the placeholders of the batches of every bucket, by bucket length. The
+        recurrent axis of the placeholders of a bucket has the length of the bucket.
+        """
+        ax.N.length = self.batch_size
+        placeholders = {}
+        for bucket_length, arrays in zip(self.buckets, self.bucket_arrays):
+            bucket_placeholders = {}
+            for k, axnm in self.axis_names.items():
+                p_axes = ng.make_axes([ax.N])
+                for i, sz in enumerate(arrays[k].shape[1:], 1):
+                    name = axnm[i] if axnm else None
+                    p_axes += ng.make_axis(length=sz, name=name)
+                bucket_placeholders[k] = ng.placeholder(p_axes)
+            if include_iteration:
+                bucket_placeholders['iteration'] = ng.placeholder(axes=())
+            placeholders[bucket_length] = bucket_placeholders
+        return placeholders
+
+    def reset(self):
+        """
+        Resets the iterator to the first batch of the epoch.
+        """
+        self.index = 0
+        self.new_epoch()
+
+    def __next__(self):
+        """
+        Returns the next minibatch, of the sequences of one bucket.
+        """
+        if self.index >= self.total_iterations:
+            raise StopIteration
+        self.index += 1
+        if self.batch_idx == len(self.schedule):
+            self.new_epoch()
+
+        bucket = self.schedule[self.batch_idx]
+        self.batch_idx += 1
+        pos = self.bucket_pos[bucket]
+        self.bucket_pos[bucket] += self.batch_size
+        # The last batch of a bucket is completed with its first sequences
+        rows = np.arange(pos, pos + self.batch_size) % len(self.bucket_lengths[bucket])
+        if self.permutations[bucket] is not None:
+            rows = self.permutations[bucket][rows]
+
+        self.real_tokens += int(self.bucket_lengths[bucket][rows].sum())
+        self.total_tokens += self.batch_size * self.buckets[bucket]
+        batch = {k: np.take(v, rows, axis=0) for k, v in self.bucket_arrays[bucket].items()}
+        batch['bucket'] = self.buckets[bucket]
+        batch['iteration'] = self.index
+        return batch
+
     def next(self):
         return self.__next__()
 
@@ -212,32 +592,64 @@ class SequentialArrayIterator(object):
         self.stride = time_steps if stride is None else stride
 
         if isinstance(data_arrays, dict):
-            # Get the total length of the sequence
-            # Assumes each value in data_arrays has the same length
-            self.ndata = len(six.next(six.itervalues(data_arrays)))
-
-            self.data_arrays = {k: v[:self.used_samples] for k, v in viewitems(data_arrays)}
-            # Throw away samples in data arrays that cannot form a batch
-            if self.get_prev_target:
-                self.data_arrays['prev_tgt'] = np.copy(self.data_arrays[self.tgt_key])
-
-            # Get the size of feature dimension for each array
-            self.feature_dims = {k: v.shape[1] if (len(v.shape) > 1) else 1
-                                 for k, v in viewitems(self.data_arrays)}
-
-            # Preallocate iterator arrays for each batch
-            self.samples = {k: np.squeeze(np.zeros((self.batch_size,
-                                                    self.seq_len,
-                                                    self.feature_dims[k]),
-                                                   dtype=v.dtype))
-                            for k, v in viewitems(self.data_arrays)}
+            self.set_data(data_arrays)
         else:
             raise ValueError("Must provide dict as input")
 
+        self.whole_epoch = total_iterations is None
+        self.total_iterations = self.nbatches if total_iterations is None else total_iterations
+
+    def set_data(self, data_arrays):
+        """
+        Sets the sequences the windows are taken from.
+        """
+        # Get the total length of the sequence
+        # Assumes each value in data_arrays has the same length
+        self.ndata = len(six.next(six.itervalues(data_arrays)))
+
+        self.data_arrays = {k: v[:self.used_samples] for k, v in viewitems(data_arrays)}
+        # Throw away samples in data arrays that cannot form a batch
+        if self.get_prev_target:
+            # The previous target is rolled from the target, and is not gathered
+            self.data_arrays['prev_tgt'] = self.data_arrays[self.tgt_key]
+
+        # Get the size of feature dimension for each array
+        self.feature_dims = {k: v.shape[1] if (len(v.shape) > 1) else 1
+                             for k, v in viewitems(self.data_arrays)}
+
+        # Preallocate iterator arrays for each batch
+        self.samples = {k: np.squeeze(np.zeros((self.batch_size,
+                                                self.seq_len,
+                                                self.feature_dims[k]),
+                                               dtype=v.dtype))
+                        for k, v in viewitems(self.data_arrays)}
+
         if self.nbatches < 1:
             raise ValueError('Number of examples is smaller than the batch size')
 
-        self.total_iterations = self.nbatches if total_iterations is None else total_iterations
+    def shard(self, rank, world_size):
+        """
+        Restricts this iterator to the shard of the sequence of one of world_size
+        processes, such as the processes of data parallel training, and starts again from
+        its first batch. The shard of rank is the rank-th of world_size contiguous parts of
+        the sequence, so the shards are disjoint and have the same number of batches.
+
+        Arguments:
+            rank (int): the index of the shard, from 0 to world_size - 1.
+            world_size (int): the number of shards.
+
+        Returns:
+            SequentialArrayIterator: this iterator.
+        """
+        if not 0 <= rank < world_size:
+            raise ValueError("rank must be between 0 and world_size - 1, not {}".format(rank))
+        length = len(six.next(six.itervalues(self.data_array))) // world_size
+        self.set_data({k: v[rank * length:(rank + 1) * length]
+                       for k, v in viewitems(self.data_array)})
+        if self.whole_epoch:
+            self.total_iterations = self.nbatches
+        self.reset()
+        return self
 
     @property
     def used_samples(self):
@@ -279,26 +691,35 @@ class SequentialArrayIterator(object):
                 samples[key]: numpy array with shape (batch_size, seq_len, feature_dim)
         """
 
-        while self.current_iter < self.total_iterations:
-            for batch_idx in range(self.batch_size):
-                if self.shuffle:
-                    strt_idx = self.start + (self.current_iter * self.stride)
-                    seq_start = strt_idx + (batch_idx * self.nbatches * self.seq_len)
-                else:
-                    strt_idx = self.start + (self.current_iter * self.batch_size * self.stride)
-                    seq_start = strt_idx + (batch_idx * self.stride)
+        # The indices of the windows of a batch are the offsets of the examples in the
+        # windows, plus the start of the batch, wrapped around the end of the sequence
+        if self.shuffle:
+            window_stride = self.nbatches * self.seq_len
+            batch_stride = self.stride
+        else:
+            window_stride = self.stride
+            batch_stride = self.batch_size * self.stride
+        window_starts = np.arange(self.batch_size)[:, np.newaxis] * window_stride
+        offsets = window_starts + np.arange(self.seq_len)
+        idcs = np.empty_like(offsets)
+        # The target is gathered reversed, and the previous target is rolled from it
+        gathered = {k: idcs[:, ::-1] if self.reverse_target and k == self.tgt_key else idcs
+                    for k in self.data_arrays if not (self.get_prev_target and k == 'prev_tgt')}
 
-                idcs = np.arange(seq_start, seq_start + self.seq_len) % self.ndata
-                for key in self.data_arrays.keys():
-                    self.samples[key][batch_idx] = self.data_arrays[key][idcs]
+        while self.current_iter < self.total_iterations:
+            np.add(offsets, self.start + self.current_iter * batch_stride, out=idcs)
+            np.remainder(idcs, self.ndata, out=idcs)
+            for key, key_idcs in gathered.items():
+                src = self.data_arrays[key]
+                out = self.samples[key].reshape(idcs.shape + src.shape[1:])
+                np.take(src, key_idcs, axis=0, out=out)
 
             self.current_iter += 1
 
-            if self.reverse_target:
-                self.samples[self.tgt_key][:] = self.samples[self.tgt_key][:, ::-1]
-
             if self.get_prev_target:
-                self.samples['prev_tgt'] = np.roll(self.samples[self.tgt_key], shift=1, axis=1)
+                tgt, prev_tgt = self.samples[self.tgt_key], self.samples['prev_tgt']
+                prev_tgt[:, 1:] = tgt[:, :-1]
+                prev_tgt[:, 0] = tgt[:, -1]
 
             if self.include_iteration is True:
                 self.samples['iteration'] = self.index
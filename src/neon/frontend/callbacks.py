@@ -62,12 +62,12 @@ def make_default_callbacks(transformer, output_file, frequency, train_computatio
 
 class CallbackContainer(object):
 
-    def __init__(self, transformer, output_file, total_iterations, callback_list=[]):
+    def __init__(self, transformer, output_file, total_iterations, callback_list=None):
         self.transformer = transformer
         '''
         just store a list of callbacks
         '''
-        self._callbacks = callback_list
+        self._callbacks = [] if callback_list is None else callback_list
         if output_file is None:
             if hasattr(self, 'callback_data'):
                 del self.callback_data
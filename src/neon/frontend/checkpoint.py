@@ -0,0 +1,246 @@
+# ******************************************************************************
+# Copyright 2017-2018 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ******************************************************************************
+from __future__ import division
+
+import copy
+import logging
+import math
+
+from orderedset import OrderedSet
+from six import string_types
+
+from neon.op_graph.op_graph import Op, AssignableTensorOp, ValueOp, RngOp
+from neon.frontend.graph import SubGraph
+from neon.analysis.memory import peak_activation_bytes
+from neon.util.names import NameScope
+
+logger = logging.getLogger(__name__)
+
+
+def checkpoint_gradients(roots, cost, segments=None):
+    """
+    Rewrites the backward part of a training graph so that activations inside checkpointed
+    segments are recomputed from the segment inputs when the backward pass needs them,
+    instead of being kept alive from the forward pass. Only the outputs of each segment
+    are retained, which trades extra forward compute for lower peak activation memory.
+
+    The forward graph is the graph computing cost; every other op reachable from roots,
+    such as the adjoints and the variable updates built by an optimizer, is part of the
+    backward graph. The recomputation of a segment is made to depend on the gradients
+    flowing into it with control dependencies, so that Op.ordered_ops schedules it when
+    the backward pass reaches the segment.
+
+    The pybind transformer does not lower control dependencies, so nGraph may schedule the
+    recomputation alongside the forward pass, or merge it back into the forward ops as a
+    common subexpression. The peak activation bytes returned are estimated over the
+    Op.ordered_ops schedule, not measured on the compiled one, and the backend may not
+    realize the reduction.
+
+    Arguments:
+        roots: List of ops of the training computation, e.g. the result of
+            optimizer(cost).
+        cost (TensorOp): The forward cost the gradients were taken of.
+        segments: None to checkpoint automatically every sqrt(N) of the N layers of the
+            forward graph, or a list of SubGraphs (e.g. layers), NameScopes or scope
+            names whose ops each form a segment.
+
+    Returns:
+        dict: Statistics about the rewrite; the number of segments, the number of
+            recomputed ops and the peak activation bytes before and after, estimated over
+            the Op.ordered_ops schedule.
+
+    Examples:
+        updates = optimizer(train_loss)
+        stats = checkpoint_gradients([updates], train_loss)
+        batch_cost = ng.sequential([updates, ng.mean(train_loss, out_axes=())])
+    """
+    if not isinstance(roots, (list, tuple)):
+        roots = [roots]
+    roots = list(roots)
+    before, _ = peak_activation_bytes(roots)
+
+    forward = Op.ordered_ops([cost])
+    forward_set = set(forward)
+    if segments is None:
+        segment_ops = _sqrt_segments(forward)
+    else:
+        segment_ops = [_segment_ops(segment, forward_set) for segment in segments]
+    segment_of = dict()
+    for index, ops in enumerate(segment_ops):
+        for op in ops:
+            segment_of.setdefault(op, index)
+
+    # Segment outputs are the checkpoints that stay live for the backward pass.
+    retained = set()
+    retained.add(cost.forwarded)
+    for op in forward:
+        for arg in op.all_deps:
+            arg = arg.forwarded
+            if arg in segment_of and segment_of[arg] != segment_of.get(op):
+                retained.add(arg)
+
+    clones = dict()
+
+    def recompute(op):
+        op = op.forwarded
+        if op in clones:
+            return clones[op]
+        if op not in segment_of or op in retained or not _is_recomputable(op):
+            return op
+        clone = _clone(op, [recompute(arg) for arg in op.args])
+        clones[op] = clone
+        return clone
+
+    backward = [op for op in Op.ordered_ops(roots) if op not in forward_set]
+    for op in backward:
+        args = [recompute(arg) for arg in op.args]
+        if any(new is not old.forwarded for new, old in zip(args, op.args)):
+            op._set_args(args)
+
+    _schedule_recomputation(roots, clones, segment_of, forward_set, len(segment_ops))
+
+    after, _ = peak_activation_bytes(roots)
+    stats = dict(segments=len(segment_ops),
+                 recomputed_ops=len(clones),
+                 estimated_peak_bytes_before=before,
+                 estimated_peak_bytes_after=after)
+    logger.info("Checkpointed %d segments, recomputing %d ops: estimated peak activation "
+                "memory over Op.ordered_ops %d -> %d bytes", stats['segments'],
+                stats['recomputed_ops'], before, after)
+    return stats
+
+
+def _segment_ops(segment, forward_set):
+    """
+    Forward ops belonging to a segment given as a SubGraph, NameScope or scope name.
+    """
+    if isinstance(segment, SubGraph):
+        return OrderedSet(op.forwarded for op in segment.ops if op.forwarded in forward_set)
+    if isinstance(segment, NameScope):
+        segment = segment.name
+    if not isinstance(segment, string_types):
+        raise ValueError("segments must be SubGraphs, NameScopes or scope names, "
+                         "not {}".format(type(segment)))
+    prefix = segment + "/"
+    return OrderedSet(op for op in forward_set
+                      if op.scope is not None
+                      and (op.scope.name == segment or op.scope.name.startswith(prefix)))
+
+
+def _sqrt_segments(forward):
+    """
+    Splits the forward ops into segments of about sqrt(N) consecutive layers, where a layer
+    is a run of ops created in the same scope. Ops created outside of any scope are left
+    out of the segments.
+    """
+    layers = []
+    current = None
+    for op in forward:
+        if op.scope is None:
+            continue
+        if current is None or op.scope is not current[0].scope:
+            current = [op]
+            layers.append(current)
+        else:
+            current.append(op)
+    if not layers:
+        return []
+
+    size = int(math.ceil(math.sqrt(len(layers))))
+    segments = []
+    for start in range(0, len(layers), size):
+        segments.append(OrderedSet(op for layer in layers[start:start + size]
+                                   for op in layer))
+    return segments
+
+
+def _is_recomputable(op):
+    """
+    True if op is a pure function of its args that can be evaluated a second time.
+    State, random ops, ops with side effects or sequencing constraints and ops that
+    refer to other ops outside of their args are kept.
+    """
+    if not op.is_tensor_op or isinstance(op, (AssignableTensorOp, ValueOp, RngOp)):
+        return False
+    if op.has_side_effects or op.control_deps:
+        return False
+    for key, value in op._attribute_items():
+        if key in ('_args', '_forward', '_control_deps', 'all_deps'):
+            continue
+        if isinstance(value, Op):
+            return False
+        if isinstance(value, (list, tuple, set, OrderedSet)):
+            if any(isinstance(item, Op) for item in value):
+                return False
+    return True
+
+
+def _clone(op, args):
+    """
+    Shallow copy of op with new args, a fresh name and no control dependencies.
+    """
+    clone = copy.copy(op)
+    clone.invalidate_property_cache('all_deps')
+    clone._control_deps = None
+    clone._forward = None
+    clone._tdcache_entry = None
+    clone._ordered_ops_memo = None
+    clone.metadata = dict(op.metadata, recompute=True)
+    clone.style = dict(op.style)
+    clone.uuid = next(Op._uuids)
+    clone.name = op.unscoped_name
+    clone._set_args(args)
+    return clone
+
+
+def _schedule_recomputation(roots, clones, segment_of, forward_set, num_segments):
+    """
+    Makes the first recomputed ops of each segment depend on the gradients that reach the
+    segment's consumers, so that the recomputation is not hoisted ahead of the backward
+    pass. Segments are handled from last to first, and a gradient is only used as a
+    trigger if it does not itself depend on the segment's recomputation.
+    """
+    by_segment = [list() for _ in range(num_segments)]
+    for op, clone in clones.items():
+        by_segment[segment_of[op]].append(clone)
+    all_clones = set(clones.values())
+
+    for segment_clones in reversed(by_segment):
+        if not segment_clones:
+            continue
+        recomputed = set(segment_clones)
+        ops = Op.ordered_ops(roots)
+        dependent = set()
+        for op in ops:
+            if op in recomputed or any(dep.forwarded in dependent for dep in op.all_deps):
+                dependent.add(op)
+
+        triggers = OrderedSet()
+        for op in ops:
+            if op in all_clones or op in forward_set:
+                continue
+            if not any(arg.forwarded in recomputed for arg in op.args):
+                continue
+            for arg in op.args:
+                arg = arg.forwarded
+                if arg not in dependent and arg not in forward_set and arg not in all_clones:
+                    triggers.add(arg)
+
+        for clone in segment_clones:
+            if any(arg.forwarded in recomputed for arg in clone.args):
+                continue
+            for trigger in triggers:
+                clone.add_control_dep(trigger)
@@ -171,9 +171,9 @@ class CommonSGDOptimizer(object):
         assert cost is not None
         assert variables is not None
 
-        return ng.doall([ng.assign(variable,
-                                   variable - self.compute_lr_op * ng.deriv(cost, variable))
-                         for variable in variables])
+        grads = ng.gradients(cost, variables)
+        return ng.doall([ng.assign(variable, variable - self.compute_lr_op * grad)
+                         for variable, grad in zip(variables, grads)])
 
 
 def conv_output_dim(X, S, padding, strides, pooling=False, dilation=1):
@@ -20,3 +20,5 @@ from neon.frontend.data.ptb import PTB
 from neon.frontend.data.imdb import IMDB
 from neon.frontend.data.librispeech import Librispeech
 from neon.frontend.data.shakespeare import Shakespeare
+from neon.frontend.data.memmap import save_dataset, load_dataset, dataset_exists
+from neon.frontend.data.ingest import ingest_images, channels_last
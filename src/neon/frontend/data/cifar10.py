@@ -16,16 +16,18 @@
 import numpy as np
 import os
 from neon.util.persist import pickle_load, valid_path_append, fetch_file
+from neon.frontend.data.memmap import ExportableDataset
 import tarfile
 
 
-class CIFAR10(object):
+class CIFAR10(ExportableDataset):
     """
     CIFAR10 data set from https://www.cs.toronto.edu/~kriz/cifar.html
 
     Arguments:
         path (str): Local path to copy data files.
     """
+    container_name = 'cifar10-neon'
 
     def __init__(self, path='.'):
         self.path = path
@@ -82,3 +84,11 @@ class CIFAR10(object):
                                     'axes': ('N',)}}
 
         return self.train_set, self.valid_set
+
+    def to_container(self, data):
+        train_set, valid_set = data
+        return {'train': train_set, 'valid': valid_set}, {}
+
+    def from_container(self, sets, attributes):
+        self.train_set, self.valid_set = sets['train'], sets['valid']
+        return self.train_set, self.valid_set
@@ -14,6 +14,7 @@
 # limitations under the License.
 # ******************************************************************************
 from neon.util.persist import valid_path_append, fetch_file, pickle_load
+from neon.frontend.data.memmap import ExportableDataset
 import os
 import numpy as np
 
@@ -74,7 +75,7 @@ def pad_sentences(sentences, pad_idx, pad_to_len=None, pad_from='left'):
     return X
 
 
-class IMDB(object):
+class IMDB(ExportableDataset):
     """
     IMDB data set from http://www.aclweb.org/anthology/P11-1015..
 
@@ -84,11 +85,13 @@ class IMDB(object):
         vocab_size (int): vocabulary size limite
         sentence_length (int): the max sentence length to pad the data to
         pad_idx (int): the index value used for padding
-        shuffle (bool): whether to shuffle the data
+        shuffle (bool): whether to shuffle the data. A container exported from shuffled
+                        data keeps the order of that one shuffle.
+        test_split (float): fraction of the reviews in the validation set.
     """
 
     def __init__(self, path='.', vocab_size=20000, sentence_length=128,
-                 pad_idx=0, shuffle=True):
+                 pad_idx=0, shuffle=True, test_split=0.2):
         self.path = path
         self.url = 'https://s3.amazonaws.com/text-datasets'
         self.filename = 'imdb.pkl'
@@ -97,8 +100,27 @@ class IMDB(object):
         self.sentence_length = sentence_length
         self.shuffle = shuffle
         self.pad_idx = pad_idx
-
-    def load_data(self, test_split=0.2):
+        self.test_split = test_split
+        self.container_name = 'imdb-neon-{}-{}-{}-{}-{}'.format(
+            vocab_size, sentence_length, pad_idx, 'shuffled' if shuffle else 'ordered',
+            test_split)
+
+    def load_data(self, test_split=None, pad=True):
+        """
+        Fetch the IMDB dataset and load it into memory.
+
+        Arguments:
+            test_split (float): fraction of the reviews in the validation set. Defaults to
+                                the test_split of the dataset.
+            pad (bool): if true, the reviews are padded to sentence_length. Otherwise they
+                        are lists of arrays of different lengths, truncated to
+                        sentence_length, as used by a BucketedSequenceIterator.
+
+        Returns:
+            dict: the train and valid sets.
+        """
+        if test_split is None:
+            test_split = self.test_split
         self.data_dict = {}
         self.vocab = None
         workdir, filepath = valid_path_append(self.path, '', self.filename)
@@ -109,13 +131,17 @@ class IMDB(object):
             X, y = pickle_load(f)
 
         X = preprocess_text(X, self.vocab_size)
-        X = pad_sentences(
-            X, pad_idx=self.pad_idx, pad_to_len=self.sentence_length, pad_from='left')
+        if pad:
+            X = pad_sentences(
+                X, pad_idx=self.pad_idx, pad_to_len=self.sentence_length, pad_from='left')
+        else:
+            length = self.sentence_length
+            X = [np.array(x if length is None else x[-length:], dtype=np.int32) for x in X]
 
         if self.shuffle:
             indices = np.arange(len(y))
             np.random.shuffle(indices)
-            X = X[indices]
+            X = X[indices] if pad else [X[i] for i in indices]
             y = np.asarray(y)[indices]
 
         # split the data
@@ -139,3 +165,17 @@ class IMDB(object):
                                    'label': {'data': y_test,
                                              'axes': ('N',)}}
         return self.data_dict
+
+    def to_container(self, data):
+        return data, {'nclass': int(self.nclass), 'vocab_size': self.vocab_size,
+                      'sentence_length': self.sentence_length, 'pad_idx': self.pad_idx,
+                      'shuffle': self.shuffle, 'test_split': self.test_split}
+
+    def from_container(self, sets, attributes):
+        for name in ('vocab_size', 'sentence_length', 'pad_idx', 'shuffle', 'test_split'):
+            if attributes.get(name) != getattr(self, name):
+                raise ValueError("The container was exported with {}={}, not {}"
+                                 .format(name, attributes.get(name), getattr(self, name)))
+        self.nclass = attributes['nclass']
+        self.data_dict = sets
+        return self.data_dict
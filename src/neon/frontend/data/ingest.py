@@ -0,0 +1,105 @@
+# ******************************************************************************
+# Copyright 2017-2018 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ******************************************************************************
+"""
+Ingest of in-memory image datasets as PNG files, for manifest based data loaders.
+"""
+from __future__ import division
+import multiprocessing
+import os
+
+import numpy as np
+from PIL import Image
+from tqdm import tqdm
+
+
+def channels_last(image):
+    """
+    Transposes a (C, H, W) image to (H, W, C), as PIL expects.
+    """
+    return np.transpose(image, axes=(1, 2, 0))
+
+
+def write_png(image, filename):
+    """
+    Encodes image as a PNG file. The file is written under a temporary name and renamed,
+    so that an interrupted ingest never leaves a truncated image behind.
+    """
+    Image.fromarray(np.ascontiguousarray(image, dtype=np.uint8)).save(filename + '.tmp',
+                                                                      format='PNG')
+    os.rename(filename + '.tmp', filename)
+
+
+def _write_pngs(task):
+    images, filenames, transform = task
+    for image, filename in zip(images, filenames):
+        write_png(image if transform is None else transform(image), filename)
+    return len(filenames)
+
+
+def ingest_images(images, filenames, transform=None, workers=None, chunk_size=500,
+                  overwrite=False):
+    """
+    Encodes images as PNG files, over a pool of processes that each encode and write a chunk
+    of images at a time. Files that already exist are skipped, so that an interrupted
+    ingest resumes where it stopped.
+
+    The manifests should be written from filenames, which keeps their order the order of
+    the images whichever process writes them.
+
+    Arguments:
+        images (numpy.ndarray): the images, indexed by their first axis.
+        filenames (list): the path of the PNG file of each image. Directories are created
+                          as needed.
+        transform (callable): applied to each image before it is encoded, such as
+                              channels_last. Must be picklable, e.g. a module level
+                              function or a functools.partial of one.
+        workers (int): the number of processes. Defaults to the number of CPUs. With 0,
+                       the default with a single CPU, the images are written in this
+                       process.
+        chunk_size (int): the number of images sent to a process at a time.
+        overwrite (bool): whether to write the files that already exist.
+
+    Returns:
+        int: the number of images written.
+    """
+    if len(images) != len(filenames):
+        raise ValueError("Got {} images and {} filenames".format(len(images), len(filenames)))
+    for directory in set(os.path.dirname(filename) for filename in filenames):
+        if directory != '' and not os.path.isdir(directory):
+            os.makedirs(directory)
+
+    indices = [idx for idx, filename in enumerate(filenames)
+               if overwrite or not os.path.exists(filename)]
+    tasks = (([images[idx] for idx in chunk], [filenames[idx] for idx in chunk], transform)
+             for chunk in (indices[start:start + chunk_size]
+                           for start in range(0, len(indices), chunk_size)))
+    if workers is None:
+        workers = multiprocessing.cpu_count()
+        workers = workers if workers > 1 else 0
+
+    with tqdm(total=len(indices)) as progress:
+        if workers == 0:
+            for task in tasks:
+                progress.update(_write_pngs(task))
+        else:
+            pool = multiprocessing.Pool(workers)
+            try:
+                for count in pool.imap_unordered(_write_pngs, tasks):
+                    progress.update(count)
+            finally:
+                pool.terminate()
+                pool.join()
+    return len(indices)
@@ -0,0 +1,183 @@
+# ******************************************************************************
+# Copyright 2017-2018 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ******************************************************************************
+"""
+Dataset containers, which store datasets on disk so that they are loaded as memory maps.
+
+A container is a directory with a .npy file per array and a JSON header, header.json:
+
+    {"format": "neon-dataset", "version": 1,
+     "sets": {"train": {"image": {"file": "train/image.npy", "axes": ["N", "H", "W"],
+                                  "dtype": "|u1", "shape": [60000, 28, 28]}, ...}, ...},
+     "attributes": {...}}
+
+The header is written last, so a container is only found once it is complete.
+"""
+from __future__ import division
+import json
+import os
+
+import numpy as np
+
+FORMAT = 'neon-dataset'
+FORMAT_VERSION = 1
+HEADER = 'header.json'
+
+
+def dataset_exists(directory):
+    """
+    Returns whether directory holds a complete dataset container.
+    """
+    return os.path.exists(os.path.join(directory, HEADER))
+
+
+def save_dataset(directory, sets, attributes=None):
+    """
+    Saves the sets of a dataset as a dataset container.
+
+    Arguments:
+        directory (str): the directory of the container, created if needed.
+        sets (dict): maps set names, such as 'train', to dictionaries that map keys to
+                     {'data': array, 'axes': axes names or None}, as loaded by the datasets.
+        attributes (dict): other JSON serializable values of the dataset, such as its
+                           vocabulary.
+    """
+    header_path = os.path.join(directory, HEADER)
+    if os.path.exists(header_path):
+        os.remove(header_path)
+    header = {'format': FORMAT, 'version': FORMAT_VERSION, 'sets': {},
+              'attributes': attributes or {}}
+    for set_name, arrays in sets.items():
+        set_dir = os.path.join(directory, set_name)
+        if not os.path.isdir(set_dir):
+            os.makedirs(set_dir)
+        header['sets'][set_name] = {}
+        for key, value in arrays.items():
+            data = np.asarray(value['data'])
+            if data.dtype.hasobject:
+                raise ValueError("Cannot save the arrays of objects of {}/{}"
+                                 .format(set_name, key))
+            filename = '{}/{}.npy'.format(set_name, key)
+            # Replace the file instead of truncating it, which would invalidate the memory
+            # maps of a previous save
+            path = os.path.join(directory, filename)
+            with open(path + '.tmp', 'wb') as f:
+                np.save(f, data)
+            os.rename(path + '.tmp', path)
+            axes = value.get('axes')
+            header['sets'][set_name][key] = {'file': filename,
+                                             'axes': None if axes is None else list(axes),
+                                             'dtype': data.dtype.str,
+                                             'shape': list(data.shape)}
+
+    with open(header_path + '.tmp', 'w') as f:
+        json.dump(header, f, indent=1, sort_keys=True)
+    os.rename(header_path + '.tmp', header_path)
+
+
+def load_dataset(directory, mmap_mode='r'):
+    """
+    Loads the sets of a dataset container, with the arrays memory mapped.
+
+    Arguments:
+        directory (str): the directory of the container.
+        mmap_mode (str): the mode of the memory maps, see numpy.load, or None to read the
+                         arrays into memory.
+
+    Returns:
+        tuple: the sets, in the format given to save_dataset, and the attributes.
+    """
+    with open(os.path.join(directory, HEADER)) as f:
+        header = json.load(f)
+    if header.get('format') != FORMAT:
+        raise ValueError("{} is not a dataset container".format(directory))
+    if header['version'] > FORMAT_VERSION:
+        raise ValueError("The dataset container was saved with version {}, newer than the "
+                         "supported version {}".format(header['version'], FORMAT_VERSION))
+
+    sets = {}
+    for set_name, arrays in header['sets'].items():
+        sets[set_name] = {}
+        for key, entry in arrays.items():
+            data = np.load(os.path.join(directory, entry['file']), mmap_mode=mmap_mode)
+            if data.dtype.str != entry['dtype'] or list(data.shape) != entry['shape']:
+                raise ValueError("{} does not match the header of the dataset container"
+                                 .format(entry['file']))
+            axes = entry['axes']
+            sets[set_name][key] = {'data': data,
+                                   'axes': None if axes is None else tuple(axes)}
+    return sets, header['attributes']
+
+
+class ExportableDataset(object):
+    """
+    A dataset that can be exported once to a dataset container, and then loaded from it
+    as memory maps instead of being decoded again.
+
+    Subclasses implement load_data, to_container and from_container, and set
+    container_name, the default directory of the container within path. Subclasses whose
+    load_data loads the container itself implement read_data, to decode the dataset.
+    """
+    container_name = None
+
+    def container_path(self, directory=None):
+        if directory is not None:
+            return directory
+        return os.path.join(os.path.expanduser(self.path), self.container_name)
+
+    def export(self, directory=None, overwrite=False):
+        """
+        Loads the dataset with read_data and saves it as a dataset container, unless the
+        container already exists.
+
+        Arguments:
+            directory (str): the directory of the container. Defaults to container_name
+                             within the path of the dataset.
+            overwrite (bool): whether to save the container again if it exists.
+
+        Returns:
+            str: the directory of the container.
+        """
+        directory = self.container_path(directory)
+        if overwrite or not dataset_exists(directory):
+            sets, attributes = self.to_container(self.read_data())
+            save_dataset(directory, sets, attributes)
+        return directory
+
+    def load_memmap(self, directory=None, mmap_mode='r'):
+        """
+        Loads the dataset from its container, exporting it first if needed, and returns
+        it as load_data does, with the arrays memory mapped.
+        """
+        sets, attributes = load_dataset(self.export(directory), mmap_mode=mmap_mode)
+        return self.from_container(sets, attributes)
+
+    def read_data(self):
+        """
+        Decodes the dataset from its original files, as load_data by default.
+        """
+        return self.load_data()
+
+    def to_container(self, data):
+        """
+        Returns the sets and attributes to save, from the value returned by load_data.
+        """
+        raise NotImplementedError()
+
+    def from_container(self, sets, attributes):
+        """
+        Returns the value load_data returns, from the sets and attributes loaded.
+        """
+        raise NotImplementedError()
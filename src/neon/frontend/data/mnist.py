@@ -15,17 +15,18 @@
 # ******************************************************************************
 import gzip
 from neon.util.persist import ensure_dirs_exist, pickle_load, valid_path_append, fetch_file
+from neon.frontend.data.memmap import ExportableDataset
+from neon.frontend.data.ingest import ingest_images
 import os
-from tqdm import tqdm
 import numpy as np
-from PIL import Image
 
 
-class MNIST(object):
+class MNIST(ExportableDataset):
     """
     Arguments:
         path (str): Local path to copy data files.
     """
+    container_name = 'mnist-neon'
 
     def __init__(self, path='.'):
         self.path = path
@@ -62,8 +63,16 @@ class MNIST(object):
 
         return self.train_set, self.valid_set
 
+    def to_container(self, data):
+        train_set, valid_set = data
+        return {'train': train_set, 'valid': valid_set}, {}
 
-def ingest_mnist(root_dir, overwrite=False):
+    def from_container(self, sets, attributes):
+        self.train_set, self.valid_set = sets['train'], sets['valid']
+        return self.train_set, self.valid_set
+
+
+def ingest_mnist(root_dir, overwrite=False, workers=None):
     '''
     Save MNIST dataset as PNG files
     '''
@@ -75,25 +84,23 @@ def ingest_mnist(root_dir, overwrite=False):
     if (all([os.path.exists(manifest) for manifest in manifest_files]) and not overwrite):
         return manifest_files
 
-    dataset = {k: s for k, s in zip(set_names, MNIST(out_dir, False).load_data())}
+    dataset = {k: s for k, s in zip(set_names, MNIST(out_dir).load_data())}
 
-    # Write out label files and setup directory structure
-    lbl_paths, img_paths = dict(), dict(train=dict(), val=dict())
+    # Write out label files
+    lbl_paths = dict()
     for lbl in range(10):
         lbl_paths[lbl] = ensure_dirs_exist(os.path.join(out_dir, 'labels', str(lbl) + '.txt'))
         np.savetxt(lbl_paths[lbl], [lbl], fmt='%d')
-        for setn in ('train', 'val'):
-            img_paths[setn][lbl] = ensure_dirs_exist(os.path.join(out_dir, setn, str(lbl) + '/'))
 
     # Now write out image files and manifests
     for setn, manifest in zip(set_names, manifest_files):
-        records = []
-        for idx, (img, lbl) in enumerate(tqdm(zip(*dataset[setn]))):  # noqa pylint: disable=zip-builtin-not-iterating
-            img_path = os.path.join(img_paths[setn][lbl], str(idx) + '.png')
-            im = Image.fromarray(img)
-            im.save(os.path.join(out_dir, img_path), format='PNG')
-            records.append((os.path.relpath(img_path, out_dir),
-                            os.path.relpath(lbl_paths[lbl], out_dir)))
+        labels = dataset[setn]['label']['data']
+        img_paths = [os.path.join(out_dir, setn, str(lbl), str(idx) + '.png')
+                     for idx, lbl in enumerate(labels)]
+        ingest_images(dataset[setn]['image']['data'], img_paths, workers=workers,
+                      overwrite=overwrite)
+        records = [(os.path.relpath(img_path, out_dir), os.path.relpath(lbl_paths[lbl], out_dir))
+                   for img_path, lbl in zip(img_paths, labels)]
         np.savetxt(manifest, records, fmt='%s,%s')
 
     return manifest_files
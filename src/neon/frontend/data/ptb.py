@@ -14,11 +14,13 @@
 # limitations under the License.
 # ******************************************************************************
 from neon.util.persist import valid_path_append, fetch_file
+from neon.frontend.data.memmap import ExportableDataset
+from neon.frontend.data.text import tokenize, token_values, build_vocab, index_tokens
 import os
 import numpy as np
 
 
-class PTB(object):
+class PTB(ExportableDataset):
     """
     Penn Treebank data set from http://arxiv.org/pdf/1409.2329v5.pdf
 
@@ -38,29 +40,43 @@ class PTB(object):
                             valid=dict(filename='ptb.valid.txt', size=399782))
         self.shift_target = shift_target
         self.use_words = use_words
+        self.container_name = 'ptb-neon-{}-{}'.format('words' if use_words else 'chars',
+                                                      'shifted' if shift_target else 'same')
 
-    def load_data(self):
+    def load_data(self, cache=True):
+        """
+        Loads the token indices of the train, test and valid sets, and their targets.
+
+        Arguments:
+            cache (bool): if true, the tokens are saved once as a dataset container next to
+                          the text files, and loaded from it as memory maps afterwards.
+
+        Returns:
+            dict: maps each phase to {'inp_txt': indices, 'tgt_txt': target indices}.
+        """
+        if cache:
+            return self.load_memmap()
+        return self.read_data()
+
+    def read_data(self):
+        """
+        Tokenizes the text files, with the vocabulary of the train set.
+        """
         self.data_dict = {}
-        self.vocab = None
+        vocab = None
         for phase in ['train', 'test', 'valid']:
             filename, filesize = self.filemap[phase]['filename'], self.filemap[phase]['size']
             workdir, filepath = valid_path_append(self.path, '', filename)
             if not os.path.exists(filepath):
                 fetch_file(self.url, filename, filepath, filesize)
 
-            tokens = open(filepath).read()  # add tokenization here if necessary
-
-            if self.use_words:
-                tokens = tokens.strip().split()
-
-            self.vocab = sorted(set(tokens)) if self.vocab is None else self.vocab
-
-            # vocab dicts
-            self.token_to_index = dict((t, i) for i, t in enumerate(self.vocab))
-            self.index_to_token = dict((i, t) for i, t in enumerate(self.vocab))
+            tokens = tokenize(open(filepath).read(), self.use_words)
 
             # map tokens to indices
-            X = np.asarray([self.token_to_index[t] for t in tokens], dtype=np.uint32)
+            if vocab is None:
+                vocab, X = build_vocab(tokens)
+            else:
+                X = index_tokens(tokens, vocab)
             if self.shift_target:
                 y = np.concatenate((X[1:], X[:1]))
             else:
@@ -68,4 +84,21 @@ class PTB(object):
 
             self.data_dict[phase] = {'inp_txt': X, 'tgt_txt': y}
 
+        self.set_vocab(token_values(vocab))
+        return self.data_dict
+
+    def set_vocab(self, vocab):
+        self.vocab = vocab
+        self.token_to_index = dict((t, i) for i, t in enumerate(self.vocab))
+        self.index_to_token = dict((i, t) for i, t in enumerate(self.vocab))
+
+    def to_container(self, data):
+        sets = {phase: {k: {'data': v, 'axes': None} for k, v in arrays.items()}
+                for phase, arrays in data.items()}
+        return sets, {'vocab': list(self.vocab)}
+
+    def from_container(self, sets, attributes):
+        self.set_vocab(attributes['vocab'])
+        self.data_dict = {phase: {k: v['data'] for k, v in arrays.items()}
+                          for phase, arrays in sets.items()}
         return self.data_dict
@@ -14,11 +14,12 @@
 # limitations under the License.
 # ******************************************************************************
 from neon.util.persist import valid_path_append, fetch_file
+from neon.frontend.data.memmap import ExportableDataset
+from neon.frontend.data.text import tokenize, token_values, build_vocab, index_tokens
 import os
-import numpy as np
 
 
-class Shakespeare(object):
+class Shakespeare(ExportableDataset):
     """
     Shakespeare Dataset from http://cs.stanford.edu/people/karpathy/char-rnn/shakespeare_input.txt
     Arguments:
@@ -28,10 +29,13 @@ class Shakespeare(object):
         filename (string, optional): name of the text file
         train_split (float, optional): Value between 0 and 1
                              Ratio of the text to set aside for training
+        cache (bool, optional): if true, the digitized text is saved once as a dataset
+                                container next to the text file, and loaded from it as
+                                memory maps afterwards
 
     """
 
-    def __init__(self, path='./data/', url=None, filename=None, train_split=.9):
+    def __init__(self, path='./data/', url=None, filename=None, train_split=.9, cache=True):
         self.path = path
         self.vocab = None
         if(url is None):
@@ -42,12 +46,12 @@ class Shakespeare(object):
             self.filename = filename
 
         self.train_split = train_split
-        # Load the text and split to train and test
-        self.train, self.test = self.load_data()
-        # Digitize the train set (convert letters to integers).
-        self.train = self.digitize(text=self.train)
-        # Digitize the test set using train set vocab (convert letters to integers)
-        self.test = self.digitize(text=self.test)
+        self.container_name = '{}-neon-{}'.format(os.path.splitext(self.filename)[0],
+                                                  train_split)
+        if cache:
+            self.train, self.test = self.load_memmap()
+        else:
+            self.train, self.test = self.read_data()
 
     def load_data(self):
         self.data_dict = {}
@@ -62,11 +66,34 @@ class Shakespeare(object):
 
         return train, test
 
+    def read_data(self):
+        """
+        Loads the text and digitizes the train and test sets, with the vocab of the train set
+        """
+        train, test = self.load_data()
+        # Digitize the train set (convert letters to integers).
+        train = self.digitize(text=train)
+        # Digitize the test set using train set vocab (convert letters to integers)
+        test = self.digitize(text=test)
+        return train, test
+
+    def to_container(self, data):
+        sets = {name: {'text': {'data': text, 'axes': None}}
+                for name, text in zip(('train', 'test'), data)}
+        return sets, {'vocab': list(self.vocab)}
+
+    def from_container(self, sets, attributes):
+        self.set_vocab(attributes['vocab'])
+        return sets['train']['text']['data'], sets['test']['text']['data']
+
     def build_vocab(self, text):
         """
         Build a vocabulary from given text and store as the object's vocab
         """
-        self.vocab = sorted(set(text))
+        self.set_vocab(sorted(set(text)))
+
+    def set_vocab(self, vocab):
+        self.vocab = vocab
 
         # vocab dicts
         self.token_to_index = dict((t, i + 1) for i, t in enumerate(self.vocab))
@@ -81,11 +108,11 @@ class Shakespeare(object):
         Convert given text to a sequence of integers (indices)
         Builds a vocabulary if one doesn't already exist
         """
+        tokens = tokenize(text)
         if self.vocab is None:
-            self.build_vocab(text=text)
+            self.set_vocab(token_values(build_vocab(tokens)[0]))
 
         # map tokens to indices
         # if the token is not in the vocabulary, put a zero (unknown)
-        text_dig = np.asarray([self.token_to_index[t] if t in self.vocab else 0 for t in text],
-                              dtype=np.uint32)
-        return text_dig
+        vocab = tokenize(''.join(self.vocab))
+        return index_tokens(tokens, vocab, unknown=0, offset=1)
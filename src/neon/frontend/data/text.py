@@ -0,0 +1,107 @@
+# ******************************************************************************
+# Copyright 2017-2018 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ******************************************************************************
+"""
+Vectorized tokenization of text into arrays of token indices.
+"""
+from __future__ import division
+
+from itertools import repeat
+
+import numpy as np
+
+
+def tokenize(text, use_words=False):
+    """
+    Returns the tokens of text, its words separated by whitespace, or the code points of its
+    characters as an array, which are sorted and compared as the characters are.
+
+    Arguments:
+        text (str): the text.
+        use_words (bool): if true, the tokens are words, otherwise characters.
+
+    Returns:
+        list or numpy.ndarray: the tokens.
+    """
+    if use_words:
+        return text.split()
+    return np.frombuffer(text.encode('utf-32-le'), dtype='<u4')
+
+
+def token_values(tokens):
+    """
+    Returns the words, or the characters of an array of code points, as a list of str.
+    """
+    if isinstance(tokens, np.ndarray):
+        return [chr(code) for code in tokens.tolist()]
+    return list(tokens)
+
+
+def index_dtype(vocab_size):
+    """
+    Returns the smallest unsigned integer type of the indices of a vocabulary.
+    """
+    return np.uint16 if vocab_size <= np.iinfo(np.uint16).max + 1 else np.uint32
+
+
+def build_vocab(tokens):
+    """
+    Returns the sorted distinct tokens of the tokens returned by tokenize, and the index of
+    each token in them.
+    """
+    if isinstance(tokens, np.ndarray):
+        vocab = np.flatnonzero(np.bincount(tokens))
+    else:
+        vocab = sorted(set(tokens))
+    return vocab, index_tokens(tokens, vocab)
+
+
+def index_tokens(tokens, vocab, unknown=None, offset=0):
+    """
+    Returns the index of each token in vocab plus offset. Code points are mapped with a
+    lookup table, and words with a dictionary.
+
+    Arguments:
+        tokens (list or numpy.ndarray): the tokens returned by tokenize.
+        vocab (list or numpy.ndarray): the sorted distinct tokens of the vocabulary.
+        unknown (int): the index of the tokens that are not in vocab. If None, such
+                       tokens raise a ValueError.
+        offset (int): added to the indices of the tokens in vocab.
+
+    Returns:
+        numpy.ndarray: the indices.
+    """
+    dtype = index_dtype(max(len(vocab) + offset, (unknown or 0) + 1))
+    if isinstance(tokens, np.ndarray):
+        # The last entry of the table is that of the code points past the vocabulary
+        size = int(vocab[-1]) + 1 if len(vocab) else 0
+        table = np.full(size + 1, unknown or 0, dtype=dtype)
+        table[vocab] = np.arange(offset, len(vocab) + offset)
+        known = np.zeros(size + 1, dtype=bool)
+        known[vocab] = True
+        tokens = np.minimum(tokens, size)
+        if unknown is None and not known[tokens].all():
+            missing = np.unique(tokens[~known[tokens]])
+            raise ValueError("The tokens {} are not in the vocabulary"
+                             .format(token_values(missing)[:10]))
+        return table[tokens]
+
+    index = dict(zip(vocab, range(offset, len(vocab) + offset)))
+    if unknown is None:
+        try:
+            return np.fromiter(map(index.__getitem__, tokens), dtype, len(tokens))
+        except KeyError as e:
+            raise ValueError("The token {} is not in the vocabulary".format(e))
+    return np.fromiter(map(index.get, tokens, repeat(unknown)), dtype, len(tokens))
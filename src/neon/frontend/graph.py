@@ -1,10 +1,10 @@
 import functools
+import re
 from contextlib import contextmanager
 from collections import OrderedDict
 from six import string_types
 
 import parsel
-from cachetools import keys, cached
 from orderedset import OrderedSet
 
 import neon as ng
@@ -66,17 +66,237 @@ def scope_ops(name=None, mode=None, subgraph=None, metadata=None):
     subgraph.ops.extend(ops)
 
 
-def _cache_ops_length(graph):
+# A compound selector of an optional element, ids, classes and attributes, which select()
+# answers from the graph index
+_SIMPLE_SELECTOR = re.compile(r"""
+    (?P<element>\*|-?[_a-zA-Z][\w-]*)?
+    (?P<parts>(?:\#[\w-]+
+               |\.-?[_a-zA-Z][\w-]*
+               |\[\s*-?[_a-zA-Z][\w-]*\s*(?:=\s*(?:"[^"\\]*"|'[^'\\]*'|-?[_a-zA-Z][\w-]*)\s*)?\])*)
+    $""", re.VERBOSE)
+_SELECTOR_PART = re.compile(r"""
+    \#(?P<id>[\w-]+)
+    |\.(?P<cls>[\w-]+)
+    |\[\s*(?P<attr>[\w-]+)\s*(?:=\s*(?P<value>"[^"]*"|'[^']*'|[\w-]+)\s*)?\]
+    """, re.VERBOSE)
+
+
+def _xml_attributes(op):
+    """
+    The attributes of the element of op in ComputationalGraph._to_xml, as parsed.
+    """
+    items = [("id", op.name), ("name", op.unscoped_name)]
+    if op.scope is not None:
+        items.append(("scope", op.scope.name))
+    for attr, val in op.metadata.items():
+        items.append(("class" if attr == "label" else str(attr), str(val)))
+    attributes = dict()
+    for attr, val in items:
+        attributes.setdefault(attr.lower(), val)
+    return attributes
+
+
+def _parse_simple_selector(css):
+    """
+    Parses a selector of a single element into (element, [(attribute, value)]), with value
+    None to only require the attribute, or returns None for other selectors.
+    """
+    match = _SIMPLE_SELECTOR.match(css.strip())
+    if match is None:
+        return None
+    element = match.group("element")
+    if element is not None:
+        element = None if element == "*" else element.lower()
+    conditions = list()
+    for part in _SELECTOR_PART.finditer(match.group("parts")):
+        if part.group("id") is not None:
+            conditions.append(("id", part.group("id")))
+        elif part.group("cls") is not None:
+            conditions.append(("class", part.group("cls")))
+        else:
+            value = part.group("value")
+            if value is not None and value[0] in "\"'":
+                value = value[1:-1]
+            conditions.append((part.group("attr").lower(), value))
+    return element, conditions
+
+
+def _matches(element, conditions, tag, attributes):
+    if element is not None and element != tag:
+        return False
+    for attr, value in conditions:
+        actual = attributes.get(attr)
+        if actual is None:
+            return False
+        if value is not None:
+            if attr == "class":
+                if value not in actual.split():
+                    return False
+            elif actual != value:
+                return False
+    return True
+
+
+class GraphIndex(object):
     """
-    Cachetools hashkey function that hashes graph properties based on len(graph.ops)
+    Indexes of the ops of a graph, by kind, type, name, attribute and scope, updated with
+    the ops appended to the ops list since the last query.
 
-    Arguments:
-        graph (ComputationalGraph): A computational graph instance
+    The index is kept on the graph, so it is freed with it. Like the ops list, it only
+    follows appends: replacing the ops list makes a new index, and ops are indexed with
+    the state they have when first queried.
 
-    Returns:
-        A hashkey using cachetools.keys.hashkey
+    Arguments:
+        ops (list): The ops of the graph.
+        scope: The scope of the graph, removed from the keys of the dictionaries.
     """
-    return keys.hashkey(graph, len(graph.ops))
+
+    def __init__(self, ops, scope):
+        self.ops = ops
+        self.scope = scope
+        self.size = 0
+        self.variables = ScopedDict(scope)
+        self.placeholders = ScopedDict(scope)
+        self.computations = ScopedDict(scope)
+        self.scopes = ScopedDict(scope)
+        self.side_effects = ScopedDict(scope)
+        self.mode_ops = OrderedDict()
+
+        # Positions of the ops in the ops list, by lower case type name, name and attribute
+        self.by_type = dict()
+        self.by_name = dict()
+        self.by_attribute = dict()
+        # Document order of the ops in _to_xml, which nests them in their scopes
+        self.order_keys = list()
+        self._scope_tree = dict()
+        # The (lower case tag, id) of the scope elements of _to_xml
+        self.scope_elements = OrderedSet()
+
+        # For SubGraph inputs and outputs
+        self.op_set = set()
+        self.input_candidates = list()
+        self.used = set()
+        self.outputs = OrderedSet()
+
+        self.memo = dict()
+
+    def update(self):
+        """
+        Indexes the ops appended since the last update.
+
+        Returns:
+            The index.
+        """
+        ops = self.ops
+        for position in range(self.size, len(ops)):
+            self._add(position, ops[position])
+        self.size = len(ops)
+        return self
+
+    def memoized(self, key, compute):
+        """
+        Returns compute(), memoized until ops are appended.
+        """
+        size, value = self.memo.get(key, (None, None))
+        if size != self.size:
+            value = compute()
+            self.memo[key] = (self.size, value)
+        return value
+
+    def _add(self, position, op):
+        tensor = op.tensor
+        if tensor.is_trainable:
+            self.variables[tensor.name] = tensor
+        if tensor.is_placeholder:
+            self.placeholders[tensor.name] = tensor
+        if isinstance(op, ng.ComputationOp):
+            self.computations[op.name] = op
+
+        self.by_type.setdefault(type(op).__name__.lower(), list()).append(position)
+        self.by_name.setdefault(op.name, list()).append(position)
+        for attr in _xml_attributes(op):
+            if attr not in ("id", "name"):
+                self.by_attribute.setdefault(attr, list()).append(position)
+
+        order_key = list()
+        tree = self._scope_tree
+        if op.scope is not None:
+            scope_names = op.scope.name.split("/")
+            for depth, key in enumerate(scope_names):
+                if key not in tree:
+                    tree[key] = (len(tree) + 1, dict())
+                    self.scope_elements.add((key.split("_")[0].lower(), key))
+                index, tree = tree[key]
+                order_key.append(index)
+                scope_name = "/".join(scope_names[:depth + 1])
+                scope = self.scopes.get(scope_name)
+                if scope is None:
+                    scope = self.scopes[scope_name] = SubGraph(name=scope_name,
+                                                               reuse_scope=True)
+                scope.ops.append(op)
+        order_key.extend((0, position))
+        self.order_keys.append(tuple(order_key))
+
+        mode = op.metadata.get("mode")
+        if mode is not None:
+            self.mode_ops.setdefault(mode, list()).append(op)
+
+        for dep in op.control_deps:
+            if dep is not tensor:
+                self.side_effects[dep.name] = dep
+
+        self.op_set.add(op)
+        if not tensor.is_trainable:
+            if tensor.is_placeholder:
+                self.input_candidates.append((tensor.name, tensor, None))
+            else:
+                for arg in op.args:
+                    if arg not in self.op_set:
+                        self.input_candidates.append((arg.name, arg, arg))
+
+        if not isinstance(op, ng.AssignableTensorOp):
+            for arg_op in op.args + tuple(op.control_deps):
+                self.used.add(arg_op)
+                self.outputs.discard(arg_op)
+            if op not in self.used:
+                self.outputs.add(op)
+
+    def select(self, css):
+        """
+        Returns the ops matching a selector of a single element in document order, or None
+        if the selector is not of that form or could match a scope element.
+        """
+        parsed = _parse_simple_selector(css)
+        if parsed is None:
+            return None
+        element, conditions = parsed
+        for tag, scope_id in self.scope_elements:
+            if _matches(element, conditions, tag, {"id": scope_id, "class": "scope"}):
+                return None
+
+        candidates = None
+        if element is not None:
+            candidates = self.by_type.get(element, ())
+        for attr, value in conditions:
+            if attr == "id" and value is not None:
+                positions = self.by_name.get(value, ())
+            elif attr in ("id", "name"):
+                continue
+            else:
+                positions = self.by_attribute.get(attr, ())
+            if candidates is None or len(positions) < len(candidates):
+                candidates = positions
+        if candidates is None:
+            candidates = range(self.size)
+
+        ops = self.ops
+        selected = list()
+        for position in candidates:
+            op = ops[position]
+            if _matches(element, conditions, type(op).__name__.lower(), _xml_attributes(op)):
+                selected.append(position)
+        selected.sort(key=self.order_keys.__getitem__)
+        return [ops[position] for position in selected]
 
 
 class ComputationalGraph(object):
@@ -107,75 +327,72 @@ class ComputationalGraph(object):
         self.ops = ops
         self.scope = None
 
+    @property
+    def ops(self):
+        """
+        The list of ops in the graph. Ops appended to it are indexed on the next query.
+        """
+        return self._ops
+
+    @ops.setter
+    def ops(self, ops):
+        self._ops = ops
+        self._index = None
+
+    def _get_index(self):
+        index = self._index
+        if index is None or index.ops is not self._ops or index.scope is not self.scope:
+            index = self._index = GraphIndex(self._ops, self.scope)
+        return index.update()
+
     def __iter__(self):
         return iter(self.ops)
 
     @property
-    @cached({}, key=_cache_ops_length)
     def variables(self):
         """
         A dictionary of all trainable variables in the graph as "name:variable" pairs
         """
-        return ScopedDict(self.scope, [(op.tensor.name, op.tensor) for op in self if
-                                       op.tensor.is_trainable])
+        return self._get_index().variables
 
     @property
-    @cached({}, key=_cache_ops_length)
     def placeholders(self):
         """
         A dictionary of all placeholder ops in the graph as "name:op" pairs
         """
-        return ScopedDict(self.scope, [(op.tensor.name, op.tensor) for op in self if
-                                       op.tensor.is_placeholder])
+        return self._get_index().placeholders
 
     @property
-    @cached({}, key=_cache_ops_length)
     def computations(self):
         """
         A dictionary of all computations in the graph as "name:computation" pairs
         """
-        return ScopedDict(self.scope, [(op.name, op) for op in self
-                                       if isinstance(op, ng.ComputationOp)])
+        return self._get_index().computations
 
     @property
-    @cached({}, key=_cache_ops_length)
     def scopes(self):
         """
         A dictionary of all defined scopes in the graph as "scope:subgraph" pairs
         """
-        # TODO: How to extract nested values from the nested xml
-        # scopes = [selected.root.attrib["id"] for selected in self._to_xml().css(".scope")]
-        # scopes = {scope_name: SubGraph(self.select("[scope={}]".format(scope_name)))
-        #           for scope_name in scopes}
-
-        scopes = ScopedDict(self.scope)
-        for op in self.select("[scope]"):
-            scope_name = op.scope.name
-            nested_scopes = [scope_name.rsplit("/", ii)[0]
-                             for ii in range(len(scope_name.split("/")))]
-            for scope_name in nested_scopes:
-                scopes.setdefault(scope_name, SubGraph(name=scope_name,
-                                                       reuse_scope=True)).ops.append(op)
-
-        return scopes
+        return self._get_index().scopes
 
     @property
-    @cached({}, key=_cache_ops_length)
     def modes(self):
         """
         A dictionary of all defined modes in the graph (e.g. training, inference) as
         "mode:computational graph" pairs.
         """
-        modes = dict()
-        for op in self.select("[mode]"):
-            mode_name = op.metadata["mode"]
-            modes.setdefault(mode_name, list()).append(op)
+        index = self._get_index()
 
-        return {mode: ComputationalGraph(ng.Op.all_op_references(ops))
-                for mode, ops in modes.items()}
+        def modes():
+            return {mode: ComputationalGraph(ng.Op.all_op_references(ops))
+                    for mode, ops in index.mode_ops.items()}
+        return index.memoized("modes", modes)
 
-    @cached({}, key=_cache_ops_length)
     def _to_xml(self):
+        return self._get_index().memoized("xml", self._make_xml)
+
+    def _make_xml(self):
         xml = ['<?xml version="1.0" encoding="UTF-8" ?>',
                '<subgraph>']
 
@@ -246,6 +463,10 @@ class ComputationalGraph(object):
             subgraph.select("[recurrent_step=3]")
         """
 
+        ops = self._get_index().select(css)
+        if ops is not None:
+            return ops
+
         ops = list()
         for selected in parsel.Selector(self._to_xml()).css(css):
             op = self._selector_to_op(selected)
@@ -323,7 +544,6 @@ class SubGraph(ComputationalGraph):
         return scope_ops_wrapper
 
     @property
-    @cached({}, key=_cache_ops_length)
     def inputs(self):
         """
         A dictionary of all input ops as "name:op" pairs
@@ -333,21 +553,15 @@ class SubGraph(ComputationalGraph):
                 1. Placeholder ops
                 2. Arguments to ops in the subgraph that aren't themselves in the subgraph
         """
+        index = self._get_index()
         inputs = ScopedDict(self.scope)
-        for op in self:
-            if op.tensor.is_trainable:
-                continue
-            if op.tensor.is_placeholder:
-                inputs[op.tensor.name] = op.tensor
-            else:
-                for arg in op.args:
-                    if arg not in self.ops:
-                        inputs[arg.name] = arg
+        for name, op, arg in index.input_candidates:
+            if arg is None or arg not in index.op_set:
+                inputs[name] = op
 
         return inputs
 
     @property
-    @cached({}, key=_cache_ops_length)
     def outputs(self):
         """
         A dictionary of all output ops as "name:op" pairs
@@ -357,28 +571,12 @@ class SubGraph(ComputationalGraph):
                 1. Ops in the subgraph that aren't depended on by any other ops in the subgraph
                 2. Not a variable or placeholder op
         """
-        op_args = OrderedSet()
-        ops = OrderedSet()
-        for op in self:
-            if isinstance(op, ng.AssignableTensorOp):
-                continue
-            ops.add(op)
-            for arg_op in op.args + tuple(op.control_deps):
-                op_args.add(arg_op)
-
         return ScopedDict(self.scope, [(op.tensor.name, op.tensor)
-                                       for op in ops.difference(op_args)])
+                                       for op in self._get_index().outputs])
 
     @property
-    @cached({}, key=_cache_ops_length)
     def side_effects(self):
         """
         A dictionary of all side-effect ops as "name:op" pairs.
         """
-        side_effects = ScopedDict(self.scope)
-        for op in self:
-            for dep in op.control_deps:
-                if dep is not op.tensor:
-                    side_effects[dep.name] = dep
-
-        return side_effects
+        return self._get_index().side_effects
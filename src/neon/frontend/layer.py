@@ -1359,6 +1359,9 @@ class Recurrent(Layer):
                             set to False to be stateful.
         return_sequence (bool): default to be True to return the whole sequence output.
         backward (bool): default to be False to process the sequence left to right
+        scan (bool): default to be False to unroll every time step into the graph. If True,
+                     the step is built once and iterated over the recurrent axis by a scan op,
+                     so graph size and build time do not grow with the sequence length.
         name (str, optional): name to refer to this layer as.
 
     Attributes:
@@ -1370,7 +1373,7 @@ class Recurrent(Layer):
     """
 
     def __init__(self, nout, init, init_inner=None, activation=None, batch_norm=False,
-                 reset_cells=True, return_sequence=True, backward=False, **kwargs):
+                 reset_cells=True, return_sequence=True, backward=False, scan=False, **kwargs):
         super(Recurrent, self).__init__(**kwargs)
 
         self.nout = nout
@@ -1380,6 +1383,7 @@ class Recurrent(Layer):
         self.reset_cells = reset_cells
         self.return_sequence = return_sequence
         self.backward = backward
+        self.scan = scan
         self.batch_norm = BatchNorm() if batch_norm is True else None
         self.w_in_axes = None
 
@@ -1478,27 +1482,37 @@ class Recurrent(Layer):
         if self.batch_norm is not None:
             h_ff = self.batch_norm(h_ff)
 
-        # slice the weighted inputs into time slices
-        in_s = get_steps(h_ff, self.recurrent_axis, self.backward)
+        if self.scan:
+            def step(inputs, states):
+                h = self._step(inputs[0], states[0])
+                return [h], [h]
 
-        # unrolling computations
-        for i in range(self.recurrent_axis.length):
-            with ng.metadata(recurrent_step=str(i)):
-                h = self._step(in_s[i], h)
-                h_list.append(h)
-
-        if self.return_sequence is True:
-            # only when returning a sequence, need to reverse the output
-            h_list = h_list[::-1] if self.backward else h_list
-            rnn_out = ng.stack(h_list, self.recurrent_axis, pos=self.recurrent_axis_idx)
+            (h_seq,), (h_last,) = ng.scan(step, [h_ff], [h], self.recurrent_axis,
+                                          reverse=self.backward, pos=self.recurrent_axis_idx)
+            rnn_out = h_seq if self.return_sequence is True else h_last
         else:
-            rnn_out = h_list[-1]
+            # slice the weighted inputs into time slices
+            in_s = get_steps(h_ff, self.recurrent_axis, self.backward)
+
+            # unrolling computations
+            for i in range(self.recurrent_axis.length):
+                with ng.metadata(recurrent_step=str(i)):
+                    h = self._step(in_s[i], h)
+                    h_list.append(h)
+            h_last = h_list[-1]
+
+            if self.return_sequence is True:
+                # only when returning a sequence, need to reverse the output
+                h_list = h_list[::-1] if self.backward else h_list
+                rnn_out = ng.stack(h_list, self.recurrent_axis, pos=self.recurrent_axis_idx)
+            else:
+                rnn_out = h_last
 
         if self.reset_cells is True:
             return rnn_out
         else:
             return ng.sequential([
-                ng.assign(self.h_init, h_list[-1]),
+                ng.assign(self.h_init, h_last),
                 rnn_out
             ])
 
@@ -1626,6 +1640,8 @@ class LSTM(Recurrent):
                             set to False to be stateful.
         return_sequence (bool): default to be True to return the whole sequence output.
         backward (bool): default to be False to process the sequence left to right
+        scan (bool): default to be False to unroll every time step into the graph. If True,
+                     the step is built once and iterated over the recurrent axis by a scan op.
         name (str, optional): name to refer to this layer as.
     Attributes:
         W_input (Tensor): weights from inputs to output units
@@ -1640,10 +1656,10 @@ class LSTM(Recurrent):
 
     def __init__(self, nout, init, init_inner=None, activation=None, gate_activation=None,
                  batch_norm=False, reset_cells=True, return_sequence=True, backward=False,
-                 **kwargs):
+                 scan=False, **kwargs):
         super(LSTM, self).__init__(nout, init, init_inner=init_inner, activation=activation,
                                    reset_cells=reset_cells, return_sequence=return_sequence,
-                                   backward=backward, **kwargs)
+                                   backward=backward, scan=scan, **kwargs)
 
         if batch_norm is True:
             self.batch_norm = {k: BatchNorm() for k in self.metadata["gates"]}
@@ -1746,39 +1762,55 @@ class LSTM(Recurrent):
             if self.batch_norm is not None:
                 h_ff[k] = self.batch_norm[k](h_ff[k])
 
-            # slice the weighted inputs into time slices
-        h_ff = get_steps(h_ff, self.recurrent_axis, self.backward)
+        if self.scan:
+            gates = self.metadata["gates"]
+
+            def step(inputs, states):
+                [h, c] = self._step(dict(zip(gates, inputs)), states)
+                return [h, c], [h, c]
 
-        # recurrent computation
-        for i in range(self.recurrent_axis.length):
-            with ng.metadata(recurrent_step=str(i)):
-                [h, c] = self._step(h_ff[i], [h, c])
-                h_list.append(h)
-                c_list.append(c)
+            (h_stack, c_stack), (h_last, c_last) = ng.scan(
+                step, [h_ff[k] for k in gates], [h, c], self.recurrent_axis,
+                reverse=self.backward, pos=self.recurrent_axis_idx)
+        else:
+            # slice the weighted inputs into time slices
+            h_ff = get_steps(h_ff, self.recurrent_axis, self.backward)
+
+            # recurrent computation
+            for i in range(self.recurrent_axis.length):
+                with ng.metadata(recurrent_step=str(i)):
+                    [h, c] = self._step(h_ff[i], [h, c])
+                    h_list.append(h)
+                    c_list.append(c)
+            h_last = h_list[-1]
+            c_last = c_list[-1]
+
+            if self.return_sequence is True:
+                if self.backward:
+                    h_list = h_list[::-1]
+                    c_list = c_list[::-1]
+                h_stack = ng.stack(h_list, self.recurrent_axis, pos=self.recurrent_axis_idx)
+                if return_cell_state:
+                    c_stack = ng.stack(c_list, self.recurrent_axis, pos=self.recurrent_axis_idx)
 
         if self.return_sequence is True:
-            if self.backward:
-                h_list = h_list[::-1]
-                c_list = c_list[::-1]
-            h_stack = ng.stack(h_list, self.recurrent_axis, pos=self.recurrent_axis_idx)
             if return_cell_state:
-                c_stack = ng.stack(c_list, self.recurrent_axis, pos=self.recurrent_axis_idx)
                 lstm_out = (h_stack, c_stack)
             else:
                 lstm_out = h_stack
         else:
             if return_cell_state:
-                lstm_out = (h_list[-1], c_list[-1])
+                lstm_out = (h_last, c_last)
             else:
-                lstm_out = h_list[-1]
+                lstm_out = h_last
 
         if self.reset_cells is True:
             return lstm_out
         else:
             return ng.sequential([
                 ng.doall([
-                    ng.assign(self.h_init, h_list[-1]),
-                    ng.assign(self.c_init, c_list[-1])
+                    ng.assign(self.h_init, h_last),
+                    ng.assign(self.c_init, c_last)
                 ]),
                 lstm_out
             ])
@@ -1820,13 +1852,15 @@ def _cells_initialize_states(cells, batch_axis, **kwargs):
 
 
 def unroll(cell, num_steps, inputs, init_states=None, reset_cells=True,
-           return_sequence=True, reverse_mode=False):
+           return_sequence=True, reverse_mode=False, scan=False):
     """
     Unroll the cell for num_steps steps.
 
     Arguments:
     ----------
     init_states: either None or a dictionary containing states
+    scan (bool): if True, build the cell once and iterate it with a scan op instead
+        of unrolling num_steps copies of it into the graph
     """
     recurrent_axis = inputs.axes.recurrent_axis()
     recurrent_axis_idx = len(cell.feature_axes)
@@ -1837,6 +1871,31 @@ def unroll(cell, num_steps, inputs, init_states=None, reset_cells=True,
     else:
         states = init_states
 
+    if scan:
+        if num_steps != recurrent_axis.length:
+            raise ValueError("scan requires num_steps to match the recurrent axis length: "
+                             "{} != {}".format(num_steps, recurrent_axis.length))
+        if states is None:
+            states = cell.initialize_states(batch_axis, reset_cells=reset_cells)
+        names = sorted(states.keys())
+
+        def step(step_inputs, step_states):
+            output, new_states = cell(step_inputs[0], dict(zip(names, step_states)))
+            return [output], [new_states[name] for name in names]
+
+        (outputs,), final_states = ng.scan(step, [inputs], [states[name] for name in names],
+                                           recurrent_axis, reverse=reverse_mode,
+                                           pos=recurrent_axis_idx)
+        if not return_sequence:
+            outputs = ng.slice_along_axis(outputs, recurrent_axis,
+                                          0 if reverse_mode else num_steps - 1)
+        states = dict(zip(names, final_states))
+        if not reset_cells:
+            update_inits = ng.doall([ng.assign(initial, states[name])
+                                     for (name, initial) in init_states.items()])
+            outputs = ng.sequential([update_inits, outputs])
+        return outputs
+
     stepped_inputs = get_steps(inputs, recurrent_axis, backward=reverse_mode)
     stepped_outputs = []
 
@@ -0,0 +1,470 @@
+# ******************************************************************************
+# Copyright 2017-2018 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ******************************************************************************
+"""
+A data loader of image manifests, such as those written by ingest_cifar10, configured as
+the aeon DataLoader is, and needing no library other than PIL.
+"""
+from __future__ import division
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+
+import numpy as np
+from PIL import Image
+
+import neon as ng
+from neon.frontend.prefetch import PrefetchIterator
+
+logger = logging.getLogger(__name__)
+
+NAME_MAP = {"channels": "C",
+            "height": "H",
+            "width": "W"}
+"""Converts aeon axis names to canonical ngraph axis types."""
+
+AUGMENTATION_KEYS = ('type', 'padding', 'crop_enable', 'center', 'scale', 'do_area_scale',
+                     'horizontal_distortion', 'flip_enable')
+"""The keys of the aeon image augmentation that ManifestDataLoader applies."""
+
+
+def read_manifest(filename, root=None):
+    """
+    Reads the records of a manifest, in the order of its lines.
+
+    Lines starting with '@' are headers. The other lines have the path of an image and its
+    label, separated by a tab or a comma. The label is an integer, or the path of a text
+    file holding the integer, as in the manifests of ingest_mnist.
+
+    Arguments:
+        filename (str): the manifest.
+        root (str): the directory the paths are relative to. Defaults to the directory of
+                    the manifest.
+
+    Returns:
+        tuple: the paths of the images, and their labels as an array of int32.
+    """
+    root = os.path.dirname(filename) if root is None else root
+    paths, labels = [], []
+    with open(filename) as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('@'):
+                continue
+            fields = line.split('\t') if '\t' in line else line.split(',')
+            if len(fields) < 2:
+                raise ValueError("The record {} of {} has no label".format(line, filename))
+            paths.append(os.path.join(root, fields[0]))
+            try:
+                labels.append(int(fields[1]))
+            except ValueError:
+                with open(os.path.join(root, fields[1])) as label_file:
+                    labels.append(int(label_file.read().strip()))
+    return paths, np.array(labels, dtype=np.int32)
+
+
+def _resize(image, height, width):
+    """
+    Resizes a (C, H, W) image, unless it has that size already.
+    """
+    channels, image_height, image_width = image.shape
+    if (image_height, image_width) == (height, width):
+        return image
+    pixels = image.transpose(1, 2, 0) if channels > 1 else image[0]
+    resized = np.asarray(Image.fromarray(np.ascontiguousarray(pixels))
+                         .resize((width, height), Image.BILINEAR))
+    return resized.reshape(height, width, channels).transpose(2, 0, 1)
+
+
+def _crop_shape(height, width, out_height, out_width, scale, distortion, area_scale):
+    """
+    Returns the shape of the crop of a height by width image, as aeon computes it: the
+    largest box of the aspect ratio of the output, widened by distortion, scaled by scale.
+    """
+    aspect = out_width * distortion / out_height
+    if width / height > aspect:
+        crop_height, crop_width = height, height * aspect
+    else:
+        crop_height, crop_width = width / aspect, width
+    if area_scale:
+        scale = np.sqrt(scale)
+    return (int(min(height, max(1, round(crop_height * scale)))),
+            int(min(width, max(1, round(crop_width * scale)))))
+
+
+def _index_file(cache_file):
+    """
+    Returns the file of the offset, height and width of each image of a cache file.
+    """
+    return os.path.splitext(cache_file)[0] + '-index.npy'
+
+
+class _ImageETL(object):
+    """
+    Decodes and transforms the images of a batch of manifest records, in the workers of
+    ManifestDataLoader.
+    """
+
+    def __init__(self, paths, labels, image_shape, augmentation, cache_file):
+        self.paths = paths
+        self.labels = labels
+        self.image_shape = image_shape
+        self.augmentation = augmentation
+        self.cache_file = cache_file
+        self.pixels = None
+        self.index = None
+        self.uniform = False
+
+    def __getstate__(self):
+        # Each process maps the cache itself
+        state = self.__dict__.copy()
+        state['pixels'] = None
+        state['index'] = None
+        return state
+
+    def decode(self, idx):
+        """
+        Decodes an image at its own size.
+        """
+        channels = self.image_shape[0]
+        image = Image.open(self.paths[idx]).convert('RGB' if channels == 3 else 'L')
+        image = np.asarray(image, dtype=np.uint8)
+        return image.reshape(image.shape[0], image.shape[1], channels).transpose(2, 0, 1)
+
+    def open_cache(self):
+        self.pixels = np.load(self.cache_file, mmap_mode='r')
+        self.index = np.load(_index_file(self.cache_file))
+        self.uniform = bool((self.index[:, 1:] == self.image_shape[1:]).all())
+
+    def load(self, idx):
+        if self.cache_file is None:
+            return self.decode(idx)
+        if self.pixels is None:
+            self.open_cache()
+        offset, height, width = self.index[idx]
+        size = self.image_shape[0] * height * width
+        return self.pixels[offset:offset + size].reshape(-1, height, width)
+
+    def transform(self, image, rng):
+        """
+        Crops, pads, resizes and flips an image as the aeon image transform does: the crop
+        is taken from the image at its own size, padded, and resized to the output size.
+        """
+        aug = self.augmentation or {}
+        _, out_height, out_width = self.image_shape
+        _, height, width = image.shape
+
+        if aug.get('crop_enable', True):
+            height, width = _crop_shape(height, width, out_height, out_width,
+                                        rng.uniform(*aug.get('scale', (1., 1.))),
+                                        rng.uniform(*aug.get('horizontal_distortion', (1., 1.))),
+                                        aug.get('do_area_scale', False))
+            if aug.get('center', True):
+                y, x = (image.shape[1] - height) // 2, (image.shape[2] - width) // 2
+            else:
+                y = rng.randint(image.shape[1] - height + 1)
+                x = rng.randint(image.shape[2] - width + 1)
+            image = image[:, y:y + height, x:x + width]
+
+        padding = aug.get('padding', 0)
+        if padding:
+            padded = np.zeros((image.shape[0], height + 2 * padding, width + 2 * padding),
+                              dtype=np.uint8)
+            padded[:, padding:padding + height, padding:padding + width] = image
+            y, x = rng.randint(2 * padding + 1, size=2)
+            image = padded[:, y:y + height, x:x + width]
+
+        image = _resize(image, out_height, out_width)
+        if aug.get('flip_enable', False) and rng.randint(2):
+            image = image[:, :, ::-1]
+        return image
+
+    def __call__(self, batch):
+        indices = batch['index']
+        if self.cache_file is not None and self.pixels is None:
+            self.open_cache()
+        if self.augmentation is None and self.uniform:
+            # The cached images have the output size, and are returned as they are
+            images = self.pixels.reshape((-1,) + self.image_shape)[indices]
+        else:
+            rng = np.random.RandomState(batch['seed'])
+            images = np.empty((len(indices),) + self.image_shape, dtype=np.uint8)
+            for row, idx in enumerate(indices):
+                images[row] = self.transform(self.load(idx), rng)
+        return {'image': images, 'label': self.labels[indices]}
+
+
+_decoder = None
+
+
+def _init_decoder(etl):
+    global _decoder
+    _decoder = etl
+
+
+def _read_sizes(task):
+    """
+    Reads the (width, height) of the images of rows start to stop from their headers, in a
+    worker.
+    """
+    start, stop = task
+    sizes = []
+    for path in _decoder.paths[start:stop]:
+        with Image.open(path) as image:
+            sizes.append(image.size)
+    return start, sizes
+
+
+def _decode_rows(task):
+    """
+    Decodes the images of rows start to stop into the cache being built, at the offsets of
+    the index, in a worker.
+    """
+    filename, start, index = task
+    pixels = np.load(filename, mmap_mode='r+')
+    for idx, (offset, height, width) in enumerate(index, start):
+        image = _decoder.decode(idx)
+        if image.shape[1:] != (height, width):
+            raise ValueError("{} changed while it was cached".format(_decoder.paths[idx]))
+        pixels[offset:offset + image.size] = image.ravel()
+    pixels.flush()
+    return len(index)
+
+
+class _IndexBatches(object):
+    """
+    The indices of the records of each batch, and the seeds of their augmentation.
+
+    Every pass, between resets, draws its order from its own RandomState(seed + pass), and
+    every batch its augmentation from the seed (seed, pass, batch), so that the batches
+    are the same whichever process loads them and however far ahead.
+    """
+
+    def __init__(self, ndata, batch_size, iteration_mode, count, shuffle, seed):
+        self.ndata = ndata
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.seed = seed
+        self.passes = 0
+        if iteration_mode == 'ONCE':
+            self.nbatches = -(-ndata // batch_size)
+        elif iteration_mode == 'COUNT':
+            self.nbatches = count
+        else:
+            self.nbatches = None
+
+    def reset(self):
+        self.passes += 1
+
+    def __iter__(self):
+        return self.batches_of_pass(self.passes)
+
+    def batches_of_pass(self, pass_index):
+        """
+        Yields the batches of a pass, the last one of a single epoch completed with the
+        first records.
+        """
+        rng = np.random.RandomState(self.seed + pass_index)
+
+        def epoch_order():
+            return rng.permutation(self.ndata) if self.shuffle else np.arange(self.ndata)
+
+        order, position, produced = epoch_order(), 0, 0
+        while self.nbatches is None or produced < self.nbatches:
+            index = np.empty(self.batch_size, dtype=np.int64)
+            filled = 0
+            while filled < self.batch_size:
+                if position == self.ndata:
+                    order, position = epoch_order(), 0
+                count = min(self.batch_size - filled, self.ndata - position)
+                index[filled:filled + count] = order[position:position + count]
+                filled += count
+                position += count
+            yield {'index': index,
+                   'seed': np.array([self.seed, pass_index, produced], dtype=np.uint32)}
+            produced += 1
+
+
+class ManifestDataLoader(object):
+
+    def __init__(self, config, workers=None, depth=2):
+        """
+        Loads batches of images and labels from a manifest, decoding and augmenting the
+        images in a pool of processes that write the batches to shared memory.
+
+        The config is that of the aeon DataLoader:
+            manifest_filename, manifest_root, batch_size (or minibatch_size),
+            etl: [{'type': 'image', 'height', 'width', 'channels'},
+                  {'type': 'label', 'binary': False}],
+            augmentation: [{'type': 'image', 'padding', 'crop_enable', 'center', 'scale',
+                            'do_area_scale', 'horizontal_distortion', 'flip_enable'}],
+            iteration_mode ('ONCE', 'COUNT' or 'INFINITE'), iteration_mode_count,
+            shuffle_manifest, shuffle_enable, random_seed, cache_directory.
+
+        Other augmentations are ignored with a warning. As in aeon, the crop is taken from
+        the image at its own size, padded, and resized to the height and width of the
+        config, and without augmentation the image is center cropped to the aspect ratio of
+        the output and resized. With a cache_directory, the images are decoded at their own
+        size to a .npy file there once, and memory mapped by the workers instead of being
+        decoded again.
+
+        The batches have an 'image' array of uint8 of shape (N, C, H, W) and a 'label'
+        array of int32, and are overwritten once the next batch is requested. In ONCE
+        mode, the last batch is completed with the first records, and ndata is the number
+        of records.
+
+        Arguments:
+            config (dict): the configuration.
+            workers (int): the number of processes. Defaults to the number of CPUs. With 0,
+                           the batches are loaded in this process.
+            depth (int): the number of batches loaded ahead of the one returned.
+        """
+        self.config = config
+        manifest = config['manifest_filename']
+        self.batch_size = config.get('batch_size', config.get('minibatch_size'))
+        etl = {c['type']: c for c in config.get('etl', [])}
+        image_config = etl.get('image', config.get('image', {}))
+        label_config = etl.get('label', config.get('label', {}))
+        if label_config.get('binary', False):
+            raise ValueError("Binary labels are not supported")
+        self.image_shape = (image_config.get('channels', 3), image_config['height'],
+                            image_config['width'])
+
+        augmentation = None
+        for aug in config.get('augmentation', []):
+            if aug.get('type', 'image') == 'image':
+                augmentation = aug
+                ignored = sorted(set(aug).difference(AUGMENTATION_KEYS))
+                if ignored:
+                    logger.warning("ManifestDataLoader ignores the augmentations %s", ignored)
+
+        iteration_mode = config.get('iteration_mode', 'ONCE')
+        if iteration_mode not in ('ONCE', 'COUNT', 'INFINITE'):
+            raise ValueError("Unknown iteration_mode {}".format(iteration_mode))
+
+        paths, labels = read_manifest(manifest, config.get('manifest_root') or None)
+        self.ndata = len(paths)
+        if self.ndata < self.batch_size:
+            raise ValueError('Number of examples is smaller than the batch size')
+
+        if workers is None:
+            workers = multiprocessing.cpu_count()
+        cache_file = None
+        if config.get('cache_directory'):
+            cache_file = self.cache_file(config['cache_directory'], manifest)
+        self.etl = _ImageETL(paths, labels, self.image_shape, augmentation, cache_file)
+        if cache_file is not None and not os.path.exists(cache_file):
+            self.build_cache(cache_file, workers)
+
+        shuffle = config.get('shuffle_enable', False) or config.get('shuffle_manifest', False)
+        self.batches = _IndexBatches(self.ndata, self.batch_size, iteration_mode,
+                                     config.get('iteration_mode_count'), shuffle,
+                                     config.get('random_seed', 0))
+        self.prefetch = None
+        if workers > 0:
+            self.prefetch = PrefetchIterator(self.batches, depth=depth, workers=workers,
+                                             mode='process', transform=self.etl)
+        self.pass_batches = None
+
+    def cache_file(self, cache_directory, manifest):
+        """
+        Returns the file of the decoded images, named after the manifest and the number of
+        channels so that it is decoded again when either changes.
+        """
+        stat = os.stat(manifest)
+        key = json.dumps([os.path.abspath(manifest), stat.st_size, stat.st_mtime,
+                          self.image_shape[0]])
+        digest = hashlib.md5(key.encode('utf-8')).hexdigest()[:16]
+        return os.path.join(cache_directory, 'decoded-{}.npy'.format(digest))
+
+    def build_cache(self, cache_file, workers, chunk_size=1000):
+        """
+        Decodes every image at its own size into the cache file, one after the other, in
+        chunks over a pool of processes. The offset, height and width of each image, read
+        from the image headers first, are saved to the index file of the cache. Both files
+        are written under a temporary name and renamed once complete, the cache file last.
+        """
+        if not os.path.isdir(os.path.dirname(cache_file)):
+            os.makedirs(os.path.dirname(cache_file))
+        chunks = [(start, min(start + chunk_size, self.ndata))
+                  for start in range(0, self.ndata, chunk_size)]
+        if workers == 0:
+            _init_decoder(self.etl)
+            pool, pool_map = None, map
+        else:
+            pool = multiprocessing.Pool(workers, initializer=_init_decoder,
+                                        initargs=(self.etl,))
+            pool_map = pool.imap_unordered
+        try:
+            index = np.zeros((self.ndata, 3), dtype=np.int64)
+            for start, sizes in pool_map(_read_sizes, chunks):
+                index[start:start + len(sizes), 1:] = [(h, w) for w, h in sizes]
+            sizes = self.image_shape[0] * index[:, 1] * index[:, 2]
+            index[1:, 0] = np.cumsum(sizes)[:-1]
+
+            tmp_file = cache_file + '.tmp'
+            np.lib.format.open_memmap(tmp_file, mode='w+', dtype=np.uint8,
+                                      shape=(int(sizes.sum()),)).flush()
+            tasks = [(tmp_file, start, index[start:stop]) for start, stop in chunks]
+            for _ in pool_map(_decode_rows, tasks):
+                pass
+        finally:
+            if pool is not None:
+                pool.terminate()
+                pool.join()
+        with open(_index_file(cache_file) + '.tmp', 'wb') as f:
+            np.save(f, index)
+        os.rename(_index_file(cache_file) + '.tmp', _index_file(cache_file))
+        os.rename(tmp_file, cache_file)
+
+    def __next__(self):
+        if self.prefetch is not None:
+            return next(self.prefetch)
+        if self.pass_batches is None:
+            self.pass_batches = iter(self.batches)
+        return self.etl(next(self.pass_batches))
+
+    def next(self):
+        return self.__next__()
+
+    def __iter__(self):
+        return self
+
+    def make_placeholders(self, include_iteration=False):
+        batch_axis = ng.make_axis(self.batch_size, name="N")
+        image_axes = ng.make_axes([batch_axis])
+        for name, length in zip(('channels', 'height', 'width'), self.image_shape):
+            image_axes += ng.make_axis(name=NAME_MAP[name], length=length)
+        placeholders = {'image': ng.placeholder(image_axes),
+                        'label': ng.placeholder(ng.make_axes([batch_axis]))}
+        if include_iteration:
+            placeholders['iteration'] = ng.placeholder(axes=())
+        return placeholders
+
+    def reset(self):
+        if self.prefetch is not None:
+            self.prefetch.reset()
+        else:
+            self.batches.reset()
+        self.pass_batches = None
+
+    def close(self):
+        """
+        Stops the worker processes.
+        """
+        if self.prefetch is not None:
+            self.prefetch.close()
@@ -183,6 +183,31 @@ class BoundComputation(object):
         return result_dict
 
 
+class BucketedComputation(object):
+    """
+    Callable object that runs the computation of the bucket of its inputs, for batches of
+    a BucketedSequenceIterator. The computations of the buckets are made from the same
+    layers, so they share their weights.
+
+    Arguments:
+        transformer (object): Transformer object defined in the model
+        named_outputs (dict): Output entities wanted for the computation of each bucket,
+                              by bucket length
+        named_inputs (dict): Input entities needed for the computation of each bucket, by
+                             bucket length, as made by BucketedSequenceIterator
+        bucket_key (str): Name of the input that holds the bucket length
+    """
+
+    def __init__(self, transformer, named_outputs, named_inputs, bucket_key='bucket'):
+        self.bucket_key = bucket_key
+        self.computations = {bucket: BoundComputation(transformer, named_outputs[bucket],
+                                                      named_inputs[bucket])
+                             for bucket in named_inputs}
+
+    def __call__(self, named_buffers):
+        return self.computations[named_buffers[self.bucket_key]](named_buffers)
+
+
 def make_bound_computation(transformer, named_outputs, named_inputs):
     """
     Creates a `BoundComputation` instance that takes named input arrays
@@ -195,7 +195,7 @@ class LearningRateOptimizer(Optimizer):
                 logger.warn("not all selected variables participate in cost computation")
 
         # gradients
-        grads = [ng.deriv(batch_cost, v) / batch_size for v in variables]
+        grads = [grad / batch_size for grad in ng.gradients(batch_cost, variables)]
         scale_factor = clip_gradient_norm(grads, self.gradient_clip_norm)
 
         # updates
@@ -0,0 +1,383 @@
+# ******************************************************************************
+# Copyright 2017-2018 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ******************************************************************************
+from __future__ import division
+import multiprocessing
+import threading
+import traceback
+
+import numpy as np
+from six.moves import queue
+
+
+class _End(object):
+    """
+    Marks the end of the batches of the wrapped iterator.
+    """
+
+
+class _Failure(object):
+    """
+    Carries an exception raised while producing a batch to the training thread.
+    """
+
+    def __init__(self, exception):
+        self.exception = exception
+
+
+def _split_batch(batch):
+    """
+    Splits a batch into its arrays and its other values, such as the iteration.
+    """
+    arrays = {k: v for k, v in batch.items() if isinstance(v, np.ndarray)}
+    others = {k: v for k, v in batch.items() if not isinstance(v, np.ndarray)}
+    return arrays, others
+
+
+def _layout(arrays):
+    return sorted((k, v.shape, v.dtype.str) for k, v in arrays.items())
+
+
+def _shared_buffers(layout, slots):
+    return {k: multiprocessing.RawArray('b', slots * np.zeros(shape, dtype).nbytes)
+            for k, shape, dtype in layout}
+
+
+def _slot_views(buffers, layout, slots):
+    """
+    Returns arrays of shape (slots,) + shape viewing the shared buffers.
+    """
+    return {k: np.frombuffer(buffers[k], dtype=np.dtype(dtype)).reshape((slots,) + shape)
+            for k, shape, dtype in layout}
+
+
+def _write_slot(views, layout, slot, arrays):
+    if _layout(arrays) != layout:
+        raise ValueError("Batches prefetched by processes must all have the same keys, "
+                         "shapes and dtypes, expected {} but got {}"
+                         .format(layout, _layout(arrays)))
+    for k, value in arrays.items():
+        views[k][slot] = value
+
+
+def _process_worker(tasks, done, transform, slots, in_layout, in_buffers, out_layout,
+                    out_buffers):
+    """
+    Transforms the batches in the input slots into the output slots, in a worker process.
+    """
+    in_views = _slot_views(in_buffers, in_layout, slots)
+    out_views = _slot_views(out_buffers, out_layout, slots)
+    while True:
+        task = tasks.get()
+        if task is None:
+            return
+        generation, index, slot, others = task
+        batch = {k: v[slot] for k, v in in_views.items()}
+        batch.update(others)
+        try:
+            if transform is not None:
+                batch = transform(batch)
+            arrays, others = _split_batch(batch)
+            _write_slot(out_views, out_layout, slot, arrays)
+        except Exception:
+            # The exception itself may not be picklable
+            others = _Failure(RuntimeError(traceback.format_exc()))
+        done.put((generation, index, slot, others))
+
+
+class PrefetchIterator(object):
+
+    def __init__(self, iterator, depth=2, workers=1, mode='thread', transform=None):
+        """
+        Produces the batches of another iterator ahead of time, in background threads or
+        processes, so that assembling the batches and augmenting them overlap with the
+        computations of the training thread.
+
+        A feeder thread reads the batches of the wrapped iterator in order, and workers
+        apply the transform, such as an augmentation done in a train_feed_wrapper, to at
+        most depth batches ahead of the one last returned. The batches are returned in the
+        order of the wrapped iterator.
+
+        In thread mode, the arrays of every batch are copied, since iterators may reuse
+        their buffers. In process mode, the batches are passed through shared memory, so
+        they must all have the same keys, shapes and dtypes, and the arrays returned are
+        views that are overwritten once the next batch is requested. The first batch is
+        transformed on the training thread, to size the shared memory, and the transform
+        must be picklable if processes are not forked.
+
+        make_placeholders, reset, ndata and the other attributes are those of the wrapped
+        iterator, so the transform should keep the axes of the batches.
+
+        Arguments:
+            iterator: ArrayIterator, SequentialArrayIterator, AeonDataLoader, or any
+                      iterable of dictionaries of arrays with a reset method.
+            depth (int): number of batches produced ahead of the training thread.
+            workers (int): number of threads or processes applying the transform.
+            mode (str): 'thread' or 'process'.
+            transform (callable): function called with each batch that returns the batch
+                                  to use instead. Defaults to returning the batch.
+        """
+        if mode not in ('thread', 'process'):
+            raise ValueError("mode must be 'thread' or 'process', not {}".format(mode))
+        if depth < 1 or workers < 1:
+            raise ValueError("depth and workers must be at least 1")
+        self.iterator = iterator
+        self.depth = depth
+        self.workers = workers
+        self.mode = mode
+        self.transform = transform
+
+        self.started = False
+        self.generation = 0
+        self.pending = {}
+        self.held_slot = None
+        self.feeder = None
+        self.stop_feeding = None
+        self.pool = None
+        # The slots, depth or, with processes, one more for the batch held by the caller
+        self.slots = depth + 1 if mode == 'process' else depth
+        self.free_slots = queue.Queue()
+        for slot in range(self.slots):
+            self.free_slots.put(slot)
+
+    def __getattr__(self, name):
+        # The attributes of the wrapped iterator, such as ndata and batch_size
+        if name == 'iterator':
+            raise AttributeError(name)
+        return getattr(self.iterator, name)
+
+    def make_placeholders(self, *args, **kwargs):
+        return self.iterator.make_placeholders(*args, **kwargs)
+
+    def reset(self):
+        """
+        Stops producing batches, resets the wrapped iterator, and starts again from its
+        first batch on the next call to next. Batches already produced are dropped.
+        """
+        self.stop_feeder()
+        self.iterator.reset()
+        self.started = False
+
+    def close(self):
+        """
+        Stops the feeder and the workers.
+        """
+        self.stop_feeder()
+        if self.pool is not None:
+            for _ in self.pool:
+                self.tasks.put(None)
+            for worker in self.pool:
+                worker.join()
+            self.pool = None
+        self.started = False
+
+    def stop_feeder(self):
+        if self.feeder is not None:
+            self.stop_feeding.set()
+            self.feeder.join()
+            self.feeder = None
+
+    def start(self):
+        """
+        Starts producing the batches of a new pass over the wrapped iterator, reclaiming
+        the slots of the batches of the previous one that were not returned.
+        """
+        self.generation += 1
+        for slot, _ in self.pending.values():
+            if slot is not None:
+                self.free_slots.put(slot)
+        self.pending = {}
+        if self.held_slot is not None:
+            self.free_slots.put(self.held_slot)
+            self.held_slot = None
+        self.next_index = 0
+        self.started = True
+
+        batches = iter(self.iterator)
+        index = 0
+        if self.pool is None:
+            if self.mode == 'process':
+                # The layouts of the shared memory are those of the first batch
+                try:
+                    batch = next(batches)
+                except StopIteration:
+                    self.pending[0] = (None, _End())
+                    return
+                index = 1
+                self.start_processes(batch)
+            else:
+                self.start_threads()
+
+        self.stop_feeding = threading.Event()
+        self.feeder = threading.Thread(target=self.feed,
+                                       args=(batches, index, self.generation,
+                                             self.stop_feeding))
+        self.feeder.daemon = True
+        self.feeder.start()
+
+    def start_threads(self):
+        self.tasks = queue.Queue()
+        self.done = queue.Queue()
+        self.pool = [threading.Thread(target=self.run_thread_worker)
+                     for _ in range(self.workers)]
+        for worker in self.pool:
+            worker.daemon = True
+            worker.start()
+
+    def start_processes(self, batch):
+        in_arrays, _ = _split_batch(batch)
+        self.in_layout = _layout(in_arrays)
+        output = self.apply_transform(batch)
+        out_arrays, _ = _split_batch(output)
+        self.out_layout = _layout(out_arrays)
+        self.pending[0] = (None, {k: np.array(v) if isinstance(v, np.ndarray) else v
+                                  for k, v in output.items()})
+
+        in_buffers = _shared_buffers(self.in_layout, self.slots)
+        out_buffers = _shared_buffers(self.out_layout, self.slots)
+        self.in_views = _slot_views(in_buffers, self.in_layout, self.slots)
+        self.out_views = _slot_views(out_buffers, self.out_layout, self.slots)
+        self.tasks = multiprocessing.Queue()
+        self.done = multiprocessing.Queue()
+        self.pool = [multiprocessing.Process(target=_process_worker,
+                                             args=(self.tasks, self.done, self.transform,
+                                                   self.slots, self.in_layout, in_buffers,
+                                                   self.out_layout, out_buffers))
+                     for _ in range(self.workers)]
+        for worker in self.pool:
+            worker.daemon = True
+            worker.start()
+
+    def apply_transform(self, batch):
+        if self.transform is None:
+            return batch
+        return self.transform(batch)
+
+    def acquire_slot(self, stop):
+        while not stop.is_set():
+            try:
+                return self.free_slots.get(timeout=0.05)
+            except queue.Empty:
+                pass
+        return None
+
+    def feed(self, batches, index, generation, stop):
+        """
+        Reads the batches of the wrapped iterator into free slots, and hands them to the
+        workers, until the iterator ends or stop is set.
+        """
+        while True:
+            slot = self.acquire_slot(stop)
+            if slot is None:
+                return
+            try:
+                batch = next(batches)
+                arrays, others = _split_batch(batch)
+                if self.mode == 'process':
+                    _write_slot(self.in_views, self.in_layout, slot, arrays)
+                    self.tasks.put((generation, index, slot, others))
+                else:
+                    others.update((k, np.array(v)) for k, v in arrays.items())
+                    self.tasks.put((generation, index, slot, others))
+            except StopIteration:
+                self.done.put((generation, index, slot, _End()))
+                return
+            except Exception as e:
+                self.done.put((generation, index, slot, _Failure(e)))
+                return
+            index += 1
+
+    def run_thread_worker(self):
+        while True:
+            task = self.tasks.get()
+            if task is None:
+                return
+            generation, index, slot, batch = task
+            try:
+                batch = self.apply_transform(batch)
+            except Exception as e:
+                batch = _Failure(e)
+            self.done.put((generation, index, slot, batch))
+
+    def wait_done(self, poll_interval=1.0):
+        """
+        Waits for the next batch handed back by a worker or the feeder, checking every
+        poll_interval seconds that no worker process has died, e.g. killed for lack of
+        memory, which would leave the batch it was transforming never handed back.
+        """
+        while True:
+            try:
+                return self.done.get(timeout=poll_interval)
+            except queue.Empty:
+                pass
+            if self.mode != 'process' or self.pool is None:
+                continue
+            exitcodes = [worker.exitcode for worker in self.pool if not worker.is_alive()]
+            if exitcodes:
+                # The surviving workers may hold tasks that never complete, stop them all
+                self.stop_feeder()
+                for worker in self.pool:
+                    worker.terminate()
+                    worker.join()
+                self.pool = None
+                self.started = False
+                self.free_slots = queue.Queue()
+                for slot in range(self.slots):
+                    self.free_slots.put(slot)
+                self.held_slot = None
+                raise RuntimeError("A prefetch worker process exited with code {} while "
+                                   "transforming batches".format(exitcodes[0]))
+
+    def __next__(self):
+        """
+        Returns the next batch of the wrapped iterator, transformed.
+        """
+        if not self.started:
+            self.start()
+        if self.held_slot is not None:
+            self.free_slots.put(self.held_slot)
+            self.held_slot = None
+
+        while self.next_index not in self.pending:
+            generation, index, slot, value = self.wait_done()
+            if generation != self.generation:
+                # A batch of a pass stopped by reset
+                self.free_slots.put(slot)
+                continue
+            self.pending[index] = (slot, value)
+
+        slot, value = self.pending[self.next_index]
+        if isinstance(value, _End):
+            raise StopIteration
+        if isinstance(value, _Failure):
+            raise value.exception
+        del self.pending[self.next_index]
+        self.next_index += 1
+
+        if slot is None:
+            return value
+        if self.mode == 'thread':
+            self.free_slots.put(slot)
+            return value
+        self.held_slot = slot
+        batch = {k: v[slot] for k, v in self.out_views.items()}
+        batch.update(value)
+        return batch
+
+    def next(self):
+        return self.__next__()
+
+    def __iter__(self):
+        return self
@@ -48,6 +48,22 @@ def get_root_ops(computation):
     return values
 
 
+def get_persistent_tensors(computation):
+    """
+    Get the persistent tensors, other than constants and placeholders, of a computation,
+    which are the weights saved and restored.
+
+    Arguments:
+        computation : All outputs of computation (An Op, list of Ops or dictionary of Ops)
+    Returns:
+        Set of persistent tensor Ops
+    """
+    # A ComputationOp keeps its persistent tensors until its graph changes
+    if isinstance(computation, ng.ComputationOp):
+        return computation.persistent_tensors()
+    return ng.Op.find_persistent_tensors(get_root_ops(computation))
+
+
 class Saver(object):
 
     def __init__(self):
@@ -99,41 +115,11 @@ class Saver(object):
             transformer : transformer where the weights are stored
             computation : All outputs of computation (An Op, list of Ops or dictionary of Ops)
         """
-        # collect and return a set of all Variables
-        def find_ops(values):
-            """
-            Find and return all weights.
-            """
-            nodes = dict()
-            frontier = set(values)
-            visited = set()
-
-            def find_op(op_to_add):
-                """
-                find weight (trainable AssignableTensorOp)
-                """
-                tensor = op_to_add.tensor
-                if tensor.is_persistent and not (tensor.is_constant or tensor.is_placeholder):
-                    try:
-                        prev_op = nodes[tensor.name]
-                    except KeyError:
-                        prev_op = tensor
-                        nodes[tensor.name] = tensor
-                    assert prev_op == tensor
-
-            while len(frontier) > 0:
-                op_to_visit = frontier.pop()
-                find_op(op_to_visit)
-                visited.add(op_to_visit)
-                for arg in op_to_visit.args:
-                    if arg not in visited:
-                        frontier.add(arg)
-                for arg in op_to_visit.all_deps:
-                    if arg not in visited:
-                        frontier.add(arg)
-            return nodes
-        # Traverse computation graph and extract persistent tensors and unique op instance name
-        save_variables = find_ops(get_root_ops(computation))
+        # Extract persistent tensors and unique op instance name
+        save_variables = dict()
+        for tensor in get_persistent_tensors(computation):
+            prev_op = save_variables.setdefault(tensor.name, tensor)
+            assert prev_op == tensor
         self.getter_op_names, ops = zip(*save_variables.items())
         if transformer.transformer_name not in ("ngcpu", "nginterp", "nggpu"):
             self.getter = transformer.computation(ops)
@@ -178,40 +164,16 @@ class Saver(object):
             computation : All outputs of computation (An Op, list of Ops or dictionary of Ops)
             filename: name of file with saved weights
         """
-        def match_ops(tensors, values):
-            """
-            Match weights with tensor values loaded from file
-            """
-            nodes = dict()
-            frontier = set(values)
-            visited = set()
-
-            def match_op(op_to_add):
-                """
-                Match a weight with loaded tensor value
-                """
-                tensor = op_to_add.tensor
-                if tensor.is_persistent and not (tensor.is_constant or tensor.is_placeholder):
-                    try:
-                        nodes[tensor] = tensors[tensor.name]
-                    except KeyError:
-                        print("Warning: Missing weight in save file: " + tensor.name)
-
-            while len(frontier) > 0:
-                op_to_visit = frontier.pop()
-                match_op(op_to_visit)
-                visited.add(op_to_visit)
-                for arg in op_to_visit.args:
-                    if arg not in visited:
-                        frontier.add(arg)
-                for arg in op_to_visit.all_deps:
-                    if arg not in visited:
-                        frontier.add(arg)
-            return nodes
         # load weight from file to tensors
         savefile = SaverFile(filename)
         tensors = savefile.read_values()
-        nodes = match_ops(tensors, get_root_ops(computation))
+        # Match weights with tensor values loaded from file
+        nodes = dict()
+        for tensor in get_persistent_tensors(computation):
+            try:
+                nodes[tensor] = tensors[tensor.name]
+            except KeyError:
+                print("Warning: Missing weight in save file: " + tensor.name)
         if transformer.transformer_name not in ("ngcpu", "nginterp", "nggpu"):
             restore_ops = []
             for op_to_save, op_value in nodes.items():
@@ -15,7 +15,6 @@
 # ******************************************************************************
 from __future__ import division
 
-import uuid
 import collections
 import operator
 import itertools
@@ -23,7 +22,7 @@ from functools import reduce, wraps
 from frozendict import frozendict
 
 import numpy as np
-import types
+import weakref
 from builtins import object, map, zip
 
 from neon.util.names import NameableValue
@@ -108,6 +107,11 @@ class Axis(object):
         recurrent: Whether the axis is a recurrent axis.
     """
     __name_counter = 0
+    _uuids = itertools.count()
+
+    # Incremented whenever the name or length of any Axis changes, so that Axes can tell
+    # when the names, lengths and hash they cache have become stale.
+    _generation = 0
 
     def __init__(self,
                  length=None,
@@ -121,18 +125,31 @@ class Axis(object):
             name = '%s_%s' % (type(self).__name__, type(self).__name_counter)
             type(self).__name_counter += 1
 
-        self.name = name
+        self.__name = name
 
         if length is not None and length < 0:
             raise ValueError("Axis length {} must be >= 0".format(length))
         self.__length = length
 
-        self.uuid = uuid.uuid4()
+        self.uuid = next(Axis._uuids)
 
     def named(self, name):
         self.name = name
         return self
 
+    @property
+    def name(self):
+        """
+        Returns:
+            The name of the axis.
+        """
+        return self.__name
+
+    @name.setter
+    def name(self, value):
+        self.__name = value
+        Axis._generation += 1
+
     @property
     def is_flattened(self):
         """
@@ -187,6 +204,7 @@ class Axis(object):
         if value < 0:
             raise ValueError("Axis length {} must be >= 0".format(value))
         self.__length = value
+        Axis._generation += 1
 
     @property
     def axes(self):
@@ -354,20 +372,31 @@ class Axes(object):
     """
     An Axes is a tuple of Axis objects used as a label for a tensor's
     dimensions.
+
+    Axes are immutable and interned: building an Axes from the same sequence of Axis
+    objects as a live Axes returns that Axes. The names, lengths, name to index map and
+    hash are computed once and recomputed only after an Axis is renamed or resized.
     """
+    __slots__ = ('_axes', '_has_flattened', '_generation', '_names', '_name_set',
+                 '_name_index', '_lengths', '_hash', '_derived', 'uuid', '__weakref__')
 
-    def __init__(self, axes=None):
-        if axes is None:
-            axes = []
+    _interned = weakref.WeakValueDictionary()
+    _set_operations = {}
+    _set_operations_maxsize = 1 << 14
+    _uuids = itertools.count()
+
+    def __new__(cls, axes=None):
+        if isinstance(axes, Axes):
+            return axes
+        elif axes is None:
+            axes = ()
         elif isinstance(axes, Axis):
-            axes = [axes]
-        elif isinstance(axes, types.GeneratorType):
-            axes = tuple(axes)
-        elif isinstance(axes, (list, tuple)) and not isinstance(axes, Axes):
-            axes = tuple(axes)
+            axes = (axes,)
         elif isinstance(axes, dict):
             axes = tuple(make_axis(length=value, name=key)
                          for key, value in axes.items())
+        else:
+            axes = tuple(axes)
 
         def convert(seq):
             """
@@ -387,7 +416,15 @@ class Axes(object):
                 elems.append(x)
             return elems
 
-        axes = convert(axes)
+        if not all(isinstance(x, Axis) for x in axes):
+            axes = tuple(convert(axes))
+
+        # The interned Axes holds its Axis objects, so their ids cannot be reused while
+        # the entry exists.
+        key = tuple(map(id, axes))
+        interned = cls._interned.get(key)
+        if interned is not None:
+            return interned
 
         for x in axes:
             if not isinstance(x, Axis):
@@ -399,13 +436,59 @@ class Axes(object):
                     found_type=type(x),
                 ))
 
-        if duplicates(axes):
+        if len(set(x.name for x in axes)) != len(axes):
             raise ValueError(
                 'The axes labels of a tensor cannot contain duplicates.  Found: {}'
                 .format(str(duplicates(axes)))
             )
-        self._axes = tuple(axes)
-        self.uuid = uuid.uuid4()
+
+        self = super(Axes, cls).__new__(cls)
+        self._axes = axes
+        self._has_flattened = any(x.is_flattened for x in axes)
+        self._generation = None
+        self.uuid = next(Axes._uuids)
+        cls._interned[key] = self
+        return self
+
+    def __reduce__(self):
+        return Axes, (self._axes,)
+
+    def _cached(self):
+        """
+        Recomputes the cached names, lengths and hash if an Axis changed since they
+        were computed.
+
+        Returns:
+            This Axes.
+        """
+        if self._generation != Axis._generation:
+            names = tuple(x.name for x in self._axes)
+            self._names = names
+            self._name_set = frozenset(names)
+            self._name_index = {name: i for i, name in enumerate(names)}
+            self._lengths = tuple(x.length for x in self._axes)
+            self._hash = hash(self._axes)
+            self._derived = {}
+            self._generation = Axis._generation
+        return self
+
+    def _derive(self, key, compute):
+        """
+        Returns a value derived from this Axes, computing it on the first request.
+
+        Arguments:
+            key: Name of the derived value.
+            compute: Function of this Axes returning the value.
+
+        Returns:
+            The derived value.
+        """
+        derived = self._cached()._derived
+        try:
+            return derived[key]
+        except KeyError:
+            value = derived[key] = compute(self)
+            return value
 
     @property
     def full_lengths(self):
@@ -427,7 +510,7 @@ class Axes(object):
         Returns:
             tuple: The names of the outer axes.
         """
-        return tuple(x.name for x in self)
+        return self._cached()._names
 
     @property
     def lengths(self):
@@ -435,8 +518,7 @@ class Axes(object):
         Returns:
             tuple: The lengths of the outer axes.
         """
-
-        return tuple(x.length for x in self)
+        return self._cached()._lengths
 
     def get_by_names(self, *names):
         """
@@ -471,6 +553,9 @@ class Axes(object):
             The tensor's batch Axis wrapped in an Axes object if there is one
             on this tensor, otherwise returns None
         """
+        return self._derive('batch_axes', Axes._batch_axes)
+
+    def _batch_axes(self):
         batch_axis = self.batch_axis()
         if batch_axis:
             return Axes([batch_axis])
@@ -507,14 +592,17 @@ class Axes(object):
         Returns:
             The Axes subset that are not batch axes.
         """
-        return Axes(axis for axis in self if not axis.is_batch)
+        return self._derive('sample_axes',
+                            lambda axes: Axes(axis for axis in axes if not axis.is_batch))
 
     def feature_axes(self):
         """
         Returns:
             The Axes subset that are not batch or recurrent axes.
         """
-        return Axes(axis for axis in self if not axis.is_batch and not axis.is_recurrent)
+        return self._derive('feature_axes',
+                            lambda axes: Axes(axis for axis in axes
+                                              if not axis.is_batch and not axis.is_recurrent))
 
     def recurrent_axis(self):
         """
@@ -555,7 +643,10 @@ class Axes(object):
             axis.length = length
 
     def find_by_name(self, name):
-        return Axes(axis for axis in self if axis.name == name)
+        index = self._cached()._name_index.get(name)
+        if index is None:
+            return Axes()
+        return Axes(self._axes[index])
 
     def __iter__(self):
         return self._axes.__iter__()
@@ -584,13 +675,14 @@ class Axes(object):
             current axes concatenated with the other axes
         """
         # self and other could not have common element
-        other = make_axes(other)
-        common_axes = self & other
-        if len(common_axes) != 0:
+        return self._set_operation('+', make_axes(other), Axes._concatenate)
+
+    def _concatenate(self, other):
+        if not self._is_disjoint(other):
             raise ValueError("Trying to concatenate %s with %s, but they have"
                              "common axes %s, which is not allowed."
-                             % (self, other, common_axes))
-        return make_axes(tuple(self) + tuple(other))
+                             % (self, other, self & other))
+        return make_axes(self._axes + other._axes)
 
     def __sub__(self, other):
         """
@@ -602,8 +694,12 @@ class Axes(object):
         Returns:
             The ordered set difference of axes
         """
-        other = make_axes(other)
-        return make_axes((axis for axis in self if axis not in other))
+        return self._set_operation('-', make_axes(other), Axes._difference)
+
+    def _difference(self, other):
+        if self._is_disjoint(other):
+            return self
+        return make_axes(axis for axis in self._axes if not other._contains(axis))
 
     def __or__(self, other):
         """
@@ -615,9 +711,11 @@ class Axes(object):
         Returns:
             The ordered set union of axes
         """
-        other = make_axes(other)
-        return make_axes(tuple(self) +
-                         tuple(axis for axis in Axes(other) if axis not in self))
+        return self._set_operation('|', make_axes(other), Axes._union)
+
+    def _union(self, other):
+        return make_axes(self._axes
+                         + tuple(axis for axis in other._axes if not self._contains(axis)))
 
     def __and__(self, other):
         """
@@ -629,8 +727,53 @@ class Axes(object):
         Returns:
             The ordered set intersection of axes
         """
-        other = make_axes(other)
-        return make_axes((axis for axis in self._axes if axis in other))
+        return self._set_operation('&', make_axes(other), Axes._intersection)
+
+    def _intersection(self, other):
+        return make_axes(axis for axis in self._axes if other._contains(axis))
+
+    def _set_operation(self, operation, other, compute):
+        """
+        Returns the memoized result of a set operation between self and other.
+
+        The memo is keyed by the identities of both operands and keeps them alive, and
+        is dropped as a whole when it grows past _set_operations_maxsize.
+
+        Arguments:
+            operation: Symbol of the operation.
+            other (Axes): The right-hand side operand.
+            compute: Function of self and other computing the result.
+
+        Returns:
+            Axes: The result.
+        """
+        key = (operation, id(self), id(other))
+        memo = Axes._set_operations.get(key)
+        if memo is not None and memo[0] == Axis._generation:
+            return memo[3]
+        result = compute(self, other)
+        if len(Axes._set_operations) >= Axes._set_operations_maxsize:
+            Axes._set_operations.clear()
+        Axes._set_operations[key] = (Axis._generation, self, other, result)
+        return result
+
+    def _contains(self, axis):
+        """
+        Same as ``axis in self``, looking the axis up by name when neither it nor this
+        Axes involves a FlattenedAxis, which compare by their component axes.
+        """
+        if self._has_flattened or axis.is_flattened:
+            return axis in self._axes
+        return axis.name in self._cached()._name_set
+
+    def _is_disjoint(self, other):
+        """
+        Returns:
+            True if no Axis of self is in other.
+        """
+        if self._has_flattened or other._has_flattened:
+            return not any(axis in other._axes for axis in self._axes)
+        return self._cached()._name_set.isdisjoint(other._cached()._name_set)
 
     def __eq__(self, other):
         """
@@ -649,7 +792,7 @@ class Axes(object):
                 'other must be of type Axes, found type {}'
             ).format(type(other)))
 
-        return self._axes.__eq__(other._axes)
+        return self is other or self._axes == other._axes
 
     def __ne__(self, other):
         """
@@ -669,7 +812,7 @@ class Axes(object):
         return bool(self._axes)
 
     def __hash__(self):
-        return hash(self._axes)
+        return self._cached()._hash
 
     def is_sub_set(self, other):
         """
@@ -681,7 +824,7 @@ class Axes(object):
         Returns:
             bool, true if other is subset of self
         """
-        return set(self.names).issubset(set(make_axes(other).names))
+        return self._cached()._name_set <= make_axes(other)._cached()._name_set
 
     def is_super_set(self, other):
         """
@@ -693,7 +836,7 @@ class Axes(object):
         Returns:
             bool, true if other is superset of self
         """
-        return set(self.names).issuperset(set(make_axes(other).names))
+        return self._cached()._name_set >= make_axes(other)._cached()._name_set
 
     def is_equal_set(self, other):
         """
@@ -705,7 +848,7 @@ class Axes(object):
         Returns:
             bool, true if other has the same set of Axis names as self
         """
-        return set(self.names) == set(make_axes(other).names)
+        return self._cached()._name_set == make_axes(other)._cached()._name_set
 
     def is_not_equal_set(self, other):
         """
@@ -733,6 +876,10 @@ class Axes(object):
         Returns:
             The index.
         """
+        if isinstance(axis, Axis) and not (self._has_flattened or axis.is_flattened):
+            index = self._cached()._name_index.get(axis.name)
+            if index is not None:
+                return index
         return self._axes.index(axis)
 
     @staticmethod
@@ -17,10 +17,10 @@ from __future__ import division
 
 from contextlib import contextmanager
 import collections
-import uuid
+import itertools
+import weakref
 
 import inspect
-import cachetools
 import numpy as np
 from builtins import object
 from functools import wraps
@@ -50,6 +50,67 @@ def tensor_descriptions(args):
     return (arg.tensor_description() for arg in args)
 
 
+class TensorDescriptionCache(object):
+    """
+    Cache for the tensor descriptions of ops.
+
+    A cached tensor description is stored on its op, so entries live exactly as long as
+    their op instead of pinning discarded graphs for the life of the process. clear()
+    drops every entry at once by starting a new generation, which makes entries stored
+    under an older generation stale.
+
+    Attributes:
+        hits: Number of lookups answered from the cache.
+        misses: Number of lookups that computed the tensor description.
+        generation: Number of times the cache was cleared.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.generation = 0
+        self._ops = weakref.WeakSet()
+
+    @property
+    def size(self):
+        """
+        Number of ops with a current cached tensor description.
+        """
+        return len(self._ops)
+
+    def __len__(self):
+        return self.size
+
+    def clear(self):
+        """
+        Drops all cached tensor descriptions.
+        """
+        self.generation += 1
+        self._ops = weakref.WeakSet()
+
+    def stats(self):
+        """
+        Returns:
+            dict: The hits, misses, size and generation of the cache.
+        """
+        return dict(hits=self.hits, misses=self.misses, size=self.size,
+                    generation=self.generation)
+
+    def __call__(self, method):
+        @wraps(method)
+        def cached_method(op):
+            entry = op._tdcache_entry
+            if entry is not None and entry[0] == self.generation:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            value = method(op)
+            op._tdcache_entry = (self.generation, value)
+            self._ops.add(op)
+            return value
+        return cached_method
+
+
 def tdcache():
     """
     Decorator to mark tensor description method as cached.
@@ -57,10 +118,27 @@ def tdcache():
     Returns:
         Cache decorator set to use a particular cache.
     """
-    return cachetools.cached(cache=tdcache.tensor_description_cache)
+    return tdcache.tensor_description_cache
+
+
+tdcache.tensor_description_cache = TensorDescriptionCache()
+
+
+def tensor_description_cache_stats():
+    """
+    Counters of the tensor description cache.
+
+    Returns:
+        dict: The hits, misses, size and generation of the cache.
+    """
+    return tdcache.tensor_description_cache.stats()
 
 
-tdcache.tensor_description_cache = {}
+def clear_tensor_description_cache():
+    """
+    Drops all cached tensor descriptions. Transformers call this when they are closed.
+    """
+    tdcache.tensor_description_cache.clear()
 
 
 @contextmanager
@@ -95,7 +173,7 @@ def with_op_metadata(f, metadata=None):
             result = f(*args, **kwargs)
         # If this decorator is applied to a method of a class with a class
         # variable called `metadata` then we add that to the
-        if len(args) > 0 and hasattr(type(args[0]), 'metadata'):
+        if len(args) > 0 and isinstance(getattr(type(args[0]), 'metadata', None), dict):
             metadata.update(type(args[0]).metadata)
         for op in ops:
             op.metadata.update(metadata)
@@ -163,8 +241,21 @@ class Op(ScopedNameableValue):
         metadata: Dictionary with of string keys and values used for attaching
             arbitrary metadata to nodes.
         trainable: The value is trainable.
+        uuid (int): Unique id of the op, increasing in order of creation.
     """
 
+    # Ops are created in large numbers, so the attributes every op has are kept in slots
+    # and the metadata, style and control_deps containers are only allocated when used.
+    __slots__ = ('_args', '_metadata', '_style', '_control_deps', '_deriv_handler', '_const',
+                 'uuid', '_is_constant', '_is_persistent', '_is_trainable', '_forward',
+                 '_ordered_ops_stamp', '_ordered_ops_memo', '_tdcache_entry')
+
+    _uuids = itertools.count()
+    _slot_names_cache = dict()
+
+    # Active GraphWorklists, notified when the dependencies of an op change or it is forwarded
+    _graph_worklists = []
+
     # Default is to not collect Ops as they are created
     @staticmethod
     def _get_thread_ops():
@@ -227,8 +318,7 @@ class Op(ScopedNameableValue):
             op = frontier.pop()
             op_set.add(op)
 
-            for key in op.__dict__:
-                val = getattr(op, key)
+            for key, val in op._attribute_items():
                 if isinstance(val, Op) and val not in op_set:
                     frontier.add(val)
                 elif isinstance(val, dict):
@@ -241,6 +331,12 @@ class Op(ScopedNameableValue):
                             frontier.add(item)
         return op_set
 
+    # The last result of ordered_ops is kept on its first root, with the ids of the roots
+    # and the memo generation, so that it is freed with the graph. Ops in a memoized result
+    # are stamped with the generation, and mutating a stamped op starts a new generation,
+    # which invalidates every memoized result.
+    _ordered_ops_generation = 0
+
     @staticmethod
     def ordered_ops(roots):
         """
@@ -248,49 +344,108 @@ class Op(ScopedNameableValue):
         using depenency edges rather than dataflow edges, for example,
         `top_sort(a -> b -> c) => [c, b, a]`.
 
+        Results are memoized by root set until an op in the result is mutated by
+        `_set_args`, `add_control_dep`, `remove_control_dep` or forwarding.
+
         Args:
             roots: List of ops.
 
         Returns:
             A list of sorted ops.
         """
-        ordered_ops = []
-        available = OrderedSet()
-        counts = dict()
-        parents = defaultdict(OrderedSet)
-        ready = OrderedSet()
+        roots = [root.forwarded for root in roots]
+        if not roots:
+            return []
+        key = tuple(id(root) for root in roots)
+        generation = Op._ordered_ops_generation
+        memo = roots[0]._ordered_ops_memo
+        if memo is not None and memo[0] == generation and memo[1] == key:
+            return list(memo[2])
+        ordered_ops = Op._ordered_ops(roots)
+        for op in ordered_ops:
+            op._ordered_ops_stamp = generation
+        roots[0]._ordered_ops_memo = (generation, key, ordered_ops)
+        return list(ordered_ops)
 
-        available.update(root.forwarded for root in roots)
-        while available:
-            node = available.pop()
-
-            if node in counts or node in ready:
+    @staticmethod
+    def _ordered_ops(roots):
+        """
+        Uncached topological sort of the ops reachable from the forwarded roots.
+
+        Ops get dense integer indices in discovery order so that the bookkeeping is done
+        with plain lists. The discovery stack and the ready stack behave exactly like the
+        OrderedSets of the original formulation, which keeps the order deterministic.
+        """
+        index = dict()
+        ops = []
+        children_of = []
+        ready = []
+
+        stack = []
+        on_stack = set()
+        for root in roots:
+            if root not in on_stack:
+                on_stack.add(root)
+                stack.append(root)
+
+        while stack:
+            node = stack.pop()
+            on_stack.discard(node)
+            if node in index:
                 continue
+            index[node] = len(ops)
+
+            children = []
+            seen = set()
+            for child in node.all_deps:
+                child = child.forwarded
+                if child not in seen:
+                    seen.add(child)
+                    children.append(child)
+                    if child not in on_stack:
+                        on_stack.add(child)
+                        stack.append(child)
+            if not children:
+                ready.append(len(ops))
+            ops.append(node)
+            children_of.append(children)
+
+        counts = [len(children) for children in children_of]
+        parents = [[] for _ in ops]
+        for parent, children in enumerate(children_of):
+            for child in children:
+                parents[index[child]].append(parent)
 
-            children = OrderedSet((child.forwarded for child in node.all_deps))
-            if children:
-                counts[node] = len(children)
-                for child in children:
-                    parents[child].add(node)
-                available.update(children)
-            else:
-                ready.add(node)
-
+        ordered_ops = []
         while ready:
             node = ready.pop()
-            ordered_ops.append(node)
-            for p in parents.get(node, []):
-                count = counts[p] - 1
+            ordered_ops.append(ops[node])
+            for parent in parents[node]:
+                count = counts[parent] - 1
+                counts[parent] = count
                 if count == 0:
-                    ready.add(p)
-                    del counts[p]
-                else:
-                    counts[p] = count
-        if len(counts) > 0:
+                    ready.append(parent)
+        if len(ordered_ops) != len(ops):
             raise ValueError("Graph not a DAG")
 
         return ordered_ops
 
+    @staticmethod
+    def _ordered_ops_changed(op):
+        """
+        Drops the memoized ordered_ops results if op is part of any of them.
+        """
+        if op._ordered_ops_stamp == Op._ordered_ops_generation:
+            Op._ordered_ops_generation += 1
+
+    @staticmethod
+    def _deps_changed(op):
+        """
+        Notifies the active GraphWorklists that the dependencies of op changed.
+        """
+        for worklist in Op._graph_worklists:
+            worklist.deps_changed(op)
+
     @staticmethod
     def visit_input_closure(roots, fun):
         """
@@ -314,21 +469,25 @@ class Op(ScopedNameableValue):
                  trainable=False,
                  **kwargs):
         super(Op, self).__init__(**kwargs)
+        self._ordered_ops_stamp = -1
+        self._ordered_ops_memo = None
+        self._tdcache_entry = None
         self._args = None
         self._set_args(as_op(arg) for arg in args)
-        self.metadata = dict()
+        self._metadata = None
 
         if metadata is not None:
             if not isinstance(metadata, dict):
                 raise ValueError("Metadata must be of type dict,"
                                  "not {} of {}".format(type(metadata), metadata))
-            self.metadata.update(metadata)
+            if metadata:
+                self._metadata = dict(metadata)
 
-        # List to keep generation deterministic
-        self._control_deps = OrderedSet()
+        # OrderedSet to keep generation deterministic, created by add_control_dep
+        self._control_deps = None
         self._deriv_handler = None
         self._const = const
-        self.uuid = uuid.uuid4()
+        self.uuid = next(Op._uuids)
         self._is_constant = constant
         self._is_persistent = persistent
         self._is_trainable = trainable
@@ -341,9 +500,61 @@ class Op(ScopedNameableValue):
         if all_ops is not None:
             all_ops.append(self)
 
-        self.style = {}
+        self._style = None
         self._forward = None
 
+    @property
+    def metadata(self):
+        """
+        Dictionary of string keys and values attached to this op, created on first use.
+        """
+        if self._metadata is None:
+            self._metadata = dict()
+        return self._metadata
+
+    @metadata.setter
+    def metadata(self, metadata):
+        self._metadata = metadata
+
+    @property
+    def style(self):
+        """
+        Dictionary of display attributes of this op, created on first use.
+        """
+        if self._style is None:
+            self._style = dict()
+        return self._style
+
+    @style.setter
+    def style(self, style):
+        self._style = style
+
+    @staticmethod
+    def _slot_names(cls):
+        names = Op._slot_names_cache.get(cls)
+        if names is None:
+            names = []
+            for klass in cls.__mro__:
+                slots = klass.__dict__.get('__slots__', ())
+                if isinstance(slots, str):
+                    slots = (slots,)
+                names.extend(name for name in slots if name not in ('__dict__', '__weakref__'))
+            Op._slot_names_cache[cls] = names
+        return names
+
+    def _attribute_items(self):
+        """
+        The (name, value) pairs of the instance attributes of this op, whether they are
+        kept in its __dict__ or in slots.
+        """
+        for item in self.__dict__.items():
+            yield item
+        for name in Op._slot_names(type(self)):
+            try:
+                yield name, getattr(self, name)
+            except AttributeError:
+                pass
+
     def copy_with_new_args(self, args):
         """
         This method creates a new op given an original op and new args. The purpose here
@@ -364,6 +575,9 @@ class Op(ScopedNameableValue):
         self._args = tuple(args)
         self.invalidate_property_cache('all_deps')
         self.invalidate_property_cache('call_info')
+        Op._ordered_ops_changed(self)
+        if Op._graph_worklists:
+            Op._deps_changed(self)
 
     @property
     def tensor(self):
@@ -545,11 +759,15 @@ class Op(ScopedNameableValue):
 
         # Make sure everything that is supposed to happen
         # before this op still happens
-        for dep in self._control_deps:
+        for dep in self.control_deps:
             value.add_control_dep(dep)
         self._forward = value
+        Op._ordered_ops_changed(self)
+        for worklist in Op._graph_worklists:
+            worklist.replaced(self, value)
         tdcache.tensor_description_cache.clear()
-        value.metadata.update(self.metadata)
+        if self._metadata:
+            value.metadata.update(self._metadata)
 
     @property
     def forwarded(self):
@@ -575,7 +793,9 @@ class Op(ScopedNameableValue):
             outside of the Op class should still avoid changing x._all_deps,
             x._control_deps and x._args directly.
         """
-        return OrderedSet(self.args) | self.control_deps
+        if self._control_deps:
+            return OrderedSet(self.args) | self._control_deps
+        return OrderedSet(self.args)
 
     def invalidate_property_cache(self, property_name):
         """
@@ -595,6 +815,8 @@ class Op(ScopedNameableValue):
         Returns:
             Control dependency of the op.
         """
+        if self._control_deps is None:
+            return OrderedSet()
         return self._control_deps
 
     def add_control_dep(self, dep):
@@ -607,9 +829,14 @@ class Op(ScopedNameableValue):
         dep = dep.forwarded
         if dep is not self and dep not in self.all_deps:
             # update control_deps
+            if self._control_deps is None:
+                self._control_deps = OrderedSet()
             self._control_deps.add(dep)
             # invalidate deps cache as self._control_deps is updated
             self.invalidate_property_cache('all_deps')
+            Op._ordered_ops_changed(self)
+            if Op._graph_worklists:
+                Op._deps_changed(self)
 
     def remove_control_dep(self, dep):
         """
@@ -625,6 +852,9 @@ class Op(ScopedNameableValue):
             self._control_deps.remove(dep.forwarded)
             # invalidate deps cache as self._control_deps is updated
             self.invalidate_property_cache('all_deps')
+            Op._ordered_ops_changed(self)
+            if Op._graph_worklists:
+                Op._deps_changed(self)
 
     def update_forwards(self):
         """
@@ -644,6 +874,9 @@ class Op(ScopedNameableValue):
             if self._args != new_args:
                 self._args = new_args
                 self.invalidate_property_cache('all_deps')
+                Op._ordered_ops_changed(self)
+                if Op._graph_worklists:
+                    Op._deps_changed(self)
 
         # replace self._control_deps with self._control_deps's forwarded op
         control_deps_forward = [op.forward for op in self.control_deps]
@@ -652,6 +885,9 @@ class Op(ScopedNameableValue):
             if self._control_deps != new_control_deps:
                 self._control_deps = new_control_deps
                 self.invalidate_property_cache('all_deps')
+                Op._ordered_ops_changed(self)
+                if Op._graph_worklists:
+                    Op._deps_changed(self)
 
     def replace_self(self, rep):
         self.forward = as_op(rep)
@@ -707,10 +943,38 @@ class Op(ScopedNameableValue):
         return OrderedSet([op.tensor for op in Op.ordered_ops([self])
                            if op.tensor.is_placeholder])
 
+    def persistent_tensors(self):
+        """
+        Return all persistent tensors used in computing this node that are neither
+        constants nor placeholders, such as the variables saved by a Saver.
+
+        Returns:
+            Set of persistent tensor Ops, in execution order.
+        """
+        return Op.find_persistent_tensors([self])
+
+    @staticmethod
+    def find_persistent_tensors(roots):
+        """
+        Return all persistent tensors used in computing roots that are neither constants
+        nor placeholders.
+
+        Args:
+            roots: List of ops.
+
+        Returns:
+            Set of persistent tensor Ops, in execution order.
+        """
+        tensors = OrderedSet()
+        for op in Op.ordered_ops(roots):
+            tensor = op.tensor
+            if tensor.is_persistent and not (tensor.is_constant or tensor.is_placeholder):
+                tensors.add(tensor)
+        return tensors
+
     def tensor_description(self):
         return None
 
-    @cachetools.cached({})
     def call_info(self):
         """
         Creates the TensorDescriptions (of this op or its arguments)
@@ -1028,6 +1292,26 @@ class ComputationOp(ParallelOp):
         for arg in args:
             self.add_control_dep(arg)
 
+    def persistent_tensors(self):
+        """
+        Return all persistent tensors used by this computation that are neither constants
+        nor placeholders.
+
+        The set is kept on the computation until an op of its graph changes, as tracked
+        for ordered_ops, so that repeated lookups, such as setting up a Saver at every
+        checkpoint, do not walk the graph again.
+
+        Returns:
+            Set of persistent tensor Ops, in execution order.
+        """
+        memo = self.__dict__.get('_persistent_tensors_memo')
+        if memo is not None and memo[0] == Op._ordered_ops_generation:
+            return OrderedSet(memo[1])
+        # ordered_ops stamps the ops of the graph, so any change starts a new generation
+        tensors = super(ComputationOp, self).persistent_tensors()
+        self._persistent_tensors_memo = (Op._ordered_ops_generation, tuple(tensors))
+        return tensors
+
 
 def computation(returns, *args):
     """
@@ -1062,6 +1346,8 @@ class TensorOp(Op):
         **kwargs: Arguments for related classes.
     """
 
+    __slots__ = ('dtype', '_axes', 'scale')
+
     def __init__(self, dtype=None, axes=None, scale=None, is_value_op=None, **kwargs):
         super(TensorOp, self).__init__(**kwargs)
         if not is_value_op:
@@ -1075,8 +1361,10 @@ class TensorOp(Op):
     def is_tensor_op(self):
         return True
 
+    # Weakly keyed so that the constants do not keep discarded graphs alive
+    _ones = weakref.WeakKeyDictionary()
+
     @property
-    @cachetools.cached(cache=dict())
     def one(self):
         """
         Returns a singleton constant 1 for this Op. Used by DerivOp to ensure that
@@ -1086,9 +1374,11 @@ class TensorOp(Op):
             A unique constant 1 associated with this TensorOp.
 
         """
-        return as_op(1)
+        one = TensorOp._ones.get(self)
+        if one is None:
+            one = TensorOp._ones[self] = as_op(1)
+        return one
 
-    @cachetools.cached({})
     def adjoints(self, error):
         """
         Returns a map containing the adjoints of this op with respect to other
@@ -1101,6 +1391,28 @@ class TensorOp(Op):
                 the derivative will be computed at. Must have the same axes as dependent.
 
 
+        Returns:
+            Map from Op to dSelf/dOp.
+        """
+        # The memo is kept on the op rather than in a global cache, so that it is freed
+        # with the graph.
+        memo = self.__dict__.setdefault('_adjoints_memo', dict())
+        if error not in memo:
+            memo[error] = self.backprop(error)
+        return memo[error]
+
+    def backprop(self, error, independents=None):
+        """
+        Generates the adjoints of this op with respect to other ops in one reverse sweep
+        over the graph, without memoizing the result.
+
+        Arguments:
+            error (TensorOp): The tensor holding the error value the derivative will be
+                computed at. Must have the same axes as dependent.
+            independents (list, optional): If given, only ops through which one of these
+                ops influences this op are visited, so no adjoints are generated for parts
+                of the graph, such as input preprocessing, that no independent depends on.
+
         Returns:
             Map from Op to dSelf/dOp.
         """
@@ -1108,15 +1420,26 @@ class TensorOp(Op):
             self.tensor: error,
         }
 
+        ops = Op.ordered_ops([self])
+        needed = None
+        if independents is not None:
+            needed = set(independent.forwarded.tensor for independent in independents)
+            for o in ops:
+                if o.tensor in needed or any(dep.forwarded.tensor in needed
+                                             for dep in o.all_deps):
+                    needed.add(o.tensor)
+
         # visit ops in reverse depth first post-order. it is important that
         # ordered_ops returns a copy of this traversal order since the graph
         # may change as we generate adjoints and we don't want to visit those
         # new ops. Some ops may be containers for other ops, so we create an
         # ordered set to ensure we don't do multiple backprops.
         processed = set()
-        for o in reversed(Op.ordered_ops([self])):
+        for o in reversed(ops):
             if o.tensor in processed:
                 continue
+            if needed is not None and o.tensor not in needed:
+                continue
             if o.tensor in adjoints:
                 adjoint = adjoints[o.tensor]
                 if o.scale is not None:
@@ -1126,8 +1449,9 @@ class TensorOp(Op):
 
                 # find hetr distribution metadata, pass other data if exists
                 hetr_meta_key = ['device', 'device_id', 'parallel']
-                hetr_metadata = {k: o.metadata[k] for k in hetr_meta_key
-                                 if o.metadata.get(k) is not None}
+                op_metadata = o._metadata or {}
+                hetr_metadata = {k: op_metadata[k] for k in hetr_meta_key
+                                 if op_metadata.get(k) is not None}
                 with metadata(**hetr_metadata):
                     deriv_handler.generate_adjoints(adjoints, adjoint, *deriv_handler.args)
 
@@ -1366,6 +1690,8 @@ class ValueOp(TensorOp, ControlBlockOp):
         tensor: The tensor supplying the value for this op.
     """
 
+    __slots__ = ('_tensor',)
+
     def __init__(self, tensor=None, **kwargs):
         super(ValueOp, self).__init__(args=(), is_value_op=True, **kwargs)
         self._tensor = tensor
@@ -1400,6 +1726,7 @@ class ValueOp(TensorOp, ControlBlockOp):
     @value_tensor.setter
     def value_tensor(self, tensor):
         self._tensor = tensor
+        Op._ordered_ops_changed(self)
 
     @property
     def all_deps(self):
@@ -4197,16 +4524,24 @@ class DerivOp(ValueOp):
 
         self.error = as_op(error)
         adjoints = dependent.forwarded.adjoints(error)
+        self.value_tensor = _adjoint_value(adjoints, self.independent)
 
-        if independent.forwarded.tensor not in adjoints:
-            self.value_tensor = constant(0, independent.axes)
-        else:
-            adjoint = adjoints[independent.forwarded.tensor]
-            self.value_tensor = broadcast(adjoint.forwarded, axes=independent.axes)
 
-        # add hetr metadata to the deriv op
-        # should be allreduced across data-parallel workers
-        self.value_tensor.metadata['reduce_func'] = 'sum'
+def _adjoint_value(adjoints, independent):
+    """
+    The derivative with respect to independent, with the axes of independent, from a map
+    of adjoints.
+    """
+    if independent.forwarded.tensor not in adjoints:
+        value = constant(0, independent.axes)
+    else:
+        adjoint = adjoints[independent.forwarded.tensor]
+        value = broadcast(adjoint.forwarded, axes=independent.axes)
+
+    # add hetr metadata to the deriv op
+    # should be allreduced across data-parallel workers
+    value.metadata['reduce_func'] = 'sum'
+    return value
 
 
 def deriv(dependent, independent, error=None):
@@ -4227,6 +4562,39 @@ def deriv(dependent, independent, error=None):
     return DerivOp(dependent, independent, error).value_tensor
 
 
+def gradients(dependent, independents, error=None):
+    """
+    Computes [dDependent/dIndependent](error=1) for each of several independents.
+
+    Unlike calling deriv for each independent, the adjoints are generated by a single
+    reverse sweep that only visits the ops through which some independent influences
+    dependent.
+
+    Args:
+        dependent (TensorOp): Dependent op.
+        independents (list): Independent ops, e.g. the variables of a model.
+        error (TensorOp, optional): The tensor holding the error where the
+            derivatives will be computed at. Must have the same axes as dependent.
+
+    Returns:
+        list: The derivatives applied to error, in the order of independents. Each has
+            the axes of its independent.
+
+    Examples:
+        grads = ng.gradients(batch_cost, variables)
+    """
+    dependent = as_op(dependent)
+    independents = [as_op(independent) for independent in independents]
+    if error is None:
+        error = dependent.one
+    error = as_op(error)
+    if not error.axes.is_equal_set(dependent.axes):
+        raise ValueError("Dependent and error must have the same set of axes")
+
+    adjoints = dependent.forwarded.backprop(error, independents)
+    return [_adjoint_value(adjoints, independent) for independent in independents]
+
+
 class CrossEntropyMultiOp(ValueOp):
     """
     Computes the cross-entropy of two distributions.
@@ -0,0 +1,357 @@
+# ******************************************************************************
+# Copyright 2017-2018 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ******************************************************************************
+from __future__ import division
+
+from orderedset import OrderedSet
+
+from neon.op_graph.axes import make_axes, make_axis
+from neon.op_graph.op_graph import Op, TensorOp, ConcatOp, as_op, as_ops, axes_with_order, \
+    broadcast, constant, expand_dims, tensor_slice
+
+
+def scan(step, sequences, init_states, axis, reverse=False, pos=0, docstring=None):
+    """
+    Applies step along axis, carrying states from one step to the next.
+
+    The step function is called exactly once, on stand-in ops for one slice of each sequence
+    and for the current value of each state, so the size of the resulting graph does not depend
+    on the length of axis.  Ops created outside of step that the body reads (weights, biases)
+    are passed into every step unchanged.
+
+    Args:
+        step: A function step(inputs, states) returning a pair (outputs, new_states).
+            inputs holds one slice of each sequence and states the current states; outputs
+            is a list of per-step values and new_states must have the axes of states.
+        sequences (list of TensorOp): Tensors that are sliced along axis.
+        init_states (list of TensorOp): Initial values of the carried states.
+        axis (Axis): The axis to iterate over.
+        reverse (bool): If True, iterate from the last index of axis to the first.
+        pos (int): Position of axis in the axes of the stacked outputs.
+        docstring (String, optional): Documentation for the op.
+
+    Returns:
+        tuple: (outputs, final_states) where each output is stacked along axis in index order
+            and final_states hold the states after the last step.
+    """
+    sequences = as_ops(sequences)
+    init_states = as_ops(init_states)
+    for x in sequences:
+        if axis not in x.axes:
+            raise ValueError("Sequence {} does not have axis {}".format(x, axis))
+
+    sequence_leaves = [ScanLeafOp(axes=x.axes - make_axes([axis])) for x in sequences]
+    state_leaves = [ScanLeafOp(axes=s.axes) for s in init_states]
+
+    outputs, new_states = step(list(sequence_leaves), list(state_leaves))
+    outputs = as_ops(outputs)
+    if len(new_states) != len(state_leaves):
+        raise ValueError("step returned {} states, expected {}"
+                         .format(len(new_states), len(state_leaves)))
+    new_states = [_with_axes(as_op(s), leaf.axes) for s, leaf in zip(new_states, state_leaves)]
+
+    scan_op = ScanOp(sequences, sequence_leaves, init_states, state_leaves, new_states, outputs,
+                     axis=axis, reverse=reverse, pos=pos, docstring=docstring)
+    return scan_op.outputs, scan_op.final_states
+
+
+def _with_axes(x, axes):
+    """
+    Returns x with exactly the given axes, reordering or broadcasting as needed.
+    """
+    if x.axes == axes:
+        return x
+    if not x.axes.is_equal_set(axes):
+        x = broadcast(axes_with_order(x, [axis for axis in axes if axis in x.axes]), axes)
+    return axes_with_order(x, axes)
+
+
+def _is_local(op):
+    """
+    Constants are cheap to materialize, so the body keeps its own copy instead of
+    passing them in on every step.
+    """
+    return not op.args and op.tensor.is_constant
+
+
+def _trace_body(results, leaves):
+    """
+    Finds the ops computed on each step and the values they read from outside the body.
+
+    Args:
+        results: The values the body returns.
+        leaves: The stand-in ops for sequence slices and states.
+
+    Returns:
+        tuple: (body_ops, captures), body_ops in topological order.
+    """
+    ops = Op.ordered_ops(results)
+    leaves = set(leaves)
+    variant = set(leaves)
+    for op in ops:
+        if op not in leaves and any(arg in variant for arg in op.args):
+            variant.add(op)
+
+    captures = OrderedSet()
+    local = set()
+    reads = [arg for op in ops if op in variant for arg in op.args]
+    for arg in reads + [op for op in results if op not in variant]:
+        if arg in variant:
+            continue
+        if _is_local(arg):
+            local.add(arg)
+        else:
+            captures.add(arg)
+
+    body_ops = [op for op in ops if (op in variant and op not in leaves) or op in local]
+    return body_ops, list(captures)
+
+
+def _body_adjoints(body_ops, seeds):
+    """
+    Back-propagates through one step of a body.
+
+    This is TensorOp.adjoints restricted to the ops of the body and seeded on several
+    results at once, so that captured values outside the body are left alone.
+
+    Args:
+        body_ops: The ops of the body in topological order.
+        seeds: (op, error) pairs for the body results.
+
+    Returns:
+        Map from Op to its adjoint for a single step.
+    """
+    adjoints = {}
+    for op, error in seeds:
+        op.generate_add_delta(adjoints, error)
+
+    processed = set()
+    for o in reversed(body_ops):
+        if o.tensor in processed or o.tensor not in adjoints:
+            continue
+        adjoint = adjoints[o.tensor]
+        if o.scale is not None:
+            adjoint = adjoint * o.scale
+        deriv_handler = o.deriv_handler
+        deriv_handler.generate_adjoints(adjoints, adjoint, *deriv_handler.args)
+        processed.add(o.tensor)
+    return adjoints
+
+
+def _adjoint_of(adjoints, op):
+    """
+    The adjoint of op ordered like op, or zero if op did not contribute.
+    """
+    adjoint = adjoints.get(op.tensor)
+    if adjoint is None:
+        return constant(0, op.axes)
+    return axes_with_order(adjoint, op.axes)
+
+
+class ScanLeafOp(TensorOp):
+    """
+    Stands in for a slice of a sequence or the value of a state inside a scan body.
+    """
+
+    def __init__(self, **kwargs):
+        super(ScanLeafOp, self).__init__(**kwargs)
+
+
+class ScanOp(TensorOp):
+    """
+    Runs a body once per index of an axis, carrying state between steps.
+
+    The body is the graph between the leaves and new_states/step_outputs; it is traced once
+    when the op is created.  The values of the scan are exposed through outputs (per-step
+    values stacked along axis) and final_states.
+
+    Arguments:
+        sequences: Tensors sliced along axis, one slice per step.
+        sequence_leaves: Body stand-ins for the slices of sequences.
+        init_states: Initial values of the carried states.
+        state_leaves: Body stand-ins for the carried states.
+        new_states: Body values of the states after a step.
+        step_outputs: Body values stacked into outputs.
+        axis: The axis iterated over.
+        reverse: If True, iterate from the last index of axis to the first.
+        pos: Position of axis in the axes of stacked outputs.
+    """
+
+    def __init__(self, sequences, sequence_leaves, init_states, state_leaves, new_states,
+                 step_outputs, axis, reverse=False, pos=0, **kwargs):
+        sequences = as_ops(sequences)
+        init_states = as_ops(init_states)
+        if len(sequences) != len(sequence_leaves) or len(init_states) != len(state_leaves) \
+                or len(new_states) != len(state_leaves):
+            raise ValueError("Each sequence and state needs exactly one leaf")
+        for state, leaf in zip(new_states, state_leaves):
+            if state.axes != leaf.axes:
+                raise ValueError("New state axes {} do not match state axes {}"
+                                 .format(state.axes, leaf.axes))
+
+        self.sequence_leaves = list(sequence_leaves)
+        self.state_leaves = list(state_leaves)
+        self.new_states = list(new_states)
+        self.step_outputs = []
+        self.body_ops, self.captures = _trace_body(
+            self.new_states + list(step_outputs), self.sequence_leaves + self.state_leaves)
+
+        args = tuple(sequences) + tuple(init_states) + tuple(self.captures)
+        super(ScanOp, self).__init__(args=args, axes=(), **kwargs)
+        self.axis = axis
+        self.reverse = reverse
+        self.pos = pos
+        self.outputs = [self._sequence_output(value) for value in step_outputs]
+        self.final_states = [ScanFinalOp(self, index) for index in range(len(state_leaves))]
+        self._state_histories = {}
+
+    @property
+    def num_steps(self):
+        return self.axis.length
+
+    def _sequence_output(self, value):
+        self.step_outputs.append(value)
+        return ScanSequenceOp(self, len(self.step_outputs) - 1)
+
+    def state_history(self, index):
+        """
+        The values of a state after each step, stacked along axis in index order.
+        """
+        if index not in self._state_histories:
+            self._state_histories[index] = self._sequence_output(self.new_states[index])
+        return self._state_histories[index]
+
+    def previous_states(self, index, init_state):
+        """
+        The values of a state before each step, stacked along axis in index order.
+        """
+        history = self.state_history(index)
+        first_axis = make_axis(length=1, name=self.axis.name)
+        parts = [expand_dims(init_state, first_axis, self.pos)]
+        part_axes = [first_axis]
+        if self.num_steps > 1:
+            rest_axis = make_axis(length=self.num_steps - 1, name=self.axis.name)
+            slices = [slice(None)] * len(history.axes)
+            if self.reverse:
+                slices[self.pos] = slice(1, self.num_steps)
+            else:
+                slices[self.pos] = slice(0, self.num_steps - 1)
+            axes = history.axes[:self.pos] + make_axes([rest_axis]) + history.axes[self.pos + 1:]
+            rest = tensor_slice(history, slices, axes=axes)
+            if self.reverse:
+                parts, part_axes = [rest] + parts, [rest_axis] + part_axes
+            else:
+                parts, part_axes = parts + [rest], part_axes + [rest_axis]
+        return ConcatOp(parts, part_axes, concat_axis=self.axis)
+
+    def generate_adjoints(self, adjoints, delta, *args):
+        """
+        The gradient of a scan is a scan in the opposite direction whose body is the vector
+        Jacobian product of this body; captured values accumulate their gradient in states.
+        """
+        num_sequences = len(self.sequence_leaves)
+        num_states = len(self.state_leaves)
+        sequences = args[:num_sequences]
+        init_states = args[num_sequences:num_sequences + num_states]
+        captures = args[num_sequences + num_states:]
+
+        grad_leaves = [ScanLeafOp(axes=leaf.axes) for leaf in self.state_leaves]
+        seeds = list(zip(self.new_states, grad_leaves))
+        error_sequences = []
+        error_leaves = []
+        for output in list(self.outputs) + list(self._state_histories.values()):
+            error = adjoints.get(output.tensor)
+            if error is None:
+                continue
+            value = self.step_outputs[output.index]
+            leaf = ScanLeafOp(axes=value.axes)
+            error_sequences.append(axes_with_order(error, output.axes))
+            error_leaves.append(leaf)
+            seeds.append((value, leaf))
+        body_adjoints = _body_adjoints(self.body_ops, seeds)
+
+        trainable = [(capture, arg) for capture, arg in zip(self.captures, captures)
+                     if capture.tensor in body_adjoints]
+        sum_leaves = [ScanLeafOp(axes=capture.axes) for capture, _ in trainable]
+        new_sums = [total + _adjoint_of(body_adjoints, capture)
+                    for total, (capture, _) in zip(sum_leaves, trainable)]
+
+        final_errors = []
+        for final, leaf in zip(self.final_states, self.state_leaves):
+            error = adjoints.get(final.tensor)
+            final_errors.append(constant(0, leaf.axes) if error is None
+                                else axes_with_order(error, leaf.axes))
+
+        # The states seen by each step become sequences of the reverse scan
+        previous_states = [self.previous_states(index, init_state)
+                           for index, init_state in enumerate(init_states)]
+        grad_states = [_adjoint_of(body_adjoints, leaf) for leaf in self.state_leaves]
+        grad_sequences = [_adjoint_of(body_adjoints, leaf) for leaf in self.sequence_leaves]
+        zero_sums = [constant(0, capture.axes) for capture, _ in trainable]
+
+        bprop = ScanOp(list(sequences) + previous_states + error_sequences,
+                       self.sequence_leaves + self.state_leaves + error_leaves,
+                       final_errors + zero_sums,
+                       grad_leaves + sum_leaves,
+                       grad_states + new_sums,
+                       grad_sequences,
+                       axis=self.axis, reverse=not self.reverse, pos=self.pos)
+
+        for x, dx in zip(sequences, bprop.outputs):
+            x.generate_add_delta(adjoints, axes_with_order(dx, x.axes))
+        for init_state, d_init in zip(init_states, bprop.final_states[:num_states]):
+            init_state.generate_add_delta(adjoints, d_init)
+        for (_, arg), d_arg in zip(trainable, bprop.final_states[num_states:]):
+            arg.generate_add_delta(adjoints, d_arg)
+
+
+class ScanOutputOp(TensorOp):
+    """
+    Base class for the values produced by a ScanOp.
+
+    Arguments:
+        scan: The ScanOp.
+        index: Which value of the scan.
+    """
+
+    def __init__(self, scan, index, **kwargs):
+        super(ScanOutputOp, self).__init__(args=(scan,), **kwargs)
+        self.index = index
+
+    def generate_adjoints(self, adjoints, delta, scan):
+        # The scan reads the deltas of all of its outputs itself, it only needs to be visited.
+        if scan.tensor not in adjoints:
+            adjoints[scan.tensor] = constant(0)
+
+
+class ScanSequenceOp(ScanOutputOp):
+    """
+    A per-step value of a ScanOp stacked along the scan axis.
+    """
+
+    def __init__(self, scan, index, **kwargs):
+        value_axes = scan.step_outputs[index].axes
+        axes = value_axes[:scan.pos] + make_axes([scan.axis]) + value_axes[scan.pos:]
+        super(ScanSequenceOp, self).__init__(scan, index, axes=axes, **kwargs)
+
+
+class ScanFinalOp(ScanOutputOp):
+    """
+    The value of a ScanOp state after the last step.
+    """
+
+    def __init__(self, scan, index, **kwargs):
+        super(ScanFinalOp, self).__init__(scan, index, axes=scan.state_leaves[index].axes,
+                                          **kwargs)
@@ -0,0 +1,327 @@
+# ******************************************************************************
+# Copyright 2017-2018 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ******************************************************************************
+"""
+Binary serialization of op graphs, so that a graph built once can be reloaded without
+running the Python that built it.
+
+A serialized graph holds every op reachable from the roots through args, control
+dependencies and other op attributes, with their types, axes, dtypes, metadata and
+parameter dictionaries such as conv_params and pool_params. Arrays, such as the initial
+values of variables, are stored out-of-line after the graph and are loaded as views of
+the file contents.
+
+Layout:
+
+    MAGIC (8 bytes) | FORMAT_VERSION (uint32) | graph length (uint64) | graph |
+    padding to a multiple of 64 bytes | array data, each array 64 byte aligned
+
+The graph is a pickle stream (protocol 4), so that it is decoded by the C unpickler, with
+reducers that store ops as their class and instance attributes without caches, axes by
+name and length, and arrays by reference to the array data. Loading only resolves the
+Op and Axis classes of neon, the constructors of the reducers below, and an explicit
+list of containers and numpy types, _ALLOWED_GLOBALS, so that a graph cannot call other
+functions, but a graph should still only be loaded from a trusted source.
+"""
+from __future__ import division
+
+import io
+import pickle
+import struct
+import sys
+
+import numpy as np
+from cached_property import cached_property
+
+from neon.op_graph.axes import Axis, AxesMap, FlattenedAxis
+from neon.op_graph.op_graph import Op
+from neon.util.names import NameableValue, NameScope
+
+MAGIC = b'NEONOPG\x00'
+FORMAT_VERSION = 1
+
+_PROTOCOL = 4
+_ALIGNMENT = 64
+_HEADER = struct.Struct('<8sIQ')
+
+# Op attributes that are caches, recomputed on demand, and their values after __init__
+_RESET_ATTRIBUTES = {'_tdcache_entry': None, '_ordered_ops_stamp': -1,
+                     '_ordered_ops_memo': None}
+_SKIPPED_ATTRIBUTES = frozenset(('_adjoints_memo', '_persistent_tensors_memo', 'uuid'))
+
+# The (module, name) pairs a serialized graph may refer to, besides Op and Axis classes
+_ALLOWED_GLOBALS = frozenset([
+    ('copyreg', '_reconstructor'),
+    ('builtins', 'object'),
+    ('builtins', 'list'),
+    ('builtins', 'tuple'),
+    ('builtins', 'dict'),
+    ('builtins', 'set'),
+    ('builtins', 'frozenset'),
+    ('builtins', 'slice'),
+    ('builtins', 'complex'),
+    ('collections', 'OrderedDict'),
+    ('orderedset._orderedset', 'OrderedSet'),
+    ('frozendict', 'frozendict'),
+    ('numpy', 'dtype'),
+    ('numpy.core.multiarray', '_reconstruct'),
+    ('numpy.core.multiarray', 'scalar'),
+    # numpy 2 pickles refer to its private _core package
+    ('numpy._core.multiarray', '_reconstruct'),
+    ('numpy._core.multiarray', 'scalar'),
+    ('neon.op_graph.axes', 'Axes'),
+    ('neon.op_graph.axes', 'AxesMap'),
+    ('neon.op_graph.serde', '_new_op'),
+    ('neon.op_graph.serde', '_new_flattened_axis'),
+    ('neon.op_graph.serde', '_get_scope'),
+])
+
+
+def serialize_graph(ops):
+    """
+    Serializes the graph reachable from ops.
+
+    Arguments:
+        ops: An op or a list of ops, such as a ComputationOp.
+
+    Returns:
+        bytes: The serialized graph.
+    """
+    f = io.BytesIO()
+    _write_graph(ops, f)
+    return f.getvalue()
+
+
+def deserialize_graph(data):
+    """
+    Rebuilds a graph serialized by serialize_graph.
+
+    Arrays in the graph are views of data, and are read-only if data is.
+
+    Arguments:
+        data: A bytes-like object.
+
+    Returns:
+        list: The root ops, in the order they were serialized.
+    """
+    data = memoryview(data)
+    if len(data) < _HEADER.size:
+        raise ValueError("Not a serialized op graph")
+    magic, version, graph_size = _HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise ValueError("Not a serialized op graph")
+    if version > FORMAT_VERSION:
+        raise ValueError("The graph was serialized with format version {}, newer than the "
+                         "supported version {}".format(version, FORMAT_VERSION))
+    graph_end = _HEADER.size + graph_size
+    unpickler = _GraphUnpickler(io.BytesIO(data[_HEADER.size:graph_end]), data,
+                                _aligned(graph_end))
+    ops, roots = unpickler.load()
+
+    # Names are registered, and uuids handed out in the original order of creation
+    for op in ops:
+        NameableValue._set_name(op, op.__dict__.pop('_NameableValue__name'))
+        op.uuid = next(Op._uuids)
+    return roots
+
+
+def save_graph(ops, filename):
+    """
+    Serializes the graph reachable from ops to a file.
+
+    Arguments:
+        ops: An op or a list of ops, such as a ComputationOp.
+        filename (str): Path of the file to write.
+    """
+    with open(filename, 'wb') as f:
+        _write_graph(ops, f)
+
+
+def load_graph(filename):
+    """
+    Loads a graph saved by save_graph.
+
+    Arguments:
+        filename (str): Path of the file to read.
+
+    Returns:
+        list: The root ops, in the order they were serialized.
+    """
+    with open(filename, 'rb') as f:
+        f.seek(0, io.SEEK_END)
+        data = bytearray(f.tell())
+        f.seek(0)
+        f.readinto(data)
+    return deserialize_graph(data)
+
+
+def _aligned(offset):
+    return -(-offset // _ALIGNMENT) * _ALIGNMENT
+
+
+def _write_graph(ops, f):
+    if isinstance(ops, Op):
+        ops = [ops]
+    roots = list(ops)
+    # Ops are pickled in order of creation, so that the args of an op are pickled before
+    # it instead of recursively, and so that they can be given new uuids in the same order
+    all_ops = sorted(Op.all_op_references(roots), key=lambda op: op.uuid)
+
+    graph = io.BytesIO()
+    pickler = _GraphPickler(graph)
+    try:
+        pickler.dump((all_ops, roots))
+    except (pickle.PicklingError, TypeError, AttributeError) as e:
+        raise ValueError("Cannot serialize the graph: {}".format(e))
+    graph = graph.getvalue()
+
+    f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, len(graph)))
+    f.write(graph)
+    position = _HEADER.size + len(graph)
+    data_start = _aligned(position)
+    for offset, array in pickler.arrays:
+        f.write(b'\0' * (data_start + offset - position))
+        f.write(array.data if array.flags.c_contiguous else array.tobytes())
+        position = data_start + offset + array.nbytes
+
+
+def _new_op(cls):
+    return cls.__new__(cls)
+
+
+def _new_flattened_axis(axes, name):
+    axis = FlattenedAxis(axes)
+    axis.name = name
+    return axis
+
+
+def _reduce_axis(axis):
+    return Axis, (axis.length, axis.name)
+
+
+def _reduce_flattened_axis(axis):
+    return _new_flattened_axis, (axis.axes, axis.name)
+
+
+def _reduce_axes_map(axes_map):
+    return AxesMap, (dict(axes_map),)
+
+
+def _get_scope(name):
+    return NameScope.get_or_create_scope(name)
+
+
+def _reduce_name_scope(scope):
+    return _get_scope, (scope.name,)
+
+
+class _OpReducers(dict):
+    """
+    The pickler dispatch table, which makes the reducer of each Op class on first use.
+    """
+
+    def __init__(self):
+        super(_OpReducers, self).__init__({
+            Axis: _reduce_axis,
+            FlattenedAxis: _reduce_flattened_axis,
+            AxesMap: _reduce_axes_map,
+            NameScope: _reduce_name_scope,
+        })
+
+    def __missing__(self, cls):
+        if not issubclass(cls, Op):
+            raise KeyError(cls)
+        reducer = self[cls] = self.op_reducer(cls)
+        return reducer
+
+    @staticmethod
+    def op_reducer(cls):
+        """
+        Makes the reducer of the ops of class cls.
+
+        Slots shadowed by a property in cls, such as dtype in ValueOp, are not stored,
+        since they are neither read nor written through the op.
+        """
+        slots = [name for name in Op._slot_names(cls)
+                 if name not in _SKIPPED_ATTRIBUTES and name not in _RESET_ATTRIBUTES
+                 and not isinstance(getattr(cls, name, None), property)]
+        skipped = set(name for name in dir(cls)
+                      if isinstance(getattr(cls, name, None), cached_property))
+        skipped.update(_SKIPPED_ATTRIBUTES)
+
+        def reduce_op(op):
+            state = {key: value for key, value in op.__dict__.items() if key not in skipped}
+            slot_state = dict(_RESET_ATTRIBUTES)
+            for name in slots:
+                try:
+                    slot_state[name] = getattr(op, name)
+                except AttributeError:
+                    pass
+            return _new_op, (cls,), (state, slot_state)
+        return reduce_op
+
+
+class _GraphPickler(pickle.Pickler):
+    """
+    Pickles ops and axes with the _OpReducers, and keeps arrays out of the stream.
+    """
+
+    def __init__(self, f):
+        super(_GraphPickler, self).__init__(f, protocol=_PROTOCOL)
+        self.dispatch_table = _OpReducers()
+        self.arrays = []
+        self.array_bytes = 0
+
+    def persistent_id(self, value):
+        if type(value) is not np.ndarray:
+            return None
+        if value.dtype.hasobject:
+            raise ValueError("Cannot serialize arrays of objects")
+        offset = _aligned(self.array_bytes)
+        self.arrays.append((offset, value))
+        self.array_bytes = offset + value.nbytes
+        return value.dtype.str, value.shape, offset
+
+
+class _GraphUnpickler(pickle.Unpickler):
+    """
+    Unpickles a graph, making arrays views of the array data.
+    """
+
+    def __init__(self, f, data, data_start):
+        super(_GraphUnpickler, self).__init__(f)
+        self.data = data
+        self.data_start = data_start
+
+    def persistent_load(self, pid):
+        dtype, shape, offset = pid
+        count = 1
+        for length in shape:
+            count *= length
+        return np.frombuffer(self.data, dtype=np.dtype(dtype), count=count,
+                             offset=self.data_start + offset).reshape(shape)
+
+    def find_class(self, module, name):
+        if (module, name) in _ALLOWED_GLOBALS:
+            return super(_GraphUnpickler, self).find_class(module, name)
+        # Op and Axis classes are resolved from neon, or from modules already imported
+        if module.startswith('neon.'):
+            value = super(_GraphUnpickler, self).find_class(module, name)
+        else:
+            value = getattr(sys.modules.get(module), name, None)
+        if isinstance(value, type) and issubclass(value, (Op, Axis)):
+            return value
+        raise pickle.UnpicklingError("{}.{} is not allowed in a serialized op graph"
+                                     .format(module, name))
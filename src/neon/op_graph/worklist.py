@@ -0,0 +1,150 @@
+# ******************************************************************************
+# Copyright 2017-2018 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ******************************************************************************
+from __future__ import division
+
+from orderedset import OrderedSet
+
+from neon.op_graph.op_graph import Op
+
+
+class GraphWorklist(object):
+    """
+    Follows the changes made to a graph while it is active, keeping the users of each op
+    and the ops changed since they were last visited, so that an iterative pass can
+    revisit only those ops instead of the whole graph.
+
+    Ops are notified through `_set_args`, control dependency changes, `update_forwards`
+    and forwarding, which covers `replace_self` and `perform_replace_op`. An op whose
+    dependencies change becomes dirty, and so do the users of an op that is replaced.
+    Ops that join the graph, such as replacements and the new ops they use, become
+    dirty. Ops created while the worklist is active are only followed once they join
+    the graph.
+
+    Arguments:
+        roots: The roots of the graph.
+
+    Attributes:
+        ordered_ops: The ops of the graph in execution order when the worklist was made.
+        users: Maps each op of the graph to the OrderedSet of ops that depend on it.
+        dirty: The ops changed since they were last visited.
+    """
+
+    def __init__(self, roots):
+        self.ordered_ops = Op.ordered_ops(roots)
+        self.users = dict()
+        self.dirty = OrderedSet()
+        self._deps = dict()
+        self._levels = dict()
+        for op in self.ordered_ops:
+            self._add(op)
+
+    def __enter__(self):
+        Op._graph_worklists.append(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        Op._graph_worklists.remove(self)
+
+    def __contains__(self, op):
+        return op in self._deps
+
+    def _add(self, op):
+        deps = tuple(dep.forwarded for dep in op.all_deps)
+        level = 0
+        users = self.users
+        for dep in deps:
+            dep_users = users.get(dep)
+            if dep_users is None:
+                dep_users = users[dep] = OrderedSet()
+            dep_users.add(op)
+            level = max(level, self._levels[dep] + 1)
+        self._deps[op] = deps
+        self._levels[op] = level
+        if op not in users:
+            users[op] = OrderedSet()
+
+    def _remove_user(self, op, deps):
+        for dep in deps:
+            dep_users = self.users.get(dep)
+            if dep_users is not None:
+                dep_users.discard(op)
+
+    def _join(self, op):
+        """
+        Adds op, and the ops it depends on that are not in the graph, as dirty ops.
+        """
+        stack = [(op.forwarded, False)]
+        while stack:
+            op, deps_added = stack.pop()
+            if op in self._deps:
+                continue
+            if deps_added:
+                self._add(op)
+                self.dirty.add(op)
+                continue
+            stack.append((op, True))
+            for dep in op.all_deps:
+                dep = dep.forwarded
+                if dep not in self._deps:
+                    stack.append((dep, False))
+
+    def deps_changed(self, op):
+        """
+        Called when the args or control dependencies of op change.
+        """
+        old_deps = self._deps.get(op)
+        if old_deps is None:
+            return
+        for dep in op.all_deps:
+            self._join(dep)
+        self._remove_user(op, old_deps)
+        self._add(op)
+        self.dirty.add(op)
+
+    def replaced(self, op, replacement):
+        """
+        Called when op is forwarded to replacement.
+        """
+        old_deps = self._deps.pop(op, None)
+        if old_deps is None:
+            return
+        self._levels.pop(op)
+        self._remove_user(op, old_deps)
+        replacement = replacement.forwarded
+        self._join(replacement)
+        users = self.users.pop(op)
+        self.users[replacement] |= users
+        self.dirty |= users
+
+    def pop_dirty(self):
+        """
+        Returns the dirty ops that are still in the graph, in an order where the ops an op
+        depends on come first, and clears the dirty ops.
+
+        The order is exact for the ops of the graph when the worklist was made and
+        approximate for changed ops, which is enough for passes that run to a fixed point.
+        """
+        levels = self._levels
+        ops = sorted((op for op in self.dirty if op in levels),
+                     key=lambda op: (levels[op], op.uuid))
+        self.dirty = OrderedSet()
+        return ops
+
+    def visited(self, op):
+        """
+        Called when op is visited, so that it is only revisited if it changes again.
+        """
+        self.dirty.discard(op)
@@ -23,7 +23,7 @@ import abc
 from builtins import object
 from future.utils import with_metaclass
 
-from neon.op_graph.op_graph import Op, computation
+from neon.op_graph.op_graph import Op, computation, clear_tensor_description_cache
 from neon.util.names import NameableValue
 from orderedset import OrderedSet
 
@@ -468,7 +468,7 @@ class Transformer(with_metaclass(Transformer_ABC_Meta, object)):
             self.graph_passes.append(graph_pass)
 
     def close(self):
-        pass
+        clear_tensor_description_cache()
 
     @classmethod
     def get_default_tolerance(cls, desired):
@@ -18,6 +18,7 @@ from future.utils import with_metaclass
 from collections import Iterable
 
 from neon.op_graph.op_graph import SequentialOp, TensorValueOp, Op
+from neon.op_graph.worklist import GraphWorklist
 
 
 class OpAccessor(with_metaclass(abc.ABCMeta, object)):
@@ -196,7 +197,16 @@ class OpGraphOpAccessor(OpAccessor):
 
         return None
 
-    def run_pass(self, process_op, ops, **kwargs):
+    def run_pass(self, process_op, ops, fast_process_op=None, **kwargs):
+        """
+        Runs a pass to completion, calling process_op on each op in execution order.
+
+        Args:
+            process_op: Called with each op.
+            ops: The ops of the graph.
+            fast_process_op: If given, called instead of process_op while no replacements
+                are pending in the current batch.
+        """
         assert isinstance(ops, Iterable), "Ops passed into do_pass must be an iterable"
         has_work = True
         while has_work:
@@ -206,11 +216,46 @@ class OpGraphOpAccessor(OpAccessor):
             ops = Op.ordered_ops(op.forwarded for op in ops)
             for op in ops:
                 op.update_forwards()
-                process_op(op)
+                if fast_process_op is not None and not self.replacement_list:
+                    fast_process_op(op)
+                else:
+                    process_op(op)
 
             has_work = self.end_batch()
             ops = list(op.forwarded for op in ops)
 
+    def run_worklist_pass(self, process_op, ops, fast_process_op=None, **kwargs):
+        """
+        Runs a pass to completion like run_pass, but only visits every op in the first
+        batch. Later batches visit the ops that changed, the users of replaced ops and
+        the ops added to the graph, as followed by a GraphWorklist.
+
+        Args:
+            process_op: Called with each op.
+            ops: The ops of the graph.
+            fast_process_op: If given, called instead of process_op while no replacements
+                are pending in the current batch.
+        """
+        assert isinstance(ops, Iterable), "Ops passed into do_pass must be an iterable"
+        with GraphWorklist(op.forwarded for op in ops) as worklist:
+            batch = worklist.ordered_ops
+            while batch:
+                self.begin_batch()
+                for op in batch:
+                    if op.forward is not None:
+                        continue
+                    worklist.visited(op)
+                    op.update_forwards()
+                    if fast_process_op is not None and not self.replacement_list:
+                        fast_process_op(op)
+                    else:
+                        process_op(op)
+
+                if self.end_batch():
+                    batch = worklist.pop_dirty()
+                else:
+                    batch = None
+
     def perform_replace_op(self, op, replacement):
         op.forwarded.replace_self(replacement.forwarded)
 
@@ -296,6 +341,9 @@ class DelegateOpAccessor(OpAccessor):
     def run_pass(self, process_op, **kwargs):
         self.op_accessor.run_pass(process_op, **kwargs)
 
+    def run_worklist_pass(self, process_op, **kwargs):
+        self.op_accessor.run_worklist_pass(process_op, **kwargs)
+
     def begin_batch(self):
         self.op_accessor.begin_batch()
 
@@ -19,8 +19,8 @@ import itertools
 from future.utils import with_metaclass
 
 from neon.op_graph.axes import make_axis
-from neon.transformers.passes.opdelegate import DelegateOpAccessor
-from neon.util.generics import generic_method
+from neon.transformers.passes.opdelegate import DelegateOpAccessor, OpGraphOpAccessor
+from neon.util.generics import DispatchTable, generic_method
 
 
 class GraphPass(with_metaclass(abc.ABCMeta, DelegateOpAccessor)):
@@ -54,10 +54,45 @@ class ProcessOpGraphPass(GraphPass):
 
 
 class GraphBuildingPass(ProcessOpGraphPass):
+    """
+    Base class for passes that visit each op with its args.
+
+    Attributes:
+        fast_run_pass: When the pass runs on the op-graph and no replacements are pending,
+            visit ops with their args read directly from the ops, through a DispatchTable
+            of the generic visit method, instead of through the op accessor.
+        worklist_pass: When the pass runs on the op-graph, revisit only the ops changed by
+            the replacements of a batch in the next batch, instead of the whole graph.
+            Suits passes that only look at an op and its args, such as simplifications
+            run to a fixed point.
+    """
+    fast_run_pass = True
+    worklist_pass = False
+
+    def begin_pass(self, **kwargs):
+        super(GraphBuildingPass, self).begin_pass(**kwargs)
+        visit = type(self).visit
+        if hasattr(visit, 'type_methods'):
+            self.visit_table = DispatchTable(self, visit)
+        else:
+            self.visit_table = self.visit
+
+    def do_pass(self, **kwargs):
+        on_op_graph = isinstance(self.op_accessor, OpGraphOpAccessor)
+        if self.fast_run_pass and on_op_graph \
+                and type(self).process_op is GraphBuildingPass.process_op:
+            kwargs['fast_process_op'] = self.fast_process_op
+        if self.worklist_pass and on_op_graph:
+            self.run_worklist_pass(self.process_op, **kwargs)
+        else:
+            self.run_pass(self.process_op, **kwargs)
 
     def process_op(self, op):
         self.visit(op, *self.op_args(op))
 
+    def fast_process_op(self, op):
+        self.visit_table(op, *op.args)
+
 
 class PeepholeGraphPass(GraphBuildingPass):
     """
@@ -29,6 +29,7 @@ from neon.op_graph.batchnorm import BatchnormCommonOp, BatchnormBpropCommonOp, \
 from neon.op_graph.relu import ReluOp, ReluBpropOp
 from neon.op_graph.pooling import PoolingOp, BpropPoolOp
 from neon.op_graph.convolution import ConvolutionOp, bprop_conv, update_conv
+from neon.op_graph.scan import ScanOp, ScanSequenceOp, ScanFinalOp
 import numpy as np
 
 try:
@@ -36,6 +37,7 @@ try:
     from ngraph.impl import AxisVector
     from ngraph.impl import CoordinateDiff
     from ngraph.impl import Coordinate
+    from ngraph.impl import Function
     from ngraph.impl import NodeVector
     from ngraph.impl import Shape
     from ngraph.impl import Strides
@@ -90,6 +92,12 @@ except ImportError:
     traceback.print_stack()
     sys.exit(1)
 
+try:
+    from ngraph.impl.op import FunctionCall as PyngFunctionCall
+except ImportError:
+    # older builds of the bindings: scan bodies are inlined on every step instead
+    PyngFunctionCall = None
+
 
 class PybindScopePass:
     """
@@ -170,6 +178,33 @@ class PybindScopePass:
         self.recordscope(results)
 
 
+class ScanBodyComputation(object):
+    """
+    Stands in for the computation while the body of a ScanOp is lowered, so the body
+    gets its own Neon -> Ngraph lookup.  Leaves and captured values are registered
+    up front by the caller.
+    """
+
+    def __init__(self):
+        self.ngraph_cpp_ops = dict()
+        self.neon_variable_list = []
+        self.neon_randomvariable_list = []
+
+    def set_op_rank(self, op):
+        pass
+
+    def has_cpp_op(self, op):
+        return op.tensor in self.ngraph_cpp_ops
+
+    def lookup_cpp_op(self, op):
+        if op.tensor not in self.ngraph_cpp_ops:
+            raise RuntimeError("Ngraph Op missing for Neon Op " + op.name)
+        return self.ngraph_cpp_ops[op.tensor]
+
+    def register_cpp_op(self, op, cpp_op, set_name=True):
+        self.ngraph_cpp_ops[op.tensor] = cpp_op
+
+
 class PybindWrapperGenerator(PeepholeGraphPass):
     """
     Graph pass to generate the PybindWrapper's by visiting all the Op's
@@ -186,6 +221,7 @@ class PybindWrapperGenerator(PeepholeGraphPass):
         self.constant_pool = dict()
         self.broadcast_pool = dict()
         self.negative_pool = dict()
+        self.scan_results = dict()
 
     def np_reduction_axis(self, op):
         """
@@ -1201,6 +1237,99 @@ class PybindWrapperGenerator(PeepholeGraphPass):
         ngraph_concat = PyngConcat(NodeVector(ngraph_x_list), op.ind)
         self.computation.register_cpp_op(op, ngraph_concat)
 
+    def lower_scan_body(self, op, inputs):
+        """
+        Lowers one step of a ScanOp.
+
+        Arguments:
+            op: The ScanOp.
+            inputs: Ngraph nodes for the sequence leaves, the state leaves and the captures.
+
+        Returns:
+            Ngraph nodes for op.new_states followed by op.step_outputs.
+        """
+        body = ScanBodyComputation()
+        for leaf, node in zip(op.sequence_leaves + op.state_leaves + op.captures, inputs):
+            body.register_cpp_op(leaf, node)
+        generator = PybindWrapperGenerator(self.transformer, body)
+        for body_op in op.body_ops:
+            generator.visit(body_op, *body_op.args)
+        if body.neon_variable_list or body.neon_randomvariable_list:
+            raise RuntimeError("Scan body of " + op.name + " reads state it does not capture")
+        return [body.lookup_cpp_op(value) for value in op.new_states + op.step_outputs]
+
+    @visit.on_type(ScanOp)
+    def visit(self, op, *args):
+        self.computation.set_op_rank(op)
+        num_sequences = len(op.sequence_leaves)
+        num_states = len(op.state_leaves)
+        sequences = args[:num_sequences]
+        states = [self.computation.lookup_cpp_op(x)
+                  for x in args[num_sequences:num_sequences + num_states]]
+        captures = [self.computation.lookup_cpp_op(x)
+                    for x in args[num_sequences + num_states:]]
+
+        # The body is compiled once and called on every step when the bindings
+        # support it, otherwise it is inlined on every step.
+        if PyngFunctionCall is not None:
+            parameters = [Parameter(Type.f32, Shape(list(leaf.axes.lengths)))
+                          for leaf in op.sequence_leaves + op.state_leaves + op.captures]
+            results = self.lower_scan_body(op, parameters)
+            # a value that is both a state and an output is returned once
+            unique_results = []
+            result_index = []
+            for node in results:
+                matches = [i for i, unique in enumerate(unique_results) if unique is node]
+                if not matches:
+                    matches = [len(unique_results)]
+                    unique_results.append(node)
+                result_index.append(matches[0])
+            function = Function(NodeVector(unique_results), parameters,
+                                self.transformer.get_function_name())
+
+            def step(inputs):
+                call = PyngFunctionCall(function, NodeVector(inputs))
+                return [PyngGetOutputElement(call, i) for i in result_index]
+        else:
+            def step(inputs):
+                return self.lower_scan_body(op, inputs)
+
+        step_outputs = [[None] * op.num_steps for _ in op.step_outputs]
+        steps = range(op.num_steps)
+        for index in (reversed(steps) if op.reverse else steps):
+            inputs = []
+            for x, leaf in zip(sequences, op.sequence_leaves):
+                pos = x.axes.index(op.axis)
+                lowers = [0] * len(x.axes)
+                uppers = list(x.axes.lengths)
+                lowers[pos] = index
+                uppers[pos] = index + 1
+                ngraph_slice = PyngSlice(self.computation.lookup_cpp_op(x),
+                                         Coordinate(lowers), Coordinate(uppers),
+                                         Strides([1] * len(x.axes)))
+                inputs.append(PyngReshape(ngraph_slice, AxisVector(list(range(len(x.axes)))),
+                                          Shape(list(leaf.axes.lengths))))
+            values = step(inputs + states + captures)
+            states = values[:num_states]
+            for outputs, value, node in zip(step_outputs, op.step_outputs, values[num_states:]):
+                shape = list(value.axes.lengths)
+                shape.insert(op.pos, 1)
+                outputs[index] = PyngReshape(node, AxisVector(list(range(len(value.axes)))),
+                                             Shape(shape))
+
+        stacked = [PyngConcat(NodeVector(outputs), op.pos) for outputs in step_outputs]
+        self.scan_results[op.tensor] = (stacked, states)
+
+    @visit.on_type(ScanSequenceOp)
+    def visit(self, op, scan):
+        self.computation.set_op_rank(op)
+        self.computation.register_cpp_op(op, self.scan_results[scan.tensor][0][op.index])
+
+    @visit.on_type(ScanFinalOp)
+    def visit(self, op, scan):
+        self.computation.set_op_rank(op)
+        self.computation.register_cpp_op(op, self.scan_results[scan.tensor][1][op.index])
+
     @visit.on_type(RngOp)
     def visit(self, op):
         self.computation.set_op_rank(op)
@@ -45,6 +45,7 @@ class TypeMethods(object):
         extends: Generic function being extended. Must have type_method attribute.
         dispatch_type: Function which returns the type to dispatch on.
         next_method_arg: If not None, next_method will be passed in this position.
+        generation: Incremented whenever the handlers change, invalidating DispatchTables.
     """
 
     def __init__(self,
@@ -56,6 +57,7 @@ class TypeMethods(object):
         super(TypeMethods, self).__init__(**kvargs)
         self.methods = {}
         self.type_cache = {}
+        self.generation = 0
         self.extends = extends
         self.super_type_methods = set()
         if extends is not None:
@@ -107,6 +109,7 @@ class TypeMethods(object):
 
         """
         self.type_cache = {}
+        self.generation += 1
         for sup in self.super_type_methods:
             sup.clear_cache()
         self.__all_methods = None
@@ -153,12 +156,12 @@ class TypeMethods(object):
                     Value returned from method.
 
                 """
+                next_method_args = (next_method,)
+
                 @wraps(method)
                 def wrapped_method(*args, **kwargs):
-                    new_args = list(args[:next_method_arg])
-                    new_args.append(next_method)
-                    new_args.extend(args[next_method_arg:])
-                    return method(*new_args, **kwargs)
+                    return method(*(args[:next_method_arg] + next_method_args
+                                    + args[next_method_arg:]), **kwargs)
                 return wrapped_method
 
             def next_method(*args, **kwargs):
@@ -194,7 +197,12 @@ class TypeMethods(object):
             Returns: The result of the selected method.
 
             """
-            return self.get_handler(self.dispatch_type_fun(*args, **kwargs))(*args, **kwargs)
+            dispatch_type = self.dispatch_type_fun(*args, **kwargs)
+            try:
+                handler = self.type_cache[dispatch_type]
+            except KeyError:
+                handler = self.get_handler(dispatch_type)
+            return handler(*args, **kwargs)
 
         def on_type(dispatch_type, next_method_arg=_use_default):
             """
@@ -229,6 +237,62 @@ class TypeMethods(object):
         return generic
 
 
+class DispatchTable(object):
+    """
+    A flat map from dispatch type to the handler of a generic method bound to one instance.
+
+    Calling the table dispatches on the type of the first argument with a single dict lookup
+    and calls the bound handler directly. Types are resolved through the MRO on first use,
+    and the table is emptied when methods are added to the generic method.
+
+    Arguments:
+        instance: The object the handlers are bound to.
+        generic: A generic method, made with generic_method.
+
+    Example:
+
+    .. code-block:: python
+
+        visit = DispatchTable(visitor, type(visitor).visit)
+        for value in values:
+            visit(value)
+    """
+
+    def __init__(self, instance, generic):
+        self.instance = instance
+        self.type_methods = generic.type_methods
+        self.generation = self.type_methods.generation
+        self.handlers = {}
+
+    def handler(self, dispatch_type):
+        """
+        Returns the handler bound to the instance for arguments of type dispatch_type.
+
+        Arguments:
+            dispatch_type: The type dispatched on.
+
+        Returns:
+            A callable.
+        """
+        if self.generation != self.type_methods.generation:
+            self.handlers = {}
+            self.generation = self.type_methods.generation
+        try:
+            return self.handlers[dispatch_type]
+        except KeyError:
+            method = self.type_methods.get_handler(dispatch_type)
+            handler = self.handlers[dispatch_type] = method.__get__(self.instance)
+            return handler
+
+    def __call__(self, arg, *args, **kwargs):
+        handler = None
+        if self.generation == self.type_methods.generation:
+            handler = self.handlers.get(type(arg))
+        if handler is None:
+            handler = self.handler(type(arg))
+        return handler(arg, *args, **kwargs)
+
+
 def generic_function(dispatch_base_type=object, extends=None, next_method_arg=None):
     """
     Makes a function generic on its first argument's type.
@@ -34,17 +34,19 @@ class NameableValue(object):
         graph_label_type: A label that should be used when drawing the graph.
         id: Unique id for this object.
     """
-    __counter = 0
     __all_names = WeakValueDictionary()
+    # The next suffix to try for each name that has been taken
+    __name_counters = dict()
 
     def __init__(self, name=None, graph_label_type=None, docstring=None, **kwargs):
         super(NameableValue, self).__init__(**kwargs)
 
         if name is None:
-            name = type(self).__name__
-        if isinstance(name, NameableValue):
+            self._set_name(type(self).__name__, register=_register_anonymous_names())
+        elif isinstance(name, NameableValue):
             raise ValueError("name must be a string")
-        self.name = name
+        else:
+            self.name = name
 
         if graph_label_type is None:
             graph_label_type = self.name
@@ -83,15 +85,34 @@ class NameableValue(object):
         Arguments:
             name: Prefix for the name
         """
+        self._set_name(name)
 
-        if name in NameableValue.__all_names:
-            while True:
-                c_name = "{}_{}".format(name, type(self).__counter)
-                if c_name not in NameableValue.__all_names:
-                    name = c_name
-                    break
-                type(self).__counter += 1
-        NameableValue.__all_names[name] = self
+    def _set_name(self, name, register=True):
+        """
+        Sets the object name to a unique name based on name.
+
+        If name is taken, the next free suffix of name is found from a per name counter.
+        Counters only move forward, so a suffix is tried at most once unless it was taken
+        explicitly, and names freed by garbage collection are not handed out again.
+
+        Arguments:
+            name: Prefix for the name
+            register (bool): If False, the name is always suffixed and is not registered
+                for get_object_by_name. It is unique among generated names, but can be
+                shadowed by an object explicitly given the same suffixed name.
+        """
+        all_names = NameableValue.__all_names
+        if name in all_names or not register:
+            counters = NameableValue.__name_counters
+            counter = counters.get(name, 0)
+            c_name = "{}_{}".format(name, counter)
+            while c_name in all_names:
+                counter += 1
+                c_name = "{}_{}".format(name, counter)
+            counters[name] = counter + 1
+            name = c_name
+        if register:
+            all_names[name] = self
         self.__name = name
 
     @property
@@ -126,10 +147,6 @@ class ScopedNameableValue(NameableValue):
     def scope(self):
         return self.__scope
 
-    @property
-    def name(self):
-        return super(ScopedNameableValue, self).name
-
     @property
     def unscoped_name(self):
         if self.scope:
@@ -137,11 +154,10 @@ class ScopedNameableValue(NameableValue):
         else:
             return self.name
 
-    @name.setter
-    def name(self, name):
+    def _set_name(self, name, register=True):
         if self.scope:
             name = "/".join([self.scope.name, name])
-        NameableValue.name.__set__(self, name)
+        super(ScopedNameableValue, self)._set_name(name, register=register)
 
 
 def _get_thread_name_scope():
@@ -157,6 +173,34 @@ def _get_thread_name_scope():
     return name_scope
 
 
+def _register_anonymous_names():
+    """
+    Returns:
+        bool: False inside unregistered_anonymous_names.
+    """
+    try:
+        return get_thread_state().register_anonymous_names
+    except AttributeError:
+        return True
+
+
+@contextmanager
+def unregistered_anonymous_names():
+    """
+    Objects created in this context without an explicit name, such as the intermediate
+    ops of a large graph, get a unique name without being registered for
+    NameableValue.get_object_by_name, so they can not be found by name, e.g. by
+    ComputationalGraph.select.
+    """
+    state = get_thread_state()
+    previous = _register_anonymous_names()
+    state.register_anonymous_names = False
+    try:
+        yield
+    finally:
+        state.register_anonymous_names = previous
+
+
 def get_current_name_scope():
     """
     Return:
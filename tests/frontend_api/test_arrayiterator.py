@@ -14,9 +14,11 @@
 # limitations under the License.
 # ******************************************************************************
 from __future__ import division
+import tracemalloc
+
 import pytest
 import numpy as np
-from neon.frontend import SequentialArrayIterator
+from neon.frontend import ArrayIterator, SequentialArrayIterator, BucketedSequenceIterator
 
 
 @pytest.fixture(scope='module',
@@ -147,3 +149,194 @@ def test_rolling_window(input_seq, batch_size, seq_len, strides):
                               iter_val['X'][1, :time_steps - strides])
         assert np.array_equal(iter_val['y'][0, strides:time_steps],
                               iter_val['y'][1, :time_steps - strides])
+
+
+@pytest.mark.parametrize("shuffle", [False, True])
+@pytest.mark.parametrize("reverse_target", [False, True])
+@pytest.mark.parametrize("get_prev_target", [False, True])
+def test_sequential_windows(shuffle, reverse_target, get_prev_target):
+    """
+    Every window of a batch holds the examples at its start, wrapped around the end of the
+    sequence, with the target reversed and the previous target rolled from it.
+    """
+    batch_size, time_steps, stride = 4, 5, 3
+    data = {'X': np.arange(400).reshape(200, 2), 'y': np.arange(200) * 10}
+    it_array = SequentialArrayIterator(data_arrays=data, time_steps=time_steps,
+                                       batch_size=batch_size, stride=stride, tgt_key='y',
+                                       total_iterations=30, shuffle=shuffle,
+                                       reverse_target=reverse_target,
+                                       get_prev_target=get_prev_target)
+    ndata, nbatches = it_array.ndata, it_array.nbatches
+    count = 0
+    for idx, batch in enumerate(it_array):
+        for row in range(batch_size):
+            if shuffle:
+                start = idx * stride + row * nbatches * time_steps
+            else:
+                start = idx * batch_size * stride + row * stride
+            window = np.arange(start, start + time_steps) % ndata
+            target = data['y'][window][::-1] if reverse_target else data['y'][window]
+            assert np.array_equal(batch['X'][row], data['X'][window])
+            assert np.array_equal(batch['y'][row], target)
+            if get_prev_target:
+                assert np.array_equal(batch['prev_tgt'][row], np.roll(target, 1))
+        count += 1
+    assert count == 30
+
+
+@pytest.mark.parametrize("shuffle", [False, True])
+def test_array_iterator_order(shuffle):
+    """
+    Batches wrap around the end of the dataset, and a shuffled dataset is reshuffled at
+    every epoch in the same order as permuting copies of the data arrays.
+    """
+    ndata, batch_size = 100, 32
+    data = {'x': {'data': np.arange(ndata * 3).reshape(ndata, 3), 'axes': ('N', 'F')},
+            'y': {'data': np.arange(ndata) % 7, 'axes': ('N',)}}
+
+    np.random.seed(0)
+    it_array = ArrayIterator(data, batch_size, total_iterations=10, shuffle=shuffle)
+    batches = list(it_array)
+
+    # Reference: permute the arrays themselves at each epoch
+    np.random.seed(0)
+    arrays = {k: v['data'] for k, v in data.items()}
+    if shuffle:
+        p = np.random.permutation(ndata)
+        arrays = {k: v[p] for k, v in arrays.items()}
+    stream = {k: list() for k in arrays}
+    for _ in range(4):
+        for k in arrays:
+            stream[k].append(arrays[k])
+        if shuffle:
+            p = np.random.permutation(ndata)
+            arrays = {k: v[p] for k, v in arrays.items()}
+    stream = {k: np.concatenate(v) for k, v in stream.items()}
+
+    assert len(batches) == 10
+    for idx, batch in enumerate(batches):
+        assert batch['iteration'] == idx + 1
+        for k in arrays:
+            expected = stream[k][idx * batch_size:(idx + 1) * batch_size]
+            assert batch[k].dtype == expected.dtype
+            assert np.array_equal(batch[k], expected)
+
+
+@pytest.mark.parametrize("shuffle", [False, True])
+def test_array_iterator_preallocate(shuffle):
+    """
+    Preallocated buffers hold the same minibatches in the target dtype, and are reused
+    without allocating.
+    """
+    ndata, batch_size = 100, 32
+    data = {'x': {'data': np.arange(ndata * 256, dtype=np.uint8).reshape(ndata, 256),
+                  'axes': ('N', 'F')},
+            'y': {'data': np.arange(ndata, dtype=np.float32), 'axes': ('N',)}}
+
+    np.random.seed(0)
+    expected = list(ArrayIterator(data, batch_size, total_iterations=10, shuffle=shuffle))
+    np.random.seed(0)
+    it_array = ArrayIterator(data, batch_size, total_iterations=10, shuffle=shuffle,
+                             preallocate=True)
+
+    batch = next(it_array)
+    buffers = {k: batch[k] for k in data}
+    for k in data:
+        assert batch[k].dtype == np.float32
+        assert batch[k].flags.c_contiguous
+        assert np.array_equal(batch[k], expected[0][k])
+
+    for idx in range(1, 10):
+        batch = next(it_array)
+        for k in data:
+            assert batch[k] is buffers[k]
+            assert np.array_equal(batch[k], expected[idx][k])
+
+    it_array.reset()
+    tracemalloc.start()
+    for batch in it_array:
+        pass
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert peak < buffers['x'].nbytes
+
+
+@pytest.mark.parametrize("shuffle", [False, True])
+@pytest.mark.parametrize("pad_from", ['left', 'right'])
+def test_bucketed_sequences(shuffle, pad_from):
+    """
+    Every sequence is returned once an epoch, padded to the length of its bucket, and the
+    padding efficiency counts the tokens of the batches that are not padding.
+    """
+    np.random.seed(0)
+    lengths = np.random.randint(1, 40, size=50)
+    sequences = [np.arange(length) + 1000 * idx for idx, length in enumerate(lengths)]
+    data = {'review': {'data': sequences, 'axes': ('N', 'REC')},
+            'label': {'data': np.arange(50), 'axes': ('N',)}}
+    it_array = BucketedSequenceIterator(data, batch_size=4, buckets=[10, 20, 30],
+                                        pad_from=pad_from, shuffle=shuffle)
+    assert it_array.buckets == [10, 20, 30]
+    placeholders = it_array.make_placeholders()
+    assert sorted(placeholders) == [10, 20, 30]
+    assert placeholders[20]['review'].axes.lengths == (4, 20)
+
+    seen = set()
+    real_tokens = 0
+    for batch in it_array:
+        bucket = batch['bucket']
+        assert batch['review'].shape == (4, bucket)
+        for review, label in zip(batch['review'], batch['label']):
+            expected = sequences[label][-30:]
+            assert len(expected) <= bucket
+            assert bucket == 10 or len(expected) > bucket - 10
+            if pad_from == 'left':
+                padded = np.concatenate([np.zeros(bucket - len(expected)), expected])
+            else:
+                padded = np.concatenate([expected, np.zeros(bucket - len(expected))])
+            assert np.array_equal(review, padded)
+            real_tokens += len(expected)
+            seen.add(label)
+    assert seen == set(range(50))
+    assert it_array.index == it_array.nbatches
+    assert it_array.padding_efficiency == real_tokens / it_array.total_tokens < 1
+
+
+@pytest.mark.parametrize("shuffle", [False, True])
+def test_array_iterator_shards(shuffle):
+    """
+    The shards of every epoch are disjoint and of the same size, whatever the global random
+    state of each process, and a shard walks only its examples.
+    """
+    ndata, batch_size, world_size = 98, 8, 3
+    data = {'x': {'data': np.arange(ndata), 'axes': ('N',)}}
+    shards = []
+    for rank in range(world_size):
+        np.random.seed(rank)
+        it_array = ArrayIterator(data, batch_size, shuffle=shuffle).shard(rank, world_size)
+        assert it_array.ndata == 32
+        assert it_array.nbatches == it_array.total_iterations == 4
+        it_array.total_iterations = 12
+        shards.append([batch['x'] for batch in it_array])
+
+    for epoch in range(3):
+        seen = [np.concatenate(batches[epoch * 4:epoch * 4 + 4]) for batches in shards]
+        assert len(np.unique(np.concatenate(seen))) == 96
+        if not shuffle:
+            for rank, examples in enumerate(seen):
+                assert np.array_equal(examples, np.arange(rank * 32, rank * 32 + 32))
+
+
+def test_sequential_shards():
+    """
+    The windows of a shard are taken from its part of the sequence.
+    """
+    data = {'X': np.arange(1000), 'y': np.arange(1000) + 1}
+    batches = {}
+    for rank in range(2):
+        it_array = SequentialArrayIterator(data, time_steps=10, batch_size=4, tgt_key='y',
+                                           get_prev_target=True).shard(rank, 2)
+        assert it_array.nbatches == it_array.total_iterations == 12
+        batches[rank] = [batch['X'].copy() for batch in it_array]
+        assert len(batches[rank]) == 12
+    assert batches[0][0].min() == 0 and np.concatenate(batches[0]).max() < 500
+    assert np.concatenate(batches[1]).min() >= 500
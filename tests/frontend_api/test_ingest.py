@@ -0,0 +1,44 @@
+# ******************************************************************************
+# Copyright 2017-2018 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ******************************************************************************
+from __future__ import division
+import os
+
+import pytest
+import numpy as np
+from PIL import Image
+from neon.frontend.data import ingest_images, channels_last
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_ingest_images(tmpdir, workers):
+    """
+    Images are written in chunks by the workers, and only the missing files are written
+    again when the ingest is resumed.
+    """
+    images = np.random.randint(0, 255, size=(25, 3, 4, 5)).astype(np.uint8)
+    filenames = [os.path.join(str(tmpdir), str(idx % 3), '{}.png'.format(idx))
+                 for idx in range(len(images))]
+    assert ingest_images(images, filenames, channels_last, workers=workers,
+                         chunk_size=4) == 25
+    for image, filename in zip(images, filenames):
+        np.testing.assert_array_equal(np.asarray(Image.open(filename)), channels_last(image))
+    assert not tmpdir.join('0').listdir('*.tmp')
+
+    os.remove(filenames[7])
+    assert ingest_images(images, filenames, channels_last, workers=workers) == 1
+    assert os.path.exists(filenames[7])
+    assert ingest_images(images, filenames, channels_last, workers=workers,
+                         overwrite=True) == 25
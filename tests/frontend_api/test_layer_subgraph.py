@@ -1,3 +1,7 @@
+import gc
+import weakref
+
+import parsel
 import pytest
 import neon as ng
 from neon.frontend.layer import LABELS, Layer
@@ -271,3 +275,51 @@ def test_scopes_generation(input_placeholder):
     assert "outer/inner" in cg.scopes
     for op in layer:
         assert op in cg.scopes["outer/inner"]
+
+
+def test_select_matches_xml(input_placeholder):
+    """
+    Selections answered from the graph index match selecting from the graph xml.
+    """
+    cg = ComputationalGraph()
+    layers = [NestedLayer(SimpleLayer(name="inner{}".format(ii)), name="outer{}".format(ii))
+              for ii in range(3)]
+    for layer in layers:
+        with Layer.inference_mode_on():
+            layer(input_placeholder)
+
+    def select_xml(css):
+        selected = parsel.Selector(cg._to_xml()).css(css)
+        return [op for op in map(cg._selector_to_op, selected) if op is not None]
+
+    for css in [".weight", "[foo=bar]", "[mode]", "TensorValueOp", "AssignableTensorOp.weight",
+                "[scope]", "AssignOp[foo]", "#{}".format(input_placeholder.name),
+                "[id='{}']".format(layers[0].inner_layer.weight.name),
+                "outer0 .weight", "*"]:
+        assert cg.select(css) == select_xml(css)
+
+
+def test_graph_index_follows_ops(input_placeholder):
+    """
+    The indexes follow ops appended to the graph and are freed with it.
+    """
+    subgraph = SubGraph()
+    with scope_ops("scope1", subgraph=subgraph):
+        w1 = ng.variable(ng.make_axis(), initial_value=1, name="W1")
+        w1 * input_placeholder
+    assert list(subgraph.variables) == ["scope1/W1"]
+    assert subgraph.select("[scope=scope2]") == []
+
+    with scope_ops("scope2", subgraph=subgraph):
+        w2 = ng.variable(ng.make_axis(), initial_value=1, name="W2")
+        w2 * input_placeholder
+    assert list(subgraph.variables) == ["scope1/W1", "scope2/W2"]
+    assert subgraph.select("[scope=scope2]") == subgraph.scopes["scope2"].ops
+
+    subgraph.ops = [w2]
+    assert list(subgraph.variables) == ["scope2/W2"]
+
+    graph = weakref.ref(subgraph)
+    del subgraph
+    gc.collect()
+    assert graph() is None
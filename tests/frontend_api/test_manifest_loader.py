@@ -0,0 +1,140 @@
+# ******************************************************************************
+# Copyright 2017-2018 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ******************************************************************************
+from __future__ import division
+import os
+
+import pytest
+import numpy as np
+from PIL import Image
+from neon.frontend import ManifestDataLoader
+from neon.frontend.data import ingest_images, channels_last
+
+
+def make_manifest(directory, ndata=10, shape=(3, 6, 8)):
+    """
+    Writes images and a manifest as ingest_cifar10 does.
+    """
+    images = np.random.randint(0, 255, size=(ndata,) + shape).astype(np.uint8)
+    labels = np.arange(ndata) % 3
+    filenames = [os.path.join(directory, 'train', '{}_{:05d}.png'.format(lbl, idx))
+                 for idx, lbl in enumerate(labels)]
+    ingest_images(images, filenames, channels_last, workers=0)
+    manifest = os.path.join(directory, 'train-index.csv')
+    records = [('@FILE', 'STRING')]
+    records.extend((os.path.relpath(fname, directory), lbl)
+                   for fname, lbl in zip(filenames, labels))
+    np.savetxt(manifest, records, fmt='%s\t%s')
+    return images, labels, manifest
+
+
+def make_config(manifest, cache_directory='', augmentation=None, **kwargs):
+    config = {'manifest_filename': manifest,
+              'manifest_root': os.path.dirname(manifest),
+              'batch_size': 4,
+              'cache_directory': cache_directory,
+              'etl': [{'type': 'image', 'height': 6, 'width': 8},
+                      {'type': 'label', 'binary': False}]}
+    if augmentation is not None:
+        config['augmentation'] = [augmentation]
+    config.update(kwargs)
+    return config
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+@pytest.mark.parametrize("cache", [False, True])
+def test_manifest_loader(tmpdir, workers, cache):
+    """
+    A single pass returns the records in the order of the manifest, the last batch
+    completed with the first records, again after a reset.
+    """
+    images, labels, manifest = make_manifest(str(tmpdir))
+    cache_directory = str(tmpdir.join('cache')) if cache else ''
+    loader = ManifestDataLoader(make_config(manifest, cache_directory), workers=workers)
+    assert loader.ndata == 10
+    order = np.arange(12) % 10
+    for _ in range(2):
+        batches = [{k: np.array(v) for k, v in batch.items()} for batch in loader]
+        assert len(batches) == 3
+        np.testing.assert_array_equal(np.concatenate([b['image'] for b in batches]),
+                                      images[order])
+        np.testing.assert_array_equal(np.concatenate([b['label'] for b in batches]),
+                                      labels[order])
+        loader.reset()
+    loader.close()
+    assert len(tmpdir.join('cache').listdir('*.npy') if cache else []) == 2 * int(cache)
+
+    placeholders = loader.make_placeholders(include_iteration=True)
+    assert placeholders['image'].axes.lengths == (4, 3, 6, 8)
+    assert placeholders['label'].axes.lengths == (4,)
+    assert 'iteration' in placeholders
+
+
+@pytest.mark.parametrize("cache", [False, True])
+def test_manifest_native_crop(tmpdir, cache):
+    """
+    Crops are taken from the images at their own size, and resized to the output size.
+    """
+    images, labels, manifest = make_manifest(str(tmpdir), shape=(3, 12, 16))
+    cache_directory = str(tmpdir.join('cache')) if cache else ''
+    augmentation = {'type': 'image', 'scale': [0.5, 0.5]}
+    loader = ManifestDataLoader(make_config(manifest, cache_directory, augmentation),
+                                workers=0)
+    image = np.concatenate([np.array(batch['image']) for batch in loader])
+    np.testing.assert_array_equal(image[:10], images[:, :, 3:9, 4:12])
+
+    loader = ManifestDataLoader(make_config(manifest, cache_directory), workers=0)
+    image = np.array(next(loader)['image'])
+    resized = np.asarray(Image.fromarray(channels_last(images[0])).resize((8, 6),
+                                                                          Image.BILINEAR))
+    np.testing.assert_array_equal(image[0], resized.transpose(2, 0, 1))
+
+
+def test_manifest_augmentation(tmpdir):
+    """
+    Augmented images are padded crops of the images, possibly flipped, and the same
+    whichever process loads them, in every pass.
+    """
+    images, labels, manifest = make_manifest(str(tmpdir))
+    augmentation = {'type': 'image', 'padding': 2, 'crop_enable': False, 'flip_enable': True}
+    config = make_config(manifest, str(tmpdir.join('cache')), augmentation,
+                         iteration_mode='COUNT', iteration_mode_count=5,
+                         shuffle_enable=True, random_seed=1)
+    batches = []
+    for workers, count in ((0, 1), (2, 5)):
+        loader = ManifestDataLoader(config, workers=workers)
+        # The second pass does not depend on how much of the first was read or loaded ahead
+        first = [{k: np.array(v) for k, v in next(loader).items()} for _ in range(count)]
+        loader.reset()
+        second = [{k: np.array(v) for k, v in batch.items()} for batch in loader]
+        loader.close()
+        batches.append(first[:1] + second)
+    assert len(batches[0]) == 6
+    assert not all(np.array_equal(batch['label'], batches[0][0]['label'])
+                   for batch in batches[0][1:])
+    for batch, reference in zip(*batches):
+        np.testing.assert_array_equal(batch['image'], reference['image'])
+        np.testing.assert_array_equal(batch['label'], reference['label'])
+
+    flipped = 0
+    for image, label in zip(np.concatenate([b['image'] for b in batches[0]]),
+                            np.concatenate([b['label'] for b in batches[0]])):
+        padded = [np.pad(img, ((0, 0), (2, 2), (2, 2)), mode='constant')
+                  for img in images[labels == label]]
+        windows = [p[:, y:y + 6, x:x + 8] for p in padded for y in range(5) for x in range(5)]
+        if not any(np.array_equal(image, w) for w in windows):
+            flipped += 1
+            assert any(np.array_equal(image[:, :, ::-1], w) for w in windows)
+    assert 0 < flipped < 24
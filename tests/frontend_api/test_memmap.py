@@ -0,0 +1,153 @@
+# ******************************************************************************
+# Copyright 2017-2018 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ******************************************************************************
+from __future__ import division
+import os
+import pickle
+
+import pytest
+import numpy as np
+from neon.frontend import ArrayIterator, MemmapArrayIterator
+from neon.frontend.data import IMDB, PTB, save_dataset, load_dataset, dataset_exists
+from neon.frontend.data.shakespeare import Shakespeare
+
+
+def make_sets():
+    images = np.arange(64 * 3 * 8, dtype=np.uint8).reshape(64, 3, 8)
+    labels = np.arange(64, dtype=np.int32) % 10
+    return {'train': {'image': {'data': images, 'axes': ('N', 'C', 'W')},
+                      'label': {'data': labels, 'axes': ('N',)}},
+            'valid': {'label': {'data': labels[:16], 'axes': None}}}
+
+
+def test_dataset_container(tmpdir):
+    directory = str(tmpdir.join('container'))
+    assert not dataset_exists(directory)
+    sets = make_sets()
+    save_dataset(directory, sets, {'nclass': 10})
+    assert dataset_exists(directory)
+
+    loaded, attributes = load_dataset(directory)
+    assert attributes == {'nclass': 10}
+    assert set(loaded) == set(sets)
+    for set_name, arrays in sets.items():
+        for key, value in arrays.items():
+            data = loaded[set_name][key]['data']
+            assert isinstance(data, np.memmap)
+            assert data.dtype == value['data'].dtype
+            np.testing.assert_array_equal(data, value['data'])
+            assert loaded[set_name][key]['axes'] == value['axes']
+
+
+def test_ptb_export(tmpdir):
+    text = 'the cat sat on the mat\n'
+    for filename in ('ptb.train.txt', 'ptb.test.txt', 'ptb.valid.txt'):
+        tmpdir.join(filename).write(text * 10)
+
+    expected = PTB(str(tmpdir), use_words=True).load_data(cache=False)
+    ptb = PTB(str(tmpdir), use_words=True)
+    directory = ptb.export()
+    assert directory == os.path.join(str(tmpdir), ptb.container_name)
+    # Once exported, the dataset is loaded from the container
+    for filename in ('ptb.train.txt', 'ptb.test.txt', 'ptb.valid.txt'):
+        tmpdir.join(filename).remove()
+    data_dict = ptb.load_memmap()
+    assert ptb.vocab == ['cat', 'mat', 'on', 'sat', 'the']
+    assert ptb.token_to_index['the'] == 4
+    for phase, arrays in expected.items():
+        for key, value in arrays.items():
+            assert data_dict[phase][key].dtype == value.dtype
+            np.testing.assert_array_equal(data_dict[phase][key], value)
+
+
+def test_text_cache(tmpdir):
+    """
+    Text is tokenized once, with the vocabulary of the train set, and cached next to the
+    text files.
+    """
+    tmpdir.join('ptb.train.txt').write('the cat sat\n')
+    tmpdir.join('ptb.test.txt').write('the cat\n')
+    tmpdir.join('ptb.valid.txt').write('sat\n')
+    data_dict = PTB(str(tmpdir)).load_data()
+    assert isinstance(data_dict['train']['inp_txt'], np.memmap)
+    assert data_dict['train']['inp_txt'].dtype == np.uint16
+    np.testing.assert_array_equal(data_dict['test']['inp_txt'], [7, 5, 4, 1, 3, 2, 7, 0])
+    np.testing.assert_array_equal(data_dict['test']['tgt_txt'], [5, 4, 1, 3, 2, 7, 0, 7])
+    tmpdir.join('ptb.valid.txt').write('mat\n')
+    with pytest.raises(ValueError):
+        PTB(str(tmpdir), use_words=True).load_data()
+    # Once cached, the text files are not read
+    tmpdir.join('ptb.train.txt').remove()
+    cached = PTB(str(tmpdir)).load_data()
+    np.testing.assert_array_equal(cached['valid']['inp_txt'], data_dict['valid']['inp_txt'])
+
+    tmpdir.join('input.txt').write('abcab' + 'acd')
+    shakespeare = Shakespeare(str(tmpdir), url='', filename='input.txt', train_split=0.625)
+    assert shakespeare.vocab == ['a', 'b', 'c']
+    np.testing.assert_array_equal(shakespeare.test, [1, 3, 0])
+
+
+def test_imdb_export_options(tmpdir):
+    """
+    Datasets with different shuffle or test_split options are exported to different
+    containers, and a container is not loaded with other options.
+    """
+    reviews = [list(range(i % 5 + 1)) for i in range(20)]
+    with open(str(tmpdir.join('imdb.pkl')), 'wb') as f:
+        pickle.dump((reviews, [i % 2 for i in range(20)]), f)
+
+    shuffled = IMDB(str(tmpdir), vocab_size=10, sentence_length=4)
+    shuffled.load_memmap()
+    ordered = IMDB(str(tmpdir), vocab_size=10, sentence_length=4, shuffle=False,
+                   test_split=0.5)
+    assert ordered.container_path() != shuffled.container_path()
+    expected = IMDB(str(tmpdir), vocab_size=10, sentence_length=4, shuffle=False,
+                    test_split=0.5).load_data()
+    data_dict = ordered.load_memmap()
+    assert len(data_dict['valid']['label']['data']) == 10
+    for phase, arrays in expected.items():
+        for key, value in arrays.items():
+            np.testing.assert_array_equal(data_dict[phase][key]['data'], value['data'])
+
+    with pytest.raises(ValueError):
+        ordered.load_memmap(shuffled.container_path())
+
+
+def two_passes(iterator):
+    batches = list(iterator)
+    iterator.reset()
+    return batches + list(iterator)
+
+
+@pytest.mark.parametrize("shuffle", [False, True])
+@pytest.mark.parametrize("readahead", [0, 2])
+def test_memmap_array_iterator(tmpdir, shuffle, readahead):
+    """
+    Batches gathered from memory maps, with readahead, are those of an ArrayIterator, over
+    several epochs and after a reset.
+    """
+    save_dataset(str(tmpdir), make_sets())
+    loaded, _ = load_dataset(str(tmpdir))
+
+    np.random.seed(0)
+    expected = two_passes(ArrayIterator(make_sets()['train'], 24, total_iterations=10,
+                                        shuffle=shuffle))
+    np.random.seed(0)
+    batches = two_passes(MemmapArrayIterator(loaded['train'], 24, total_iterations=10,
+                                             shuffle=shuffle, readahead=readahead))
+    assert len(batches) == len(expected) == 20
+    for batch, reference in zip(batches, expected):
+        for k in ('image', 'label'):
+            np.testing.assert_array_equal(batch[k], reference[k])
@@ -0,0 +1,134 @@
+# ******************************************************************************
+# Copyright 2017-2018 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ******************************************************************************
+from __future__ import division
+import os
+
+import pytest
+import numpy as np
+from neon.frontend import ArrayIterator, SequentialArrayIterator, PrefetchIterator
+
+
+def flip(batch):
+    batch = dict(batch)
+    batch['x'] = batch['x'][:, ::-1] * 2
+    return batch
+
+
+@pytest.fixture(params=['thread', 'process'])
+def mode(request):
+    return request.param
+
+
+def make_iterator(shuffle):
+    np.random.seed(0)
+    data = {'x': {'data': np.arange(600, dtype=np.float32).reshape(100, 6), 'axes': ('N', 'F')},
+            'label': {'data': np.arange(100, dtype=np.int32), 'axes': ('N',)}}
+    return ArrayIterator(data, batch_size=16, total_iterations=15, shuffle=shuffle)
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_prefetch_order(mode, workers):
+    """
+    The transformed batches come out in the order of the wrapped iterator, also after a
+    reset in the middle of a pass.
+    """
+    expected = [flip(batch) for batch in make_iterator(True)]
+    prefetch = PrefetchIterator(make_iterator(True), depth=3, workers=workers, mode=mode,
+                                transform=flip)
+    assert prefetch.ndata == 100
+    assert set(prefetch.make_placeholders().keys()) == {'x', 'label'}
+    try:
+        for batch, reference in zip(prefetch, expected):
+            assert batch['iteration'] == reference['iteration']
+            np.testing.assert_array_equal(batch['x'], reference['x'])
+            np.testing.assert_array_equal(batch['label'], reference['label'])
+        with pytest.raises(StopIteration):
+            next(prefetch)
+
+        prefetch.reset()
+        first = next(prefetch)
+        next(prefetch)
+        prefetch.reset()
+        assert next(prefetch)['iteration'] == first['iteration'] == 1
+    finally:
+        prefetch.close()
+
+
+def test_prefetch_reused_buffers(mode):
+    """
+    Batches of an iterator that reuses its buffers are not overwritten while prefetched.
+    """
+    data = {'text': np.arange(1000), 'tgt_txt': np.arange(1, 1001)}
+    expected = [{k: np.array(v) for k, v in batch.items()}
+                for batch in SequentialArrayIterator(data, 10, 4, shuffle=False)]
+    prefetch = PrefetchIterator(SequentialArrayIterator(data, 10, 4, shuffle=False),
+                                depth=4, mode=mode)
+    try:
+        batches = 0
+        for batch, reference in zip(prefetch, expected):
+            for k in reference:
+                np.testing.assert_array_equal(batch[k], reference[k])
+            batches += 1
+        assert batches == len(expected)
+    finally:
+        prefetch.close()
+
+
+def test_prefetch_failure(mode):
+    """
+    An exception raised by the transform is raised by next.
+    """
+    def fail(batch):
+        if batch['iteration'] == 3:
+            raise KeyError('augmentation')
+        return batch
+
+    prefetch = PrefetchIterator(make_iterator(False), mode=mode, transform=fail)
+    try:
+        next(prefetch)
+        next(prefetch)
+        with pytest.raises(KeyError if mode == 'thread' else RuntimeError,
+                           match='augmentation'):
+            next(prefetch)
+    finally:
+        prefetch.close()
+
+
+def test_prefetch_dead_worker():
+    """
+    A worker process that dies without handing its batch back makes next raise instead of
+    waiting forever.
+    """
+    def die(batch):
+        if batch['iteration'] == 3:
+            os._exit(1)
+        return batch
+
+    prefetch = PrefetchIterator(make_iterator(False), mode='process', transform=die)
+    try:
+        # Batches handed back just before the exit may be lost with the process
+        with pytest.raises(RuntimeError, match='exited with code 1'):
+            for _ in prefetch:
+                pass
+    finally:
+        prefetch.close()
+
+
+def test_prefetch_arguments():
+    with pytest.raises(ValueError):
+        PrefetchIterator(make_iterator(False), mode='gpu')
+    with pytest.raises(ValueError):
+        PrefetchIterator(make_iterator(False), depth=0)
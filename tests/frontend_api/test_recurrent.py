@@ -121,9 +121,10 @@ def make_weights(input_placeholder, hidden_size, weight_initializer, bias_initia
 @pytest.mark.parametrize("init_state", [True, False])
 @pytest.mark.parametrize("extra_axes", [0, 2])
 @pytest.mark.parametrize("backward", [True, False])
+@pytest.mark.parametrize("scan", [False, True])
 def test_rnn_fprop(sequence_length, input_size, hidden_size, batch_size,
                    return_sequence, weight_initializer, bias_initializer,
-                   init_state, extra_axes, backward):
+                   init_state, extra_axes, backward, scan):
 
     assert batch_size == 1, "the recurrent reference implementation only support batch size 1"
 
@@ -149,7 +150,7 @@ def test_rnn_fprop(sequence_length, input_size, hidden_size, batch_size,
     # Generate ngraph RNN
     rnn_ng = Recurrent(hidden_size, init=W_in, init_inner=W_rec, activation=Tanh(),
                        reset_cells=True, return_sequence=return_sequence,
-                       backward=backward)
+                       backward=backward, scan=scan)
 
     # fprop ngraph RNN
     out_ng = rnn_ng(input_placeholder, init_state=init_state)
@@ -177,8 +178,9 @@ def test_rnn_fprop(sequence_length, input_size, hidden_size, batch_size,
 @pytest.mark.parametrize("hidden_size", [10])
 @pytest.mark.parametrize("return_sequence", [True])
 @pytest.mark.parametrize("init_state", [True, False])
+@pytest.mark.parametrize("scan", [False, True])
 def test_rnn_deriv_ref(sequence_length, input_size, hidden_size, batch_size, return_sequence,
-                       weight_initializer, bias_initializer, init_state):
+                       weight_initializer, bias_initializer, init_state, scan):
 
     assert batch_size == 1, "the recurrent reference implementation only support batch size 1"
     assert return_sequence is True, "the reference rnn only supports sequences for deriv"
@@ -211,7 +213,7 @@ def test_rnn_deriv_ref(sequence_length, input_size, hidden_size, batch_size, ret
 
     # Generate ngraph RNN
     rnn_ng = Recurrent(hidden_size, init=W_in, init_inner=W_rec, activation=Tanh(),
-                       reset_cells=True, return_sequence=return_sequence)
+                       reset_cells=True, return_sequence=return_sequence, scan=scan)
 
     # fprop ngraph RNN
     out_ng = rnn_ng(input_placeholder, init_state=init_state)
@@ -326,6 +326,62 @@ def test_sliced_recurrent_axis():
     assert s.is_recurrent is True
 
 
+def test_axes_interned():
+    a = ng.make_axis(2, name='A')
+    b = ng.make_axis(3, name='B')
+    axes = ng.make_axes([a, b])
+    assert ng.make_axes((a, b)) is axes
+    assert ng.make_axes(axes) is axes
+    assert (axes | b) is axes
+    assert (axes - b) is ng.make_axes([a])
+    assert ng.make_axes([b, a]) is not axes
+
+    # axes with equal names but distinct Axis objects are equal, not identical
+    other = ng.make_axes([ng.make_axis(2, name='A'), ng.make_axis(3, name='B')])
+    assert other is not axes
+    assert other == axes
+    assert hash(other) == hash(axes)
+
+
+def test_axes_caches_follow_axis_changes():
+    a = ng.make_axis(2, name='A')
+    b = ng.make_axis(3, name='B')
+    axes = ng.make_axes([a, b])
+    assert axes.lengths == (2, 3)
+    hash_before = hash(axes)
+    assert (axes & ng.make_axes([b])) == ng.make_axes([b])
+
+    b.length = 5
+    assert axes.lengths == (2, 5)
+    assert hash(axes) == hash((a, b))
+    assert hash(axes) != hash_before
+
+    b.named('D')
+    assert axes.names == ('A', 'D')
+    assert axes.index(b) == 1
+    assert axes.find_by_name('B') == ng.make_axes()
+    assert axes.is_equal_set(ng.make_axes([ng.make_axis(name='D'), a]))
+    assert axes.sample_axes() is axes
+    b.named('N')
+    assert axes.sample_axes() == ng.make_axes([a])
+    assert axes.batch_axes() == ng.make_axes([b])
+
+
+def test_axes_ops_with_flattened_axes():
+    a = ng.make_axis(2, name='A')
+    b = ng.make_axis(3, name='B')
+    flat = ng.make_axes([a, b]).flatten()
+    same_flat = ng.make_axes([a, b]).flatten()
+    axes = ng.make_axes([flat, ng.make_axis(4, name='C')])
+
+    # flattened axes compare by their components, not by their names
+    assert (axes & ng.make_axes([same_flat])) == ng.make_axes([flat])
+    assert axes.index(same_flat) == 0
+    assert len(axes - same_flat) == 1
+    with pytest.raises(ValueError):
+        axes + same_flat
+
+
 def test_duplicate_axis_names():
     with pytest.raises(DuplicateAxisNames) as e:
         AxesMap({'aaa': 'zzz', 'bbb': 'zzz', 'ccc': 'yyy'})
@@ -0,0 +1,100 @@
+# ******************************************************************************
+# Copyright 2017-2018 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ******************************************************************************
+import numpy as np
+import pytest
+
+import neon as ng
+from neon.frontend import Affine, Sequential, Tanh, GaussianInit, checkpoint_gradients
+from neon.analysis import peak_activation_bytes, tensor_bytes
+from neon.op_graph.op_graph import Op
+from neon.testing import ExecutorFactory
+
+
+def mlp_gradients(num_layers=8, segments=None):
+    F = ng.make_axis(length=16, name='F')
+    N = ng.make_axis(length=256, name='N')
+    x = ng.placeholder([F, N])
+    layers = [Affine(nout=64, weight_init=GaussianInit(), activation=Tanh())
+              for _ in range(num_layers)]
+    if segments is not None:
+        blocks = [Sequential(layers[i:i + segments]) for i in range(0, num_layers, segments)]
+        out = Sequential(blocks)(x)
+    else:
+        blocks = None
+        out = Sequential(layers)(x)
+    cost = ng.sum(out * out, out_axes=())
+    grads = [ng.deriv(cost, v) for v in sorted(cost.variables(), key=lambda v: v.name)]
+    return cost, grads, blocks
+
+
+def test_peak_activation_bytes():
+    """
+    Views share the buffer of their argument and state is not counted.
+    """
+    H = ng.make_axis(length=4, name='H')
+    N = ng.make_axis(length=8, name='N')
+    x = ng.placeholder([H, N])
+    a = ng.tanh(x)
+    b = ng.exp(a)
+    c = ng.sum(b + a, out_axes=())
+    peak, _ = peak_activation_bytes([c])
+    assert peak == 3 * tensor_bytes(a)
+
+
+@pytest.mark.parametrize("segments", [None, 4])
+def test_checkpoint_gradients(segments):
+    cost, grads, blocks = mlp_gradients(segments=segments)
+    stats = checkpoint_gradients(grads, cost, blocks)
+
+    assert stats['recomputed_ops'] > 0
+    assert stats['estimated_peak_bytes_after'] < stats['estimated_peak_bytes_before']
+    assert stats['estimated_peak_bytes_after'] == peak_activation_bytes(grads)[0]
+
+    # Recomputed ops are only used by the backward graph
+    forward = set(Op.ordered_ops([cost]))
+    recomputed = [op for op in Op.ordered_ops(grads) if op.metadata.get('recompute')]
+    assert len(recomputed) == stats['recomputed_ops']
+    assert not forward.intersection(recomputed)
+
+
+def test_checkpoint_segment_errors():
+    cost, grads, _ = mlp_gradients()
+    with pytest.raises(ValueError):
+        checkpoint_gradients(grads, cost, [1])
+
+
+def test_checkpoint_gradients_values():
+    """
+    The gradients of a checkpointed graph are those of the same graph without checkpoints.
+    """
+    x_value = np.random.uniform(-1, 1, size=(16, 256))
+    results = []
+    for checkpoint in (False, True):
+        np.random.seed(0)
+        F = ng.make_axis(length=16, name='F')
+        N = ng.make_axis(length=256, name='N')
+        x = ng.placeholder([F, N])
+        out = Sequential([Affine(nout=64, weight_init=GaussianInit(), activation=Tanh())
+                          for _ in range(8)])(x)
+        cost = ng.sum(out * out, out_axes=())
+        grads = [ng.deriv(cost, v) for v in sorted(cost.variables(), key=lambda v: v.uuid)]
+        if checkpoint:
+            assert checkpoint_gradients(grads, cost)['recomputed_ops'] > 0
+        with ExecutorFactory() as ex:
+            results.append(ex.executor([cost] + grads, x)(x_value))
+
+    for value, expected in zip(*results):
+        np.testing.assert_allclose(value, expected, rtol=1e-5, atol=1e-6)
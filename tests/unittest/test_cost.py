@@ -0,0 +1,92 @@
+# ******************************************************************************
+# Copyright 2017-2018 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ******************************************************************************
+import neon as ng
+from neon.frontend import Convolution, Pooling, UniformInit, Rectlin
+from neon.analysis import CostModel, op_flops, op_bytes, cost_report
+from neon.op_graph.op_graph import DotOp, Op
+from neon.op_graph.convolution import ConvolutionOp, bprop_conv, update_conv
+from neon.op_graph.pooling import PoolingOp, BpropPoolOp
+
+
+def test_dot_cost():
+    M = ng.make_axis(length=3, name='M')
+    J = ng.make_axis(length=5, name='J')
+    K = ng.make_axis(length=7, name='K')
+    x = ng.placeholder([M, J])
+    y = ng.placeholder([J, K])
+    z = ng.dot(x, y)
+    assert op_flops(z) == 2 * 3 * 5 * 7
+    assert op_bytes(z) == 4 * (3 * 5 + 5 * 7 + 3 * 7)
+
+    w = ng.exp(z)
+    assert op_flops(w) == 3 * 7
+    assert op_flops(ng.sum(w, out_axes=())) == 3 * 7
+
+
+def test_conv_pool_cost():
+    """
+    Convolution derivatives cost as much as the forward convolution and are charged to
+    the scope of the forward layer.
+    """
+    C = ng.make_axis(length=3, name='C')
+    H = ng.make_axis(length=8, name='H')
+    W = ng.make_axis(length=8, name='W')
+    N = ng.make_axis(length=2, name='N')
+    x = ng.placeholder([N, C, H, W])
+    conv = Convolution((3, 3, 4), UniformInit(), activation=Rectlin(), bias_init=None)
+    pool = Pooling(pool_shape=(2, 2), strides=2)
+    out = pool(conv(x))
+    cost = ng.sum(out, out_axes=())
+    grads = [ng.deriv(cost, v) for v in cost.variables()]
+
+    ops = Op.ordered_ops(grads)
+    fprop = [op for op in ops if isinstance(op, ConvolutionOp)][0]
+    macs = 2 * 4 * 6 * 6 * 3 * 3 * 3
+    assert op_flops(fprop) == 2 * macs
+    derivs = [op for op in ops if isinstance(op, (bprop_conv, update_conv))]
+    assert derivs
+    for op in derivs:
+        assert op_flops(op) == 2 * macs
+
+    pool_op = [op for op in ops if isinstance(op, PoolingOp)][0]
+    assert op_flops(pool_op) == 2 * 4 * 3 * 3 * 4
+    assert op_flops([op for op in ops if isinstance(op, BpropPoolOp)][0]) == op_flops(pool_op)
+
+    model = CostModel(grads)
+    scopes = dict((scope, flops) for scope, flops, _ in model.by_scope())
+    conv_flops = sum(op_flops(op) for op in ops
+                     if isinstance(op, (ConvolutionOp, update_conv)))
+    assert scopes[fprop.scope.name] >= conv_flops
+    assert model.flops == sum(flops for flops in scopes.values())
+    assert not any(isinstance(op, DotOp) for op, _, _ in model.costs)
+    report = model.report(step_time=1.0, peak_gflops=100., bandwidth_gbs=10.)
+    assert "Total" in report
+    # Only the whole computation has a measured rate
+    assert report.count("GFLOP/s") == 1
+    assert "Roofline time" in report
+
+
+def test_cost_report_step_time(monkeypatch, capsys):
+    """
+    The given step time only applies to the first computation of the first script.
+    """
+    def collect_computations(script, argv):
+        x = ng.placeholder([ng.make_axis(length=3, name='M'), ng.make_axis(length=5)])
+        return [ng.computation(ng.exp(x), x), ng.computation(ng.tanh(x), x)]
+
+    monkeypatch.setattr(cost_report, 'collect_computations', collect_computations)
+    cost_report.main(['--step_time', '0.5', 'first.py', 'second.py'])
+    assert capsys.readouterr().out.count("Step time") == 1
@@ -14,7 +14,7 @@
 # limitations under the License.
 # ******************************************************************************
 
-from neon.util.generics import generic_function, generic_method
+from neon.util.generics import DispatchTable, generic_function, generic_method
 
 
 class A(object):
@@ -152,3 +152,25 @@ def test_generic_method():
     assert subvisitor.selector(A(), 1) == ('Sub', 'A')
     assert subvisitor.selector(B(), 1) == 'BSub'
     assert subvisitor.f(C(), 1) == ('f', 'C')
+
+
+def test_dispatch_table():
+    subvisitor = SubVisitor()
+    table = DispatchTable(subvisitor, SubVisitor.selector)
+    assert table(A(), 1) == ('Sub', 'A')
+    assert table(B(), 1) == 'BSub'
+    assert table(3, 4) == 'int'
+    assert table((2, 3), 11) == 'tuple'
+
+    class D(A):
+        pass
+
+    assert table(D(), 1) == ('Sub', 'A')
+
+    # Adding a method invalidates the tables of the generic method and of its extensions
+    @Visitor.selector.on_type(D)
+    def selector(self, x, y):
+        return 'D'
+
+    assert table(D(), 1) == 'D'
+    assert DispatchTable(Visitor(), Visitor.selector)(D(), 1) == 'D'
@@ -0,0 +1,66 @@
+# ******************************************************************************
+# Copyright 2017-2018 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ******************************************************************************
+import numpy as np
+
+import neon as ng
+from neon.frontend import Affine, GaussianInit, GradientDescentMomentum, Tanh
+from neon.analysis import MemoryPlan, tensor_bytes
+from neon.analysis.memory_report import parse_bytes
+
+
+def test_memory_plan_categories():
+    """
+    Weights and biases, optimizer velocities and placeholders are separate line items and are not
+    counted as activations.
+    """
+    F = ng.make_axis(length=8, name='F')
+    N = ng.make_axis(length=4, name='N')
+    x = ng.placeholder([F, N])
+    layer = Affine(nout=16, weight_init=GaussianInit(), activation=Tanh())
+    cost = ng.sum(layer(x), out_axes=())
+    updates = GradientDescentMomentum(0.1, 0.9)(cost)
+    plan = MemoryPlan(ng.computation([updates, cost], x))
+
+    weight_bytes = (16 * 8 + 16) * np.dtype(np.float32).itemsize
+    assert plan.persistent_bytes("variables") == weight_bytes
+    assert plan.persistent_bytes("state") == weight_bytes
+    assert plan.persistent_bytes("inputs") == tensor_bytes(x)
+    assert plan.total_bytes == plan.peak_bytes + plan.persistent_bytes()
+    assert plan.peak_bytes > 0
+
+    live = plan.live_at(plan.peak_step)
+    assert sum(nbytes for _, nbytes in live) == plan.peak_bytes
+    assert sum(nbytes for _, nbytes in plan.scope_bytes()) == plan.peak_bytes
+    assert "Variables" in plan.report()
+
+
+def test_memory_plan_returns_live_to_end():
+    H = ng.make_axis(length=4, name='H')
+    x = ng.placeholder([H])
+    a = ng.exp(x)
+    b = ng.tanh(a)
+    c = ng.sum(b, out_axes=())
+    plan = MemoryPlan(ng.computation([a, c], x))
+    end = len(plan.schedule) - 1
+    lifetimes = {op: (first, last) for op, first, last, _ in plan.lifetimes}
+    assert lifetimes[a][1] == end
+    assert lifetimes[b][1] < end
+
+
+def test_parse_bytes():
+    assert parse_bytes("1024") == 1024
+    assert parse_bytes("512M") == 512 << 20
+    assert parse_bytes("1.5GiB") == 3 << 29
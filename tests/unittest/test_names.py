@@ -1,4 +1,10 @@
-from neon.util.names import ScopedNameableValue, name_scope
+import gc
+import time
+
+import pytest
+
+from neon.util.names import NameableValue, ScopedNameableValue, name_scope, \
+    unregistered_anonymous_names
 
 
 def test_nested_namescope():
@@ -36,3 +42,55 @@ def test_scope_reuse():
     assert val1.name == "scope/val1"
     assert val2.name == "scope/val2"
     assert val3.name != "scope/val3"
+
+
+def test_unique_names_after_collection():
+    """
+    Suffixes come from a per name counter and are not reused once their object is garbage
+    collected.
+    """
+    first = [NameableValue("unique_val") for _ in range(3)]
+    assert [val.name for val in first] == ["unique_val", "unique_val_0", "unique_val_1"]
+    del first
+    gc.collect()
+    second = NameableValue("unique_val")
+    assert second.name == "unique_val"
+    third = NameableValue("unique_val")
+    assert third.name == "unique_val_2"
+
+    # A suffix taken explicitly is skipped
+    base = NameableValue("taken_val")
+    explicit = NameableValue("taken_val_0")
+    implicit = NameableValue("taken_val")
+    assert base.name == "taken_val"
+    assert explicit.name == "taken_val_0" and implicit.name == "taken_val_1"
+
+
+def test_unregistered_anonymous_names():
+    with unregistered_anonymous_names():
+        anonymous = [ScopedNameableValue() for _ in range(3)]
+        named = ScopedNameableValue("registered_val")
+    assert len(set(val.name for val in anonymous)) == 3
+    with pytest.raises(KeyError):
+        NameableValue.get_object_by_name(anonymous[0].name)
+    assert NameableValue.get_object_by_name(named.name) is named
+    assert ScopedNameableValue().name in NameableValue._NameableValue__all_names
+
+
+@pytest.mark.parametrize('register', [True, False])
+def test_name_allocation_microbenchmark(register):
+    """
+    Allocates many names sharing a prefix, as for the ops of an unrolled graph. Run with -s
+    to see the timings.
+    """
+    count = 20000
+    start = time.time()
+    if register:
+        vals = [ScopedNameableValue("Add") for _ in range(count)]
+    else:
+        with unregistered_anonymous_names():
+            vals = [ScopedNameableValue() for _ in range(count)]
+    elapsed = time.time() - start
+    assert len(set(val.name for val in vals)) == count
+    print("{} names ({}registered): {:.1f} us per name".format(
+        count, "" if register else "un", elapsed / count * 1e6))
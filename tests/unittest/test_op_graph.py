@@ -13,6 +13,9 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 # ******************************************************************************
+import gc
+import weakref
+
 import pytest
 
 import neon as ng
@@ -115,3 +118,136 @@ def test_tensor_slice():
     assert x[:5].axes.full_lengths == (5, 20, 5)
     assert x[:, 2:7].axes.full_lengths == (10, 5, 5)
     assert x[:5, :, :-1].axes.full_lengths == (5, 20, 4)
+
+
+def test_ordered_ops_memo_invalidation(N):
+    """
+    Memoized topological sorts are dropped when an op in them is mutated.
+    """
+    x = ng.variable([N])
+    y = ng.variable([N])
+    a = ng.tanh(x)
+    b = a * y
+    ops = ng.Op.ordered_ops([b])
+    assert ops == ng.Op.ordered_ops([b])
+    assert ops.index(a) < ops.index(b)
+
+    c = ng.exp(y)
+    b._set_args([a, c])
+    assert c in ng.Op.ordered_ops([b])
+
+    d = ng.log(x)
+    b.add_control_dep(d)
+    assert d in ng.Op.ordered_ops([b])
+
+    e = ng.sqrt(x)
+    a.forward = e
+    ops = ng.Op.ordered_ops([b])
+    assert e in ops and a not in ops
+
+
+def test_ordered_ops_memo_freed(N):
+    """
+    A memoized topological sort does not keep its graph alive.
+    """
+    x = ng.variable([N])
+    b = ng.exp(ng.tanh(x))
+    ng.Op.ordered_ops([b])
+    ref = weakref.ref(b)
+    del b
+    gc.collect()
+    assert ref() is None
+
+
+def test_ordered_ops_deterministic(N):
+    """
+    The order only depends on the structure of the graph and on the order of the roots.
+    """
+    def build():
+        x = ng.variable([N])
+        ops = [x]
+        for i in range(50):
+            ops.append(ng.tanh(ops[i]) + ops[i // 2])
+        return ops
+
+    first, second = build(), build()
+    order_first = [first.index(op) for op in ng.Op.ordered_ops([first[-1]]) if op in first]
+    order_second = [second.index(op) for op in ng.Op.ordered_ops([second[-1]])
+                    if op in second]
+    assert order_first == order_second
+
+
+def test_gradients(N):
+    """
+    gradients builds the same derivatives as deriv and zero for unused independents.
+    """
+    x = ng.placeholder([N])
+    w = ng.variable([N])
+    b = ng.variable([N])
+    unused = ng.variable([N])
+    cost = ng.sum(ng.tanh(w * ng.exp(x) + b), out_axes=())
+
+    grads = ng.gradients(cost, [w, b, unused])
+    assert len(grads) == 3
+    for grad, variable in zip(grads, [w, b, unused]):
+        assert grad.axes == variable.axes
+        assert grad.metadata['reduce_func'] == 'sum'
+    assert grads[2].is_constant
+    derivs = [ng.deriv(cost, w), ng.deriv(cost, b)]
+    assert (len(ng.Op.ordered_ops(grads[:2]))
+            == len(ng.Op.ordered_ops(derivs)))
+
+    with pytest.raises(ValueError):
+        ng.gradients(cost, [w], error=ng.constant(1, [N]))
+
+
+def test_tensor_description_cache(N):
+    """
+    Tensor descriptions are cached per op, counted, cleared and freed with their op.
+    """
+    cache = ng.op_graph.op_graph.tdcache.tensor_description_cache
+    x = ng.variable([N])
+    y = ng.exp(x)
+
+    misses = cache.misses
+    td = y.tensor_description()
+    assert cache.misses == misses + 1
+    hits = cache.hits
+    assert y.tensor_description() is td
+    assert cache.hits == hits + 1
+    assert ng.tensor_description_cache_stats()['size'] == cache.size
+
+    ng.clear_tensor_description_cache()
+    assert cache.size == 0
+    assert y.tensor_description() is not td
+
+    size = cache.size
+    del y, td
+    gc.collect()
+    assert cache.size == size - 1
+
+
+def test_persistent_tensors(N):
+    """
+    Persistent tensors exclude constants and placeholders, and a computation keeps them
+    until its graph changes.
+    """
+    x = ng.placeholder([N])
+    w = ng.variable([N], initial_value=1)
+    s = ng.persistent_tensor([N], initial_value=0)
+    c = ng.constant(2, [N])
+    cost = ng.sum(x * w * c, out_axes=())
+    update = ng.assign(s, s + x)
+    comp = ng.computation([cost, update], x)
+    assert list(comp.persistent_tensors()) == list(ng.Op.find_persistent_tensors([comp]))
+    assert set(comp.persistent_tensors()) == {w, s}
+    assert comp.persistent_tensors() is not comp.persistent_tensors()
+
+    memo = comp._persistent_tensors_memo
+    comp.persistent_tensors()
+    assert comp._persistent_tensors_memo is memo
+
+    v = ng.variable([N], initial_value=1)
+    comp.add_control_dep(ng.assign(v, x))
+    assert set(comp.persistent_tensors()) == {w, s, v}
+    assert comp._persistent_tensors_memo is not memo
@@ -37,3 +37,17 @@ def test_metadata_capture():
     x = ng.constant(2)
     ret = layer.configure(x)
     assert ret.metadata['layer_type'] == 'convolution'
+
+
+def test_lazy_containers():
+    x = ng.constant(2)
+    y = ng.exp(x)
+    assert y._metadata is None and y._style is None and y._control_deps is None
+    assert len(y.control_deps) == 0
+    y.metadata['label'] = 'y'
+    y.add_control_dep(x)
+    assert y.metadata == {'label': 'y'}
+    assert list(y.control_deps) == [x.forwarded]
+    assert y.uuid > x.uuid
+    assert y in ng.Op.all_op_references([y])
+    assert x.forwarded in ng.Op.all_op_references([y])
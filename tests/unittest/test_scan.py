@@ -0,0 +1,83 @@
+# ******************************************************************************
+# Copyright 2017-2018 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ******************************************************************************
+import pytest
+
+import neon as ng
+from neon.frontend import Recurrent, LSTM, Tanh, Logistic, GaussianInit
+from neon.op_graph.op_graph import Op
+from neon.op_graph.scan import ScanOp
+
+
+def recurrent_graph(layer, sequence_length):
+    F = ng.make_axis(length=5, name='F')
+    REC = ng.make_axis(length=sequence_length, name='REC')
+    N = ng.make_axis(length=2, name='N')
+    x = ng.placeholder([F, REC, N])
+    out = layer(x)
+    cost = ng.sum(out, out_axes=())
+    grads = [ng.deriv(cost, v) for v in sorted(cost.variables(), key=lambda v: v.name)]
+    return out, grads
+
+
+def test_scan_axes():
+    """
+    Stacked outputs get the scan axis at pos, final states keep the state axes.
+    """
+    H = ng.make_axis(length=3, name='H')
+    N = ng.make_axis(length=2, name='N')
+    REC = ng.make_axis(length=4, name='REC')
+    x = ng.placeholder([H, REC, N])
+    h0 = ng.constant(0, [H, N])
+
+    def step(inputs, states):
+        h = ng.tanh(inputs[0] + states[0])
+        return [h], [h]
+
+    (h_seq,), (h_last,) = ng.scan(step, [x], [h0], REC, pos=1)
+    assert h_seq.axes == ng.make_axes([H, REC, N])
+    assert h_last.axes == h0.axes
+
+
+def test_scan_errors():
+    H = ng.make_axis(length=3, name='H')
+    N = ng.make_axis(length=2, name='N')
+    REC = ng.make_axis(length=4, name='REC')
+    x = ng.placeholder([H, N])
+    h0 = ng.constant(0, [H, N])
+
+    with pytest.raises(ValueError):
+        ng.scan(lambda inputs, states: ([], states), [x], [h0], REC)
+
+    x = ng.placeholder([H, REC, N])
+    with pytest.raises(ValueError):
+        ng.scan(lambda inputs, states: ([], []), [x], [h0], REC)
+
+
+@pytest.mark.parametrize("layer_cls", [Recurrent, LSTM])
+def test_scan_graph_size(layer_cls):
+    """
+    With scan the body is built once, so the graph for the layer and its gradients does
+    not grow with the sequence length.
+    """
+    kwargs = {'gate_activation': Logistic()} if layer_cls is LSTM else {}
+    sizes = []
+    for sequence_length in [3, 30]:
+        layer = layer_cls(4, GaussianInit(), activation=Tanh(), scan=True, **kwargs)
+        out, grads = recurrent_graph(layer, sequence_length)
+        ops = Op.ordered_ops([out] + grads)
+        assert len([op for op in ops if isinstance(op, ScanOp)]) == 2
+        sizes.append(len(ops))
+    assert sizes[0] == sizes[1]
@@ -0,0 +1,124 @@
+# ******************************************************************************
+# Copyright 2017-2018 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ******************************************************************************
+import pickle
+import struct
+
+import numpy as np
+import pytest
+
+import neon as ng
+from neon.op_graph.serde import serialize_graph, deserialize_graph, save_graph, load_graph, \
+    FORMAT_VERSION, MAGIC
+from neon.util.persist import fetch_file
+
+
+def make_graph():
+    N = ng.make_axis(length=4, name='N')
+    F = ng.make_axis(length=3, name='F')
+    H = ng.make_axis(length=2, name='H')
+    x = ng.placeholder([F, N])
+    w = ng.variable([H, F], initial_value=np.arange(6, dtype=np.float32).reshape(2, 3),
+                    metadata={'label': 'weights'})
+    y = ng.tanh(ng.dot(w, x))
+    cost = ng.sum(y, out_axes=())
+    update = ng.assign(w, w - 0.1 * ng.deriv(cost, w))
+    return ng.computation([cost, update], x)
+
+
+def check_same_graph(ops, loaded):
+    ordered = ng.Op.ordered_ops(ops)
+    loaded_ordered = ng.Op.ordered_ops(loaded)
+    assert len(ordered) == len(loaded_ordered)
+    for op, loaded_op in zip(ordered, loaded_ordered):
+        assert op is not loaded_op
+        assert type(op) is type(loaded_op)
+        assert op.metadata == loaded_op.metadata
+        if op.is_tensor_op:
+            assert op.axes.names == loaded_op.axes.names
+            assert op.axes.lengths == loaded_op.axes.lengths
+            assert op.dtype == loaded_op.dtype
+            if isinstance(getattr(op, "initial_value", None), np.ndarray):
+                np.testing.assert_array_equal(op.initial_value, loaded_op.initial_value)
+
+
+def test_round_trip():
+    computation = make_graph()
+    loaded = deserialize_graph(serialize_graph(computation))
+    assert len(loaded) == 1
+    check_same_graph([computation], loaded)
+    assert len(loaded[0].values) == len(computation.values)
+    assert loaded[0].parameters[0] in ng.Op.all_op_references(loaded)
+
+
+def test_round_trip_numpy_scalars():
+    x = ng.placeholder([ng.make_axis(length=3, name='F')])
+    with ng.metadata(scale=np.float32(2.0), count=np.int64(3), enabled=np.bool_(True)):
+        y = ng.tanh(x)
+    computation = ng.computation(y, x)
+    loaded = deserialize_graph(serialize_graph(computation))
+    for key in ('scale', 'count', 'enabled'):
+        values = [op.metadata[key] for op in ng.Op.ordered_ops([computation])
+                  if key in op.metadata]
+        loaded_values = [op.metadata[key] for op in ng.Op.ordered_ops(loaded)
+                         if key in op.metadata]
+        assert len(values) > 0
+        assert loaded_values == values
+        assert [type(v) for v in loaded_values] == [type(v) for v in values]
+
+
+def test_round_trip_is_stable():
+    computation = make_graph()
+    loaded = deserialize_graph(serialize_graph(computation))
+    check_same_graph([computation], deserialize_graph(serialize_graph(loaded)))
+
+
+def test_save_load(tmpdir):
+    computation = make_graph()
+    filename = str(tmpdir.join('graph.ngo'))
+    save_graph(computation, filename)
+    loaded = load_graph(filename)
+    check_same_graph([computation], loaded)
+    variable = [op for op in ng.Op.all_op_references(loaded) if op.is_trainable][0]
+    assert variable.initial_value.flags.writeable
+
+
+def test_not_a_graph():
+    with pytest.raises(ValueError):
+        deserialize_graph(b'not a graph')
+    data = bytearray(serialize_graph(make_graph()))
+    data[len(MAGIC):len(MAGIC) + 4] = np.uint32(FORMAT_VERSION + 1).tobytes()
+    with pytest.raises(ValueError):
+        deserialize_graph(data)
+
+
+class _Call(object):
+    def __init__(self, func, *args):
+        self.func = func
+        self.args = args
+
+    def __reduce__(self):
+        return self.func, self.args
+
+
+@pytest.mark.parametrize('call', [_Call(eval, '1 + 1'),
+                                  _Call(getattr, ng.Op, 'ordered_ops'),
+                                  _Call(fetch_file, 'a', 'b', 1, '/tmp')],
+                         ids=['eval', 'getattr', 'fetch_file'])
+def test_untrusted_global(call):
+    graph = pickle.dumps(call, protocol=2)
+    data = struct.pack('<8sIQ', MAGIC, FORMAT_VERSION, len(graph)) + graph
+    with pytest.raises(pickle.UnpicklingError):
+        deserialize_graph(data)
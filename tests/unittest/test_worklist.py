@@ -0,0 +1,88 @@
+# ******************************************************************************
+# Copyright 2017-2018 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ******************************************************************************
+import neon as ng
+from neon.op_graph.op_graph import Op, NegativeOp
+from neon.op_graph.worklist import GraphWorklist
+from neon.transformers.passes.passes import PeepholeGraphPass
+from neon.util.generics import generic_method
+
+
+class DoubleNegativePass(PeepholeGraphPass):
+    """
+    Replaces -(-x) with x.
+    """
+
+    def __init__(self, worklist_pass, **kwargs):
+        super(DoubleNegativePass, self).__init__(**kwargs)
+        self.worklist_pass = worklist_pass
+        self.visits = 0
+
+    @generic_method(dispatch_base_type=Op)
+    def visit(self, op, *args):
+        self.visits += 1
+
+    @visit.on_type(NegativeOp)
+    def visit(self, op, x):
+        self.visits += 1
+        if isinstance(x, NegativeOp):
+            self.replace_op(op, self.op_arg(x, 0))
+
+
+def test_worklist_follows_changes():
+    x = ng.negative(ng.placeholder(()))
+    y = ng.negative(ng.placeholder(()))
+    a = x + y
+    b = a * y
+    with GraphWorklist([b]) as worklist:
+        assert list(worklist.users[a]) == [b]
+        assert set(worklist.users[y]) == {a, b}
+        assert not worklist.dirty
+
+        # Ops made while the worklist is active join the graph when they are used
+        c = ng.negative(x)
+        assert c not in worklist
+        a.replace_self(c)
+        assert c in worklist
+        assert a not in worklist
+        b.update_forwards()
+        assert b.args[0] is c
+        assert list(worklist.users[c]) == [b]
+        assert list(worklist.users[x]) == [c]
+        assert list(worklist.users[y]) == [b]
+        assert worklist.pop_dirty() == [c, b]
+        assert not worklist.dirty
+    assert worklist not in Op._graph_worklists
+
+
+def test_worklist_pass():
+    def build_graph():
+        x = ng.placeholder(())
+        y = x
+        for _ in range(8):
+            y = ng.negative(y) + x
+            y = ng.negative(ng.negative(ng.negative(y)))
+        return y
+
+    results = []
+    for worklist_pass in (False, True):
+        graph = build_graph()
+        graph_pass = DoubleNegativePass(worklist_pass)
+        graph_pass.wrapped_do_pass(ops=[graph])
+        ordered = Op.ordered_ops([graph])
+        results.append(([type(op) for op in ordered], graph_pass.visits))
+    (run_pass_types, run_pass_visits), (worklist_types, worklist_visits) = results
+    assert worklist_types == run_pass_types
+    assert worklist_visits < run_pass_visits